@@ -0,0 +1,561 @@
+"""
+Tareas de mantenimiento por línea de comandos.
+
+    python -m app.cli rebuild-calendar-read-model [--batch-size N]
+    python -m app.cli bench-calendar-serialization [--rows N] [--repeat N]
+    python -m app.cli bench-calendar-rich [--instances N] [--volunteers N] [--repeat N]
+    python -m app.cli bench-participant-counts [--events N] [--participants N] [--repeat N]
+    python -m app.cli bench-conflicts [--instances N] [--volunteers N] [--checks N] [--repeat N]
+    python -m app.cli purge-login-events [--days N] [--batch-size N]
+    python -m app.cli sweep-auth-tokens [--batch-size N] [--max-batches N]
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+from app.database import SessionLocal
+from app.services import auth_sweeper, calendar_read_model, login_retention
+
+
+def rebuild_calendar_read_model(args: argparse.Namespace) -> int:
+    db = SessionLocal()
+    try:
+        rows = calendar_read_model.rebuild(db, args.batch_size)
+    finally:
+        db.close()
+    print(f"calendar_instances_rich: {rows} filas regeneradas")
+    return 0
+
+
+def purge_login_events(args: argparse.Namespace) -> int:
+    db = SessionLocal()
+    try:
+        result = login_retention.run(db, days=args.days, batch_size=args.batch_size)
+    except login_retention.PartitioningError as exc:
+        print(exc, file=sys.stderr)
+        return 1
+    finally:
+        db.close()
+    print(f"auth_login_events: {result['deleted']} eventos anteriores a {result['cutoff']:%Y-%m-%d} "
+          f"resumidos y borrados en {result['batches']} tandas")
+    if result["partitions_added"]:
+        print(f"  particiones agregadas: {', '.join(result['partitions_added'])}")
+    if result["partitions_dropped"]:
+        print(f"  particiones descartadas: {', '.join(result['partitions_dropped'])}")
+    return 0
+
+
+def sweep_auth_tokens(args: argparse.Namespace) -> int:
+    result = auth_sweeper.sweeper.run_once(batch_size=args.batch_size, max_batches=args.max_batches)
+    print(f"Vencidos, usados o revocados antes de {result['cutoff']:%Y-%m-%d %H:%M}:")
+    for table, deleted in result["deleted"].items():
+        pending = " (quedan más)" if table in result["pending"] else ""
+        print(f"  {table}: {deleted} filas borradas{pending}")
+    return 0
+
+
+def _bench_rows(n: int) -> list:
+    """Filas sintéticas con la forma que devuelve la base para la vista rica."""
+    day = date(2025, 1, 1)
+    coordinator = {"id": 1, "name": "Ana", "last_name": "Pérez"}
+    return [
+        {
+            "id": i,
+            "recurrence_id": None,
+            "type": "grupo" if i % 2 else "taller",
+            "source_id": i % 7,
+            "date": day + timedelta(days=i // 3),
+            "start_time": timedelta(hours=9 + i % 3 * 3),
+            "end_time": timedelta(hours=11 + i % 3 * 3, minutes=30),
+            "notes": None,
+            "status": "activo",
+            "coordinator": coordinator if i % 4 else None,
+            "co_coordinator": None,
+        }
+        for i in range(n)
+    ]
+
+
+def bench_calendar_serialization(args: argparse.Namespace) -> int:
+    """
+    Costo por fila de armar y serializar /calendar/instances-rich: el camino con
+    response_model (validación Pydantic + jsonable_encoder + json) contra fast=True.
+    """
+    from fastapi.encoders import jsonable_encoder
+    from pydantic import TypeAdapter
+
+    from app import fast_json
+    from app.routers.calendar import _fmt_seconds, _fmt_time
+    from app.schemas.calendar import CalendarInstanceRich
+
+    rows = _bench_rows(args.rows)
+    adapter = TypeAdapter(list[CalendarInstanceRich])
+
+    def shape(fmt):
+        return [
+            {**row, "date": str(row["date"]), "start_time": fmt(row["start_time"]), "end_time": fmt(row["end_time"])}
+            for row in rows
+        ]
+
+    def uncached_fmt(val):
+        return _fmt_seconds.__wrapped__(int(val.total_seconds()))
+
+    def validated():
+        return json.dumps(jsonable_encoder(adapter.validate_python(shape(uncached_fmt)))).encode("utf-8")
+
+    def fast():
+        result = shape(_fmt_time)
+        for r in result:
+            r.setdefault("participant_counts", None)
+        return fast_json.dumps(result)
+
+    if json.loads(validated()) != json.loads(fast()):
+        print("Las salidas difieren", file=sys.stderr)
+        return 1
+
+    print(f"{args.rows} filas, {args.repeat} repeticiones ({'orjson' if fast_json.orjson else 'json'})")
+    for label, fn in (("response_model", validated), ("fast", fast)):
+        best = min(_timed(fn) for _ in range(args.repeat))
+        print(f"  {label:<15} {best * 1e6 / args.rows:8.2f} µs/fila")
+    return 0
+
+
+# ── Benchmarks sobre datos sembrados ──────────────────────────────────
+
+def _bench_engine(unique_roles: bool = True):
+    """
+    SQLite en memoria con el esquema de los modelos, para los benchmarks que necesitan una
+    base. Registra YEAR() y MONTH() para poder correr también las consultas viejas. Con
+    unique_roles=False, calendar_assignments queda como antes de la migración 003 (sin la
+    clave única (instance_id, role)), para poder sembrar varias filas por rol.
+    """
+    from sqlalchemy import create_engine, event
+    from sqlalchemy.pool import StaticPool
+
+    from app.database import Base
+    from app.models import auth, calendar, participant, voluntario  # noqa: F401  registra las tablas
+
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+
+    @event.listens_for(engine, "connect")
+    def _mysql_functions(dbapi_conn, _):
+        dbapi_conn.create_function("YEAR", 1, lambda value: int(value[:4]) if value else None)
+        dbapi_conn.create_function("MONTH", 1, lambda value: int(value[5:7]) if value else None)
+
+    Base.metadata.create_all(engine)
+    if not unique_roles:
+        with engine.begin() as conn:
+            conn.exec_driver_sql("DROP TABLE calendar_assignments")
+            conn.exec_driver_sql(
+                "CREATE TABLE calendar_assignments (id INTEGER PRIMARY KEY, instance_id INTEGER NOT NULL,"
+                " volunteer_id INTEGER NOT NULL, role VARCHAR(20) NOT NULL, created_at TIMESTAMP)"
+            )
+            conn.exec_driver_sql("CREATE INDEX idx_ca_instance_role ON calendar_assignments (instance_id, role)")
+    return engine
+
+
+def _seed_calendar(
+    conn, instances: int, volunteers: int, start: date, rng: random.Random, days: int = 730,
+    duplicates: float = 0.0,
+) -> None:
+    """
+    Voluntarios e instancias repartidas parejo en `days` días desde `start`, con coordinador
+    casi siempre. Una fracción `duplicates` de las instancias recibe dos filas más por rol
+    (requiere _bench_engine(unique_roles=False)).
+    """
+    from sqlalchemy import text
+
+    conn.execute(
+        text("INSERT INTO voluntarios (id, name, last_name, registration_date, status, is_admin)"
+             " VALUES (:id, :name, :last_name, :day, 'activo', 0)"),
+        [{"id": v, "name": f"Vol{v}", "last_name": f"Apellido{v}", "day": start} for v in range(1, volunteers + 1)],
+    )
+    per_day = max(1, -(-instances // days))
+    rows, assignments = [], []
+    for i in range(1, instances + 1):
+        hour = 8 + (i % per_day) % 12
+        rows.append({
+            "id": i,
+            "type": "taller" if i % 2 else "grupo",
+            "source_id": i % 40,
+            "date": start + timedelta(days=(i - 1) // per_day),
+            "start": f"{hour:02d}:00:00",
+            "end": f"{hour + 1:02d}:30:00",
+        })
+        if rng.random() < 0.9:
+            assignments.append({"instance_id": i, "volunteer_id": rng.randint(1, volunteers), "role": "coordinator"})
+        if rng.random() < 0.6:
+            assignments.append({"instance_id": i, "volunteer_id": rng.randint(1, volunteers), "role": "co_coordinator"})
+        if rng.random() < duplicates:
+            for role in ("coordinator", "co_coordinator", "coordinator", "co_coordinator"):
+                assignments.append({"instance_id": i, "volunteer_id": rng.randint(1, volunteers), "role": role})
+    conn.execute(
+        text("INSERT INTO calendar_instances (id, type, source_id, date, start_time, end_time, status)"
+             " VALUES (:id, :type, :source_id, :date, :start, :end, 'programado')"),
+        rows,
+    )
+    conn.execute(
+        text("INSERT INTO calendar_assignments (instance_id, volunteer_id, role)"
+             " VALUES (:instance_id, :volunteer_id, :role)"),
+        assignments,
+    )
+
+
+# Consulta de /calendar/instances-rich antes del pase único: dos JOIN por rol y YEAR()/MONTH()
+_LEGACY_RICH_SQL = """
+    SELECT
+        ci.id, ci.type, ci.source_id, ci.date, ci.start_time, ci.end_time, ci.notes, ci.status,
+        coord_v.id   AS coord_id,   coord_v.name   AS coord_name,   coord_v.last_name AS coord_last,
+        cocoord_v.id AS cocoord_id, cocoord_v.name AS cocoord_name, cocoord_v.last_name AS cocoord_last
+    FROM calendar_instances ci
+    LEFT JOIN calendar_assignments coord_ca
+        ON coord_ca.instance_id = ci.id AND coord_ca.role = 'coordinator'
+    LEFT JOIN voluntarios coord_v ON coord_v.id = coord_ca.volunteer_id
+    LEFT JOIN calendar_assignments cocoord_ca
+        ON cocoord_ca.instance_id = ci.id AND cocoord_ca.role = 'co_coordinator'
+    LEFT JOIN voluntarios cocoord_v ON cocoord_v.id = cocoord_ca.volunteer_id
+    WHERE YEAR(ci.date) = :year AND MONTH(ci.date) = :month
+"""
+
+
+def bench_calendar_rich(args: argparse.Namespace) -> int:
+    """
+    /calendar/instances-rich mes por mes sobre una base sembrada: la consulta vieja (JOIN
+    doble por rol, YEAR()/MONTH(), filtro de voluntario después del JOIN) contra el pase
+    único actual (rango semiabierto sobre el índice y coordinadores en una consulta por ids).
+
+    Corre dos veces: con el esquema actual (clave única por rol, una fila por rol) y sin esa
+    clave, con una fracción --duplicates de instancias con tres filas por rol, que es el
+    caso en que el JOIN doble multiplica filas (3 × 3 por instancia) y repite instancias en
+    la respuesta. El pase único trae de SQL una fila por instancia más una por asignación,
+    así que trae más filas (más angostas) que el JOIN en los dos casos: lo que mejora es el
+    tiempo y que la respuesta tiene una fila por instancia. Los tiempos son de SQLite, no
+    de MySQL.
+    """
+    print(f"{args.instances} instancias, {args.volunteers} voluntarios, {args.repeat} repeticiones (SQLite en memoria)")
+    for label, duplicates in (("con clave única por rol", 0.0), (f"sin clave única, {args.duplicates:.0%} duplicadas", args.duplicates)):
+        print(label)
+        status = _bench_calendar_rich_dataset(args, duplicates)
+        if status:
+            return status
+    return 0
+
+
+def _bench_calendar_rich_dataset(args: argparse.Namespace, duplicates: float) -> int:
+    from sqlalchemy import bindparam, text
+    from sqlalchemy.orm import Session
+
+    from app.routers.calendar import _date_window, _fmt_time, _read_rich_from_instances, _rich_filters
+
+    engine = _bench_engine(unique_roles=not duplicates)
+    start = date(2024, 1, 1)
+    with engine.begin() as conn:
+        _seed_calendar(conn, args.instances, args.volunteers, start, random.Random(42), duplicates=duplicates)
+    db = Session(bind=engine)
+    year = start.year + 1
+    volunteer_ids = list(range(1, min(args.volunteers, 5) + 1))
+
+    def legacy(month, volunteer_id=None):
+        sql, params = _LEGACY_RICH_SQL, {"year": year, "month": month}
+        if volunteer_id is not None:
+            sql += " AND (coord_ca.volunteer_id = :vol_id OR cocoord_ca.volunteer_id = :vol_id)"
+            params["vol_id"] = volunteer_id
+        rows = db.execute(text(sql + " ORDER BY ci.date ASC, ci.start_time ASC, coord_ca.id, cocoord_ca.id"), params).fetchall()
+        result = [
+            {
+                "id": row.id,
+                "type": row.type,
+                "source_id": row.source_id,
+                "date": str(row.date),
+                "start_time": _fmt_time(row.start_time),
+                "end_time": _fmt_time(row.end_time),
+                "notes": row.notes,
+                "status": row.status,
+                "coordinator": {"id": row.coord_id, "name": row.coord_name, "last_name": row.coord_last or ""}
+                    if row.coord_id else None,
+                "co_coordinator": {"id": row.cocoord_id, "name": row.cocoord_name, "last_name": row.cocoord_last or ""}
+                    if row.cocoord_id else None,
+            }
+            for row in rows
+        ]
+        return result
+
+    def single_pass(month, volunteer_id=None):
+        clauses, params = _rich_filters(*_date_window(year, month), None, volunteer_id)
+        return _read_rich_from_instances(db, clauses, params)
+
+    count_assigned = text(
+        "SELECT COUNT(*) FROM calendar_assignments WHERE instance_id IN :ids"
+        " AND role IN ('coordinator', 'co_coordinator')"
+    ).bindparams(bindparam("ids", expanding=True))
+
+    def sql_rows(name, result):
+        if name == "JOIN doble":
+            return len(result)
+        # Una fila por instancia más una por asignación en la segunda consulta
+        ids = [r["id"] for r in result]
+        return len(ids) + sum(
+            db.execute(count_assigned, {"ids": ids[i:i + 1000]}).scalar() for i in range(0, len(ids), 1000)
+        )
+
+    def first_per_instance(result):
+        # El pase único se queda con la fila de menor id por rol; el JOIN la trae primero
+        seen = {}
+        for r in result:
+            seen.setdefault(r["id"], (r["coordinator"], r["co_coordinator"]))
+        return seen
+
+    cases = [(m, None) for m in range(1, 13)] + [(m, v) for v in volunteer_ids for m in (3, 9)]
+    for month, volunteer_id in cases:
+        if volunteer_id is not None and duplicates:
+            # Con duplicados el JOIN filtra por las filas que casan, no por la primera de cada rol
+            old = {r["id"] for r in legacy(month, volunteer_id)}
+            new = {r["id"] for r in single_pass(month, volunteer_id)}
+        else:
+            old = first_per_instance(legacy(month, volunteer_id))
+            new = first_per_instance(single_pass(month, volunteer_id))
+        if old != new:
+            print(f"Las salidas difieren (mes {month}, voluntario {volunteer_id})", file=sys.stderr)
+            return 1
+
+    for label, filtered in (("mes completo", False), ("por voluntario", True)):
+        selected = [c for c in cases if (c[1] is not None) == filtered]
+        print(f"  {label} ({len(selected)} consultas)")
+        for name, fn in (("JOIN doble", legacy), ("pase único", single_pass)):
+            best = min(_timed(lambda: [fn(*c) for c in selected]) for _ in range(args.repeat))
+            outputs = [fn(*c) for c in selected]
+            fetched = sum(sql_rows(name, r) for r in outputs)
+            returned = sum(len(r) for r in outputs)
+            instances = sum(len({x["id"] for x in r}) for r in outputs)
+            print(f"    {name:<12} {best * 1000 / len(selected):8.2f} ms/consulta  {fetched:7d} filas de SQL"
+                  f"  {returned:7d} filas en la respuesta ({instances} instancias)")
+    db.close()
+    return 0
+
+
+def bench_participant_counts(args: argparse.Namespace) -> int:
+    """
+    Badges de participantes de un mes: la vista rica más un GET
+    /calendar/instances/{id}/participants por evento, contra una sola llamada con
+    include_participant_counts=True. Pasa por la API completa (TestClient).
+    """
+    from fastapi.testclient import TestClient
+    from sqlalchemy import text
+    from sqlalchemy.orm import sessionmaker
+
+    from app.database import get_db
+    from app.deps import verify_api_key
+    from app.main import app
+
+    engine = _bench_engine()
+    rng = random.Random(42)
+    start = date(2025, 3, 1)
+    statuses = ("inscripto", "inscripto", "asistio", "cancelado")
+    with engine.begin() as conn:
+        _seed_calendar(conn, args.events, 20, start, rng, days=30)
+        conn.execute(
+            text("INSERT INTO participants (id, email, is_active) VALUES (:id, :email, 1)"),
+            [{"id": p, "email": f"p{p}@example.com"} for p in range(1, args.participants + 1)],
+        )
+        conn.execute(
+            text("INSERT INTO calendar_event_participants (event_id, participant_id, status)"
+                 " VALUES (:event_id, :participant_id, :status)"),
+            [
+                {"event_id": e, "participant_id": p, "status": rng.choice(statuses)}
+                for e in range(1, args.events + 1)
+                for p in rng.sample(range(1, args.participants + 1), rng.randint(0, min(30, args.participants)))
+            ],
+        )
+
+    factory = sessionmaker(bind=engine, autoflush=False)
+
+    def override_get_db():
+        db = factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[verify_api_key] = lambda: None
+    client = TestClient(app)
+    month = {"year": start.year, "month": start.month}
+
+    def per_event():
+        counts = {}
+        for instance in client.get("/calendar/instances-rich", params=month).json():
+            c = {"inscripto": 0, "cancelado": 0, "asistio": 0}
+            for p in client.get(f"/calendar/instances/{instance['id']}/participants").json():
+                c[p["status"]] += 1
+            counts[instance["id"]] = c
+        return counts
+
+    def grouped():
+        rows = client.get("/calendar/instances-rich", params={**month, "include_participant_counts": True}).json()
+        return {r["id"]: r["participant_counts"] for r in rows}
+
+    try:
+        if per_event() != grouped():
+            print("Los conteos difieren", file=sys.stderr)
+            return 1
+        print(f"{args.events} eventos en el mes, {args.repeat} repeticiones (SQLite en memoria, TestClient)")
+        for label, fn, calls in (
+            ("una llamada por evento", per_event, args.events + 1),
+            ("include_participant_counts", grouped, 1),
+        ):
+            best = min(_timed(fn) for _ in range(args.repeat))
+            print(f"  {label:<28} {best * 1000:8.2f} ms  {calls:4d} llamadas HTTP")
+    finally:
+        app.dependency_overrides.clear()
+    return 0
+
+
+def bench_conflicts(args: argparse.Namespace) -> int:
+    """
+    Detección de superposiciones sobre un mes sintético: recorrer todas las asignaciones
+    (chequeo de una asignación nueva y reporte de pares) contra el índice de intervalos
+    de app/services/conflicts.py.
+    """
+    from sqlalchemy import text
+    from sqlalchemy.orm import Session
+
+    from app.services.conflicts import VolunteerIntervalIndex, interval_for
+
+    engine = _bench_engine()
+    rng = random.Random(42)
+    start = date(2025, 3, 1)
+    with engine.begin() as conn:
+        _seed_calendar(conn, args.instances, args.volunteers, start, rng, days=31)
+    db = Session(bind=engine)
+    rows = db.execute(text("""
+        SELECT ca.volunteer_id, ca.instance_id, ci.date, ci.start_time, ci.end_time
+        FROM calendar_assignments ca JOIN calendar_instances ci ON ci.id = ca.instance_id
+    """)).fetchall()
+    assignments = [(r.volunteer_id, *interval_for(r.date, r.start_time, r.end_time), r.instance_id) for r in rows]
+    index = VolunteerIntervalIndex()
+    index.ensure_loaded(db)
+    checks = [
+        (rng.randint(1, args.volunteers), interval_for(start + timedelta(days=rng.randrange(31)), f"{h:02d}:00", f"{h + 2:02d}:00"))
+        for h in (rng.randint(8, 19) for _ in range(args.checks))
+    ]
+    lo, _ = interval_for(start, "00:00", "00:00")
+    hi, _ = interval_for(start + timedelta(days=31), "00:00", "00:00")
+
+    def naive_check():
+        return [
+            sorted({iid for v, s, e, iid in assignments if v == volunteer_id and e > interval[0] and s < interval[1]})
+            for volunteer_id, interval in checks
+        ]
+
+    def indexed_check():
+        return [sorted(index.find_conflicts(db, volunteer_id, interval)) for volunteer_id, interval in checks]
+
+    def naive_report():
+        pairs = set()
+        for i, (v, s, e, iid) in enumerate(assignments):
+            for w, s2, e2, iid2 in assignments[i + 1:]:
+                if v == w and iid != iid2 and s < e2 and s2 < e:
+                    pairs.add((v, min(iid, iid2), max(iid, iid2)))
+        return pairs
+
+    def indexed_report():
+        return {(v, min(a[2], b[2]), max(a[2], b[2])) for v, a, b in index.overlaps(db, lo, hi)}
+
+    if naive_check() != indexed_check() or naive_report() != indexed_report():
+        print("Los resultados difieren", file=sys.stderr)
+        return 1
+
+    print(f"{len(assignments)} asignaciones en el mes, {args.volunteers} voluntarios, {args.repeat} repeticiones")
+    for label, naive, indexed, per in (
+        ("chequeo de asignación", naive_check, indexed_check, args.checks),
+        ("reporte de superposiciones", naive_report, indexed_report, 1),
+    ):
+        unit, scale = ("µs/chequeo", 1e6 / per) if per > 1 else ("ms", 1e3)
+        print(f"  {label}")
+        for name, fn in (("recorrido", naive), ("índice", indexed)):
+            best = min(_timed(fn) for _ in range(args.repeat))
+            print(f"    {name:<10} {best * scale:10.2f} {unit}")
+    db.close()
+    return 0
+
+
+def _timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rebuild = commands.add_parser(
+        "rebuild-calendar-read-model",
+        help="Regenera calendar_instances_rich (modelo de lectura de la vista mensual)",
+    )
+    rebuild.add_argument("--batch-size", type=int, default=calendar_read_model.IN_CHUNK_SIZE)
+    rebuild.set_defaults(func=rebuild_calendar_read_model)
+
+    bench = commands.add_parser(
+        "bench-calendar-serialization",
+        help="Mide el costo por fila de serializar la vista rica, con y sin fast=True",
+    )
+    bench.add_argument("--rows", type=int, default=5000)
+    bench.add_argument("--repeat", type=int, default=5)
+    bench.set_defaults(func=bench_calendar_serialization)
+
+    bench_rich = commands.add_parser(
+        "bench-calendar-rich",
+        help="Compara la consulta vieja de la vista rica con el pase único sobre datos sembrados",
+    )
+    bench_rich.add_argument("--instances", type=int, default=50000)
+    bench_rich.add_argument("--volunteers", type=int, default=300)
+    bench_rich.add_argument("--duplicates", type=float, default=0.2,
+                            help="Fracción de instancias con tres filas por rol en la segunda corrida")
+    bench_rich.add_argument("--repeat", type=int, default=3)
+    bench_rich.set_defaults(func=bench_calendar_rich)
+
+    bench_counts = commands.add_parser(
+        "bench-participant-counts",
+        help="Compara una llamada de participantes por evento con include_participant_counts",
+    )
+    bench_counts.add_argument("--events", type=int, default=60)
+    bench_counts.add_argument("--participants", type=int, default=400)
+    bench_counts.add_argument("--repeat", type=int, default=5)
+    bench_counts.set_defaults(func=bench_participant_counts)
+
+    bench_conf = commands.add_parser(
+        "bench-conflicts",
+        help="Compara el recorrido de todas las asignaciones con el índice de intervalos en un mes sintético",
+    )
+    bench_conf.add_argument("--instances", type=int, default=3000)
+    bench_conf.add_argument("--volunteers", type=int, default=200)
+    bench_conf.add_argument("--checks", type=int, default=2000)
+    bench_conf.add_argument("--repeat", type=int, default=3)
+    bench_conf.set_defaults(func=bench_conflicts)
+
+    purge = commands.add_parser(
+        "purge-login-events",
+        help="Resume por día y borra los eventos de login más viejos que la retención",
+    )
+    purge.add_argument("--days", type=int, default=None, help="LOGIN_EVENTS_RETENTION_DAYS si se omite")
+    purge.add_argument("--batch-size", type=int, default=None, help="LOGIN_EVENTS_PURGE_BATCH_SIZE si se omite")
+    purge.set_defaults(func=purge_login_events)
+
+    sweep = commands.add_parser(
+        "sweep-auth-tokens",
+        help="Borra tokens de verificación y de reseteo y sesiones vencidos, usados o revocados",
+    )
+    sweep.add_argument("--batch-size", type=int, default=None, help="AUTH_SWEEP_BATCH_SIZE si se omite")
+    sweep.add_argument("--max-batches", type=int, default=None, help="AUTH_SWEEP_MAX_BATCHES si se omite")
+    sweep.set_defaults(func=sweep_auth_tokens)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,5 @@
-from sqlalchemy import create_engine
+from sqlalchemy import TIMESTAMP, create_engine
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 from config import settings
 
@@ -15,6 +16,17 @@ class Base(DeclarativeBase):
     pass
 
 
+# TIMESTAMP para las columnas que ordenan cursores (app/pagination.py). En MySQL es el
+# TIMESTAMP de siempre, con resolución de segundos. SQLite (pruebas) compara las fechas
+# como texto: se guardan también sin microsegundos, en el mismo formato que
+# CURRENT_TIMESTAMP, para que los valores escritos por la app, los del default del
+# servidor y los de un cursor comparen bien entre sí.
+CursorTimestamp = TIMESTAMP().with_variant(
+    sqlite.DATETIME(storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"),
+    "sqlite",
+)
+
+
 def get_db():
     db = SessionLocal()
     try:
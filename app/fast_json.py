@@ -0,0 +1,27 @@
+"""
+Serialización directa a bytes JSON para respuestas grandes cuyas filas ya tienen la forma
+del response_model (se arman en el router a partir de columnas de la base). Evita la
+validación de Pydantic fila por fila que FastAPI hace con response_model.
+
+Usa orjson si está instalado y, si no, json de la biblioteca estándar con la misma salida
+compacta.
+"""
+import json
+from typing import Any
+
+from fastapi import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson es opcional
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def json_response(content: Any, status_code: int = 200) -> Response:
+    return Response(content=dumps(content), status_code=status_code, media_type="application/json")
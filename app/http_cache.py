@@ -0,0 +1,40 @@
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+
+# Los clientes deben revalidar siempre: el ETag ahorra la consulta y el cuerpo, no la petición.
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts) -> str:
+    """ETag fuerte a partir de una huella barata de los datos (conteos, max(updated_at), filtros)."""
+    digest = hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()[:32]
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Comparación débil de If-None-Match (RFC 9110): acepta listas, '*' y prefijo W/."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """Devuelve un 304 listo para retornar si el cliente ya tiene esta versión, o None."""
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+    return None
+
+
+def set_etag(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
@@ -1,4 +1,6 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from datetime import datetime, timezone
 from config import settings
@@ -19,6 +21,18 @@ from app.routers import (
     register,
     ideas,
 )
+from app.services import auth_sweeper, login_events
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    login_events.buffer.start()
+    auth_sweeper.sweeper.start()
+    yield
+    await run_in_threadpool(auth_sweeper.sweeper.stop)
+    # Escribe los eventos de login que quedaban en cola antes de cerrar
+    await run_in_threadpool(login_events.buffer.stop)
+
 
 app = FastAPI(
     title="ALMA Platform API",
@@ -28,6 +42,7 @@ app = FastAPI(
     docs_url=None if not settings.API_RELOAD else "/docs",
     redoc_url=None if not settings.API_RELOAD else "/redoc",
     openapi_url=None if not settings.API_RELOAD else "/openapi.json",
+    lifespan=lifespan,
 )
 
 # CORS: solo orígenes explícitos. Con allow_origins específicos, allow_credentials=True es seguro.
@@ -36,7 +51,8 @@ app.add_middleware(
     allow_origins=settings.cors_origins_list,
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-    allow_headers=["Content-Type", "X-API-Key"],
+    allow_headers=["Content-Type", "X-API-Key", "If-None-Match"],
+    expose_headers=["ETag", "X-Calendar-Conflicts", "X-Next-Cursor"],
 )
 
 # Todos los routers requieren la API key interna (dependencia global)
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, TIMESTAMP, ForeignKey
-from app.database import Base
+from sqlalchemy import Column, Integer, String, Date, DateTime, Boolean, TIMESTAMP, ForeignKey, Index
+from app.database import Base, CursorTimestamp
 
 
 class AuthUser(Base):
@@ -21,6 +21,10 @@ class AuthUser(Base):
 
 class EmailVerificationToken(Base):
     __tablename__ = "email_verification_tokens"
+    __table_args__ = (
+        Index("idx_email_verification_tokens_expires", "expires_at"),
+        Index("idx_email_verification_tokens_used", "used_at"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     auth_user_id = Column(Integer, ForeignKey("auth_users.id", ondelete="CASCADE"), nullable=False)
@@ -40,11 +44,25 @@ class AuthLoginEvent(Base):
     failure_reason = Column(String(100))
     ip_address = Column(String(45))
     user_agent = Column(String(255))
-    created_at = Column(TIMESTAMP)
+    created_at = Column(CursorTimestamp)
+
+
+class AuthLoginDailyStat(Base):
+    __tablename__ = "auth_login_daily_stats"
+
+    day = Column(Date, primary_key=True)
+    email = Column(String(150), primary_key=True)
+    auth_user_id = Column(Integer, ForeignKey("auth_users.id", ondelete="SET NULL"), nullable=True)
+    success_count = Column(Integer, nullable=False, default=0)
+    failure_count = Column(Integer, nullable=False, default=0)
 
 
 class AuthSession(Base):
     __tablename__ = "auth_sessions"
+    __table_args__ = (
+        Index("idx_auth_sessions_expires", "expires_at"),
+        Index("idx_auth_sessions_revoked", "revoked_at"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     auth_user_id = Column(Integer, ForeignKey("auth_users.id", ondelete="CASCADE"), nullable=False)
@@ -58,6 +76,10 @@ class AuthSession(Base):
 
 class PasswordResetToken(Base):
     __tablename__ = "password_reset_tokens"
+    __table_args__ = (
+        Index("idx_password_reset_tokens_expires", "expires_at"),
+        Index("idx_password_reset_tokens_used", "used_at"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     auth_user_id = Column(Integer, ForeignKey("auth_users.id", ondelete="CASCADE"), nullable=False)
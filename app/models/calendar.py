@@ -1,9 +1,14 @@
-from sqlalchemy import Column, Integer, String, Date, Time, Text, TIMESTAMP, ForeignKey
+from sqlalchemy import Column, Integer, String, Date, Time, Text, JSON, TIMESTAMP, ForeignKey, Index, UniqueConstraint
 from app.database import Base
 
 
 class CalendarInstance(Base):
     __tablename__ = "calendar_instances"
+    __table_args__ = (
+        Index("idx_calendar_instances_date_start", "date", "start_time"),
+        Index("idx_calendar_instances_type_source_date", "type", "source_id", "date"),
+        UniqueConstraint("recurrence_id", "recurrence_date", name="uq_calendar_instances_recurrence"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     type = Column(String(20), nullable=False)
@@ -13,12 +18,40 @@ class CalendarInstance(Base):
     end_time = Column(Time, nullable=False)
     notes = Column(Text)
     status = Column(String(20), nullable=False, default="programado")
+    # Ocurrencia materializada de una regla: regla y fecha original de la ocurrencia
+    recurrence_id = Column(Integer, ForeignKey("calendar_recurrences.id", ondelete="SET NULL"))
+    recurrence_date = Column(Date)
+    created_at = Column(TIMESTAMP)
+    updated_at = Column(TIMESTAMP)
+
+
+class CalendarRecurrence(Base):
+    """Regla de recurrencia: sus ocurrencias se proyectan al leer y solo se guardan al editarlas."""
+    __tablename__ = "calendar_recurrences"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    type = Column(String(20), nullable=False)
+    source_id = Column(Integer)
+    start_date = Column(Date, nullable=False)
+    start_time = Column(Time, nullable=False)
+    end_time = Column(Time, nullable=False)
+    freq = Column(String(10), nullable=False, default="weekly")
+    repeat_interval = Column(Integer, nullable=False, default=1)
+    weekday = Column(Integer)  # 0=lunes … 6=domingo; solo para freq 'weekly'
+    until_date = Column(Date)
+    max_count = Column(Integer)
+    exdates = Column(JSON)  # fechas ISO excluidas de la serie
+    notes = Column(Text)
+    status = Column(String(20), nullable=False, default="programado")
     created_at = Column(TIMESTAMP)
     updated_at = Column(TIMESTAMP)
 
 
 class CalendarAssignment(Base):
     __tablename__ = "calendar_assignments"
+    __table_args__ = (
+        UniqueConstraint("instance_id", "role", name="uq_calendar_assignments_instance_role"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     instance_id = Column(Integer, ForeignKey("calendar_instances.id", ondelete="CASCADE"), nullable=False)
@@ -30,6 +63,9 @@ class CalendarAssignment(Base):
 
 class CalendarEventParticipant(Base):
     __tablename__ = "calendar_event_participants"
+    __table_args__ = (
+        UniqueConstraint("event_id", "participant_id", name="uq_calendar_event_participants_event_participant"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     event_id = Column(Integer, ForeignKey("calendar_instances.id", ondelete="CASCADE"), nullable=False)
@@ -37,3 +73,30 @@ class CalendarEventParticipant(Base):
     status = Column(String(20), nullable=False, default="inscripto")
     created_at = Column(TIMESTAMP)
     updated_at = Column(TIMESTAMP)
+
+
+class CalendarInstanceReadModel(Base):
+    """Proyección desnormalizada de calendar_instances + coordinadores (ver services/calendar_read_model)."""
+    __tablename__ = "calendar_instances_rich"
+    __table_args__ = (
+        Index("idx_calendar_instances_rich_date_start", "date", "start_time"),
+        Index("idx_calendar_instances_rich_coordinator", "coordinator_id", "date"),
+        Index("idx_calendar_instances_rich_co_coordinator", "co_coordinator_id", "date"),
+    )
+
+    instance_id = Column(Integer, ForeignKey("calendar_instances.id", ondelete="CASCADE"), primary_key=True)
+    recurrence_id = Column(Integer)
+    type = Column(String(20), nullable=False)
+    source_id = Column(Integer)
+    date = Column(Date, nullable=False)
+    start_time = Column(Time, nullable=False)
+    end_time = Column(Time, nullable=False)
+    notes = Column(Text)
+    status = Column(String(20), nullable=False)
+    coordinator_id = Column(Integer)
+    coordinator_name = Column(String(100))
+    coordinator_last_name = Column(String(100))
+    co_coordinator_id = Column(Integer)
+    co_coordinator_name = Column(String(100))
+    co_coordinator_last_name = Column(String(100))
+    updated_at = Column(TIMESTAMP)
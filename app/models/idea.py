@@ -1,17 +1,22 @@
-from sqlalchemy import Column, Integer, String, Text, TIMESTAMP, ForeignKey, func
+from sqlalchemy import Column, Integer, String, Text, TIMESTAMP, ForeignKey, Index, func
 from sqlalchemy.orm import relationship
-from app.database import Base
+from app.database import Base, CursorTimestamp
 
 
 class Idea(Base):
     __tablename__ = "ideas"
+    __table_args__ = (
+        Index("ft_ideas_title_body", "title", "body", mysql_prefix="FULLTEXT"),
+        Index("idx_ideas_created_id", "created_at", "id"),
+        Index("idx_ideas_category_created_id", "category", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     title = Column(String(255), nullable=False)
     body = Column(Text, nullable=False)
     category = Column(String(100), nullable=True)
     created_by_volunteer_id = Column(Integer, ForeignKey("voluntarios.id", ondelete="CASCADE"), nullable=False)
-    created_at = Column(TIMESTAMP, server_default=func.now())
+    created_at = Column(CursorTimestamp, server_default=func.now())
     updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
 
     created_by = relationship("Voluntario", foreign_keys=[created_by_volunteer_id], lazy="joined")
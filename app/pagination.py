@@ -0,0 +1,48 @@
+"""
+Cursores opacos para paginación por clave (keyset) sobre (created_at, id).
+
+El cursor es la posición de la última fila entregada, en base64 url-safe. La página
+siguiente filtra por "después de esa fila" en lugar de usar OFFSET, así que con un índice
+sobre (created_at, id) llegar a una página profunda no cuesta más que llegar a la primera;
+lo que la consulta calcule por fila (conteos, JOIN) tiene que limitarse a las filas de la
+página para que eso siga valiendo.
+
+created_at se compara con el tipo de la columna: las columnas de cursores usan
+database.CursorTimestamp, que en SQLite guarda el mismo formato que el cursor.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(created_at: Optional[datetime], id: int) -> str:
+    raw = json.dumps([created_at.isoformat() if created_at else None, id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> Tuple[Optional[datetime], int]:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        created_at, id = json.loads(raw)
+        return (datetime.fromisoformat(created_at) if created_at else None), int(id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+
+def after(created_col, id_col, token: str, descending: bool):
+    """Condición 'fila posterior al cursor' en el orden (created_at, id) indicado."""
+    created_at, id = decode_cursor(token)
+    if created_at is None:
+        # Filas sin fecha: en MySQL los NULL van primero en ASC y últimos en DESC
+        if descending:
+            return and_(created_col.is_(None), id_col < id)
+        return or_(and_(created_col.is_(None), id_col > id), created_col.isnot(None))
+    if descending:
+        return or_(created_col < created_at, and_(created_col == created_at, id_col < id), created_col.is_(None))
+    return or_(created_col > created_at, and_(created_col == created_at, id_col > id))
@@ -1,22 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 from typing import List, Optional
+from datetime import date
 
 from app.database import get_db
+from app.pagination import NEXT_CURSOR_HEADER, after, encode_cursor
 from app.models.auth import (
     AuthUser as AuthUserModel,
     EmailVerificationToken as EVTModel,
     AuthLoginEvent as ALEModel,
+    AuthLoginDailyStat as ALDSModel,
     AuthSession as AuthSessionModel,
     PasswordResetToken as PRTModel,
 )
 from app.schemas.auth import (
     AuthUser, AuthUserCreate, AuthUserUpdate,
     EmailVerificationToken, EmailVerificationTokenCreate,
-    AuthLoginEvent, AuthLoginEventCreate,
-    AuthSession, AuthSessionCreate, AuthSessionUpdate,
+    AuthLoginEvent, AuthLoginEventCreate, AuthLoginDailyStat, LoginEventsPurgeResult,
+    AuthSession, AuthSessionCreate, AuthSessionUpdate, ResolvedSession,
     PasswordResetToken, PasswordResetTokenCreate,
 )
+from app.services import auth_sweeper, login_events, login_retention, session_cache
 
 router = APIRouter()
 
@@ -66,10 +71,13 @@ def update_auth_user(id: int, data: AuthUserUpdate, db: Session = Depends(get_db
     u = db.query(AuthUserModel).filter(AuthUserModel.id == id).first()
     if not u:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
-    for key, value in data.model_dump(exclude_unset=True).items():
+    changes = data.model_dump(exclude_unset=True)
+    for key, value in changes.items():
         setattr(u, key, value)
     db.commit()
     db.refresh(u)
+    if changes.get("is_active") is False:
+        session_cache.cache.invalidate_user(id)
     return u
 
 
@@ -80,6 +88,7 @@ def delete_auth_user(id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
     db.delete(u)
     db.commit()
+    session_cache.cache.invalidate_user(id)
 
 
 # ── Email Verification Tokens ─────────────────────────────────────────
@@ -117,18 +126,33 @@ def mark_verification_token_used(id: int, db: Session = Depends(get_db)):
 
 @router.get("/login-events", response_model=List[AuthLoginEvent])
 def list_login_events(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     auth_user_id: Optional[int] = Query(None),
     success: Optional[bool] = Query(None),
+    cursor: Optional[str] = Query(None),
     db: Session = Depends(get_db),
 ):
+    """
+    Eventos del más nuevo al más viejo. Si hay más, X-Next-Cursor trae el cursor de la
+    página siguiente; pasarlo en cursor (en lugar de skip) pagina por clave sin OFFSET.
+    """
     q = db.query(ALEModel)
     if auth_user_id is not None:
         q = q.filter(ALEModel.auth_user_id == auth_user_id)
     if success is not None:
         q = q.filter(ALEModel.success == success)
-    return q.order_by(ALEModel.created_at.desc()).offset(skip).limit(limit).all()
+    q = q.order_by(ALEModel.created_at.desc(), ALEModel.id.desc())
+    if cursor is not None:
+        q = q.filter(after(ALEModel.created_at, ALEModel.id, cursor, descending=True))
+    else:
+        q = q.offset(skip)
+    events = q.limit(limit + 1).all()
+    if len(events) > limit:
+        events = events[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(events[-1].created_at, events[-1].id)
+    return events
 
 
 @router.post("/login-events", response_model=AuthLoginEvent, status_code=201)
@@ -140,6 +164,70 @@ def create_login_event(data: AuthLoginEventCreate, db: Session = Depends(get_db)
     return e
 
 
+@router.post("/login-events/async", status_code=202)
+def create_login_event_async(data: AuthLoginEventCreate, db: Session = Depends(get_db)):
+    """
+    Registra un evento de login sin esperar la escritura: se encola y un hilo de fondo lo
+    inserta por lotes. Si es un login exitoso, también actualiza last_login_* del usuario,
+    así que no hace falta el PUT /auth/users/{id} posterior.
+
+    Si la cola está llena (o el escritor no está corriendo) se escribe en el momento y
+    status es "written" en lugar de "queued".
+    """
+    event = login_events.new_event(data.model_dump())
+    if login_events.buffer.submit(event):
+        return {"status": "queued"}
+    login_events.write_events(db, [event])
+    db.commit()
+    return {"status": "written"}
+
+
+@router.get("/login-events/buffer-stats")
+def get_login_events_buffer_stats():
+    """Contadores de la cola de escritura diferida de eventos de login de este proceso."""
+    return login_events.buffer.stats()
+
+
+@router.post("/login-events/purge", response_model=LoginEventsPurgeResult)
+def purge_login_events(
+    days: Optional[int] = Query(None, ge=1),
+    batch_size: Optional[int] = Query(None, ge=1, le=50000),
+    db: Session = Depends(get_db),
+):
+    """
+    Resume en auth_login_daily_stats y borra los eventos con más de `days` días
+    (LOGIN_EVENTS_RETENTION_DAYS si no se indica). Lo mismo que
+    python -m app.cli purge-login-events, para dispararlo desde un cron externo.
+    """
+    try:
+        return login_retention.run(db, days=days, batch_size=batch_size)
+    except login_retention.PartitioningError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+
+
+@router.get("/login-stats/daily", response_model=List[AuthLoginDailyStat])
+def list_login_daily_stats(
+    skip: int = 0,
+    limit: int = 100,
+    auth_user_id: Optional[int] = Query(None),
+    email: Optional[str] = Query(None),
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+    db: Session = Depends(get_db),
+):
+    """Logins exitosos y fallidos por día y email de los eventos ya depurados."""
+    q = db.query(ALDSModel)
+    if auth_user_id is not None:
+        q = q.filter(ALDSModel.auth_user_id == auth_user_id)
+    if email is not None:
+        q = q.filter(ALDSModel.email == email)
+    if date_from is not None:
+        q = q.filter(ALDSModel.day >= date_from)
+    if date_to is not None:
+        q = q.filter(ALDSModel.day <= date_to)
+    return q.order_by(ALDSModel.day.desc(), ALDSModel.email).offset(skip).limit(limit).all()
+
+
 # ── Auth Sessions ─────────────────────────────────────────────────────
 
 @router.get("/sessions", response_model=List[AuthSession])
@@ -161,15 +249,93 @@ def create_session(data: AuthSessionCreate, db: Session = Depends(get_db)):
     db.add(s)
     db.commit()
     db.refresh(s)
+    # Puede haber quedado en la caché negativa si alguien consultó el hash antes
+    session_cache.cache.invalidate(s.session_token_hash)
     return s
 
 
+@router.get("/sessions/cache-stats")
+def get_session_cache_stats():
+    """Aciertos, fallos, desalojos e invalidaciones de la caché de sesiones de este proceso."""
+    return session_cache.cache.stats()
+
+
+_RESOLVE_SESSION_SQL = text("""
+    SELECT s.id, s.auth_user_id, s.session_token_hash, s.expires_at, s.revoked_at,
+           s.ip_address, s.user_agent, s.created_at,
+           u.email, u.is_active, u.email_verified, u.is_volunteer, u.volunteer_id,
+           v.name AS v_name, v.last_name AS v_last_name, v.status AS v_status, v.is_admin AS v_is_admin,
+           p.id AS p_id, p.is_active AS p_is_active, pp.name AS p_name, pp.last_name AS p_last_name
+    FROM auth_sessions s
+    JOIN auth_users u ON u.id = s.auth_user_id
+    LEFT JOIN voluntarios v ON v.id = u.volunteer_id
+    LEFT JOIN participants p ON p.email = u.email
+    LEFT JOIN participant_profiles pp ON pp.participant_id = p.id
+    WHERE s.session_token_hash = :token_hash
+      AND s.revoked_at IS NULL
+      AND s.expires_at > :now
+""")
+
+
+@router.get("/sessions/resolve/{token_hash}", response_model=ResolvedSession)
+def resolve_session(token_hash: str, db: Session = Depends(get_db)):
+    """
+    Sesión, usuario y voluntario o participante vinculado en una sola consulta, por los
+    índices únicos de session_token_hash, auth_users.id y participants.email. Las sesiones
+    vencidas o revocadas se descartan en el WHERE y responden 404.
+    """
+    from datetime import datetime
+    row = db.execute(_RESOLVE_SESSION_SQL, {"token_hash": token_hash, "now": datetime.utcnow()}).fetchone()
+    if not row:
+        raise HTTPException(status_code=404, detail="Sesión no encontrada o vencida")
+    return {
+        "session": {
+            "id": row.id,
+            "auth_user_id": row.auth_user_id,
+            "session_token_hash": row.session_token_hash,
+            "expires_at": row.expires_at,
+            "revoked_at": row.revoked_at,
+            "ip_address": row.ip_address,
+            "user_agent": row.user_agent,
+            "created_at": row.created_at,
+        },
+        "user": {
+            "id": row.auth_user_id,
+            "email": row.email,
+            "is_active": row.is_active,
+            "email_verified": row.email_verified,
+            "is_volunteer": row.is_volunteer,
+            "volunteer_id": row.volunteer_id,
+        },
+        "volunteer": {
+            "id": row.volunteer_id,
+            "name": row.v_name,
+            "last_name": row.v_last_name,
+            "status": row.v_status,
+            "is_admin": row.v_is_admin,
+        } if row.v_name is not None else None,
+        "participant": {
+            "id": row.p_id,
+            "is_active": row.p_is_active,
+            "name": row.p_name,
+            "last_name": row.p_last_name,
+        } if row.p_id is not None else None,
+    }
+
+
 @router.get("/sessions/by-hash/{token_hash}", response_model=AuthSession)
 def get_session_by_hash(token_hash: str, db: Session = Depends(get_db)):
-    s = db.query(AuthSessionModel).filter(AuthSessionModel.session_token_hash == token_hash).first()
-    if not s:
+    """Sesión por hash de token, servida desde la caché en memoria cuando está (ver session_cache)."""
+    cached = session_cache.cache.get(token_hash)
+    if cached is session_cache.MISS:
+        # Si se revoca mientras leemos, put() descarta lo leído en lugar de guardarlo por todo el TTL
+        since = session_cache.cache.snapshot()
+        s = db.query(AuthSessionModel).filter(AuthSessionModel.session_token_hash == token_hash).first()
+        cached = AuthSession.model_validate(s).model_dump() if s else None
+        session_cache.cache.put(token_hash, cached, since)
+    if cached is None:
         raise HTTPException(status_code=404, detail="Sesión no encontrada")
-    return s
+    return cached
 
 
 @router.put("/sessions/{id}", response_model=AuthSession)
@@ -181,6 +347,7 @@ def update_session(id: int, data: AuthSessionUpdate, db: Session = Depends(get_d
         setattr(s, key, value)
     db.commit()
     db.refresh(s)
+    session_cache.cache.invalidate(s.session_token_hash)
     return s
 
 
@@ -193,6 +360,7 @@ def revoke_session_by_hash(token_hash: str, db: Session = Depends(get_db)):
     s.revoked_at = datetime.utcnow()
     db.commit()
     db.refresh(s)
+    session_cache.cache.invalidate(token_hash)
     return s
 
 
@@ -215,6 +383,18 @@ def get_reset_token(token_hash: str, db: Session = Depends(get_db)):
     return t
 
 
+@router.get("/sweeper/stats")
+def get_sweeper_stats():
+    """Métricas de la limpieza de tokens y sesiones de este proceso (ver app/services/auth_sweeper.py)."""
+    return auth_sweeper.sweeper.stats()
+
+
+@router.post("/sweeper/run")
+def run_sweeper():
+    """Corre la limpieza de tokens y sesiones ahora, sin esperar al hilo de fondo."""
+    return auth_sweeper.sweeper.run_once()
+
+
 @router.delete("/verification-tokens/expired/{auth_user_id}", status_code=204)
 def delete_expired_verification_tokens(auth_user_id: int, db: Session = Depends(get_db)):
     from datetime import datetime
@@ -1,22 +1,37 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import text
-from typing import List, Optional
-from datetime import date, timedelta
+from sqlalchemy import select, text, bindparam, or_, tuple_
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.exc import IntegrityError
+from typing import List, Literal, Optional
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
 
-from app.database import get_db
+from config import settings
+from app.database import get_db, SessionLocal
+from app import fast_json
+from app.http_cache import make_etag, not_modified, set_etag
 from app.models.calendar import (
     CalendarInstance as CIModel,
     CalendarAssignment as CAModel,
     CalendarEventParticipant as CEPModel,
+    CalendarRecurrence as CRModel,
 )
+from app.models.voluntario import Voluntario as VoluntarioModel
+from app.models.participant import Participant as ParticipantModel
+from app.services import calendar_read_model, ical, recurrence, roster
+from app.services.conflicts import conflict_index, interval_for, from_minutes
 from app.schemas.calendar import (
     CalendarInstance, CalendarInstanceCreate, CalendarInstanceUpdate,
     CalendarInstanceRich, VolunteerRef,
+    CalendarRecurrence, CalendarRecurrenceCreate, CalendarRecurrenceUpdate, MaterializeOccurrenceRequest,
     CalendarAssignment, CalendarAssignmentCreate, CalendarAssignmentUpdate,
-    AssignmentUpsertRequest,
+    AssignmentUpsertRequest, AssignmentBatchRequest, AssignmentBatchResponse,
     CalendarEventParticipant, CalendarEventParticipantCreate, CalendarEventParticipantUpdate,
-    BulkDeleteFilters, GenerateCalendarParams,
+    CheckInRequest, CheckInResponse,
+    BulkDeleteFilters, GenerateCalendarParams, CloneCalendarRequest, CloneCalendarResponse,
+    CalendarConflict, AutoAssignRequest, AutoAssignResponse,
 )
 
 router = APIRouter()
@@ -27,56 +42,187 @@ def _fmt_time(val) -> str:
     if val is None:
         return "00:00:00"
     if isinstance(val, timedelta):
-        total = int(val.total_seconds())
-        h, rem = divmod(abs(total), 3600)
-        m, s = divmod(rem, 60)
-        return f"{h:02d}:{m:02d}:{s:02d}"
+        return _fmt_seconds(int(val.total_seconds()))
     return str(val)
 
 
+@lru_cache(maxsize=2048)
+def _fmt_seconds(total: int) -> str:
+    # Las horas de un calendario son pocas y se repiten en cada fila: se formatean una vez
+    h, rem = divmod(abs(total), 3600)
+    m, s = divmod(rem, 60)
+    return f"{h:02d}:{m:02d}:{s:02d}"
+
+
+def _month_range(year: int, month: Optional[int] = None):
+    """Devuelve el rango semiabierto [inicio, fin) del año o del mes pedido."""
+    if month is None:
+        return date(year, 1, 1), date(year + 1, 1, 1)
+    if month == 12:
+        return date(year, 12, 1), date(year + 1, 1, 1)
+    return date(year, month, 1), date(year, month + 1, 1)
+
+
+def _date_window(
+    year: Optional[int],
+    month: Optional[int],
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+):
+    """
+    Traduce year/month y/o date_from/date_to (inclusivos) a un rango semiabierto
+    [lo, hi) sobre calendar_instances.date, para que MySQL use el índice por fecha
+    en lugar de evaluar YEAR()/MONTH() fila por fila. Cualquiera de los extremos
+    puede quedar en None si no hay límite.
+    """
+    if month is not None and not 1 <= month <= 12:
+        raise HTTPException(status_code=400, detail="Mes inválido")
+    if month is not None and year is None:
+        raise HTTPException(status_code=400, detail="El mes requiere un año")
+
+    lo: Optional[date] = None
+    hi: Optional[date] = None
+    if year is not None:
+        lo, hi = _month_range(year, month)
+    if date_from is not None:
+        lo = max(lo, date_from) if lo else date_from
+    if date_to is not None:
+        upper = date_to + timedelta(days=1)
+        hi = min(hi, upper) if hi else upper
+    return lo, hi
+
+
+def _date_window_sql(lo: Optional[date], hi: Optional[date], column: str = "date"):
+    """Condiciones SQL y parámetros para un rango semiabierto [lo, hi)."""
+    clauses, params = [], {}
+    if lo is not None:
+        clauses.append(f"{column} >= :date_lo")
+        params["date_lo"] = lo
+    if hi is not None:
+        clauses.append(f"{column} < :date_hi")
+        params["date_hi"] = hi
+    return clauses, params
+
+
 # ── Calendar Instances ────────────────────────────────────────────────
 
 @router.get("/instances-rich", response_model=List[CalendarInstanceRich])
 def list_instances_rich(
-    year: int = Query(...),
+    request: Request,
+    response: Response,
+    year: Optional[int] = Query(None),
     month: Optional[int] = Query(None),
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
     type: Optional[str] = Query(None),
     volunteer_id: Optional[int] = Query(None),
+    include_participant_counts: bool = Query(False),
+    fast: bool = Query(False),
     db: Session = Depends(get_db),
 ):
-    """Instancias de calendario con coordinadores y co-coordinadores (JOIN a voluntarios)."""
-    sql = """
-    SELECT
-        ci.id, ci.type, ci.source_id, ci.date, ci.start_time, ci.end_time, ci.notes, ci.status,
-        coord_v.id   AS coord_id,   coord_v.name   AS coord_name,   coord_v.last_name AS coord_last,
-        cocoord_v.id AS cocoord_id, cocoord_v.name AS cocoord_name, cocoord_v.last_name AS cocoord_last
+    """
+    Instancias de calendario con coordinadores y co-coordinadores.
+    Se filtra por year/month y/o por date_from/date_to (inclusivos); al menos uno es requerido.
+
+    Con CALENDAR_READ_MODEL_ENABLED se lee todo de calendar_instances_rich con una sola
+    consulta por rango. Si no, primero se leen las instancias del rango (sin JOINs, una
+    fila por instancia) y luego los asignados de todas ellas en una segunda consulta por ids.
+    Se suman las ocurrencias proyectadas de las reglas de recurrencia que no estén
+    materializadas (salvo al filtrar por volunteer_id, ya que una ocurrencia sin
+    materializar no tiene asignados).
+
+    Con include_participant_counts=True cada instancia trae participant_counts (cantidad por
+    estado), calculado con un único GROUP BY sobre calendar_event_participants.
+
+    Responde con un ETag derivado de una huella barata de la ventana; si coincide con
+    If-None-Match devuelve 304 sin ejecutar la consulta completa ni serializar.
+
+    Con fast=True las filas se serializan directo a bytes JSON, sin pasar por la
+    validación de response_model: el cuerpo tiene las mismas claves y valores.
+    """
+    if year is None and date_from is None and date_to is None:
+        raise HTTPException(status_code=400, detail="Se requiere year o date_from/date_to")
+    lo, hi = _date_window(year, month, date_from, date_to)
+    use_read_model = calendar_read_model.enabled()
+    clauses, params = _rich_filters(lo, hi, type, volunteer_id, use_read_model)
+
+    fingerprint = _window_fingerprint(
+        db, clauses, params, volunteer_id, include_participant_counts, use_read_model
+    )
+    etag = make_etag("instances-rich", lo, hi, type, volunteer_id, include_participant_counts, *fingerprint)
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+    set_etag(response, etag)
+
+    if use_read_model:
+        result = _read_rich_from_read_model(db, clauses, params)
+    else:
+        result = _read_rich_from_instances(db, clauses, params)
+
+    if include_participant_counts:
+        counts = _load_participant_counts(db, [r["id"] for r in result])
+        for r in result:
+            r["participant_counts"] = counts.get(r["id"], dict(_EMPTY_PARTICIPANT_COUNTS))
+
+    if volunteer_id is None:
+        virtual = _project_recurrences(db, lo, hi, type)
+        if virtual:
+            result.extend(virtual)
+            result.sort(key=lambda r: (r["date"], r["start_time"]))
+
+    if fast:
+        for r in result:
+            r.setdefault("participant_counts", None)
+        body = fast_json.json_response(result)
+        set_etag(body, etag)
+        return body
+    return result
+
+
+def _rich_instances_sql(clauses: List[str]) -> str:
+    return f"""
+    SELECT ci.id, ci.recurrence_id, ci.type, ci.source_id, ci.date, ci.start_time, ci.end_time,
+           ci.notes, ci.status
     FROM calendar_instances ci
-    LEFT JOIN calendar_assignments coord_ca
-        ON coord_ca.instance_id = ci.id AND coord_ca.role = 'coordinator'
-    LEFT JOIN voluntarios coord_v ON coord_v.id = coord_ca.volunteer_id
-    LEFT JOIN calendar_assignments cocoord_ca
-        ON cocoord_ca.instance_id = ci.id AND cocoord_ca.role = 'co_coordinator'
-    LEFT JOIN voluntarios cocoord_v ON cocoord_v.id = cocoord_ca.volunteer_id
-    WHERE YEAR(ci.date) = :year
-    """
-    params: dict = {"year": year}
-
-    if month is not None:
-        sql += " AND MONTH(ci.date) = :month"
-        params["month"] = month
-    if type is not None:
-        sql += " AND ci.type = :type"
-        params["type"] = type
-    if volunteer_id is not None:
-        sql += " AND (coord_ca.volunteer_id = :vol_id OR cocoord_ca.volunteer_id = :vol_id)"
-        params["vol_id"] = volunteer_id
+    WHERE {" AND ".join(clauses)}
+    ORDER BY ci.date ASC, ci.start_time ASC
+    """
 
-    sql += " ORDER BY ci.date ASC, ci.start_time ASC"
 
-    rows = db.execute(text(sql), params).fetchall()
+def _read_rich_from_instances(db: Session, clauses: List[str], params: dict) -> List[dict]:
+    rows = db.execute(text(_rich_instances_sql(clauses)), params).fetchall()
+    coordinators = calendar_read_model.load_coordinators(db, [row.id for row in rows])
+    result = []
+    for row in rows:
+        roles = coordinators.get(row.id, {})
+        result.append({
+            "id": row.id,
+            "recurrence_id": row.recurrence_id,
+            "type": row.type,
+            "source_id": row.source_id,
+            "date": str(row.date),
+            "start_time": _fmt_time(row.start_time),
+            "end_time": _fmt_time(row.end_time),
+            "notes": row.notes,
+            "status": row.status,
+            "coordinator": roles.get("coordinator"),
+            "co_coordinator": roles.get("co_coordinator"),
+        })
+    return result
+
+
+def _read_rich_from_read_model(db: Session, clauses: List[str], params: dict) -> List[dict]:
+    sql = f"""
+    SELECT ci.*
+    FROM calendar_instances_rich ci
+    WHERE {" AND ".join(clauses)}
+    ORDER BY ci.date ASC, ci.start_time ASC
+    """
     return [
         {
-            "id": row.id,
+            "id": row.instance_id,
+            "recurrence_id": row.recurrence_id,
             "type": row.type,
             "source_id": row.source_id,
             "date": str(row.date),
@@ -84,15 +230,194 @@ def list_instances_rich(
             "end_time": _fmt_time(row.end_time),
             "notes": row.notes,
             "status": row.status,
-            "coordinator": {"id": row.coord_id, "name": row.coord_name, "last_name": row.coord_last or ""}
-                if row.coord_id else None,
-            "co_coordinator": {"id": row.cocoord_id, "name": row.cocoord_name, "last_name": row.cocoord_last or ""}
-                if row.cocoord_id else None,
+            "coordinator": {
+                "id": row.coordinator_id,
+                "name": row.coordinator_name,
+                "last_name": row.coordinator_last_name or "",
+            } if row.coordinator_id else None,
+            "co_coordinator": {
+                "id": row.co_coordinator_id,
+                "name": row.co_coordinator_name,
+                "last_name": row.co_coordinator_last_name or "",
+            } if row.co_coordinator_id else None,
         }
-        for row in rows
+        for row in db.execute(text(sql), params)
     ]
 
 
+def _rich_filters(
+    lo: Optional[date],
+    hi: Optional[date],
+    type: Optional[str],
+    volunteer_id: Optional[int],
+    use_read_model: bool = False,
+):
+    """
+    Condiciones para la vista rica (rango, tipo y voluntario) sobre el alias ci, que es
+    calendar_instances o, con el modelo de lectura, calendar_instances_rich.
+    """
+    clauses, params = _date_window_sql(lo, hi, "ci.date")
+    if type is not None:
+        clauses.append("ci.type = :type")
+        params["type"] = type
+    if volunteer_id is not None:
+        if use_read_model:
+            clauses.append("(ci.coordinator_id = :vol_id OR ci.co_coordinator_id = :vol_id)")
+        else:
+            # EXISTS en lugar de JOIN: filtra sin multiplicar filas por asignación
+            clauses.append(
+                "EXISTS (SELECT 1 FROM calendar_assignments fca"
+                " WHERE fca.instance_id = ci.id AND fca.volunteer_id = :vol_id"
+                " AND fca.role IN ('coordinator', 'co_coordinator'))"
+            )
+        params["vol_id"] = volunteer_id
+    return clauses, params
+
+
+def _window_fingerprint(
+    db: Session,
+    clauses: List[str],
+    params: dict,
+    volunteer_id: Optional[int],
+    include_participants: bool = False,
+    use_read_model: bool = False,
+) -> tuple:
+    """
+    Huella de una ventana del calendario en una sola consulta: conteo y max(updated_at) de
+    las instancias, de sus asignaciones y de los voluntarios asignados (cambios de nombre),
+    de las reglas de recurrencia que proyectan ocurrencias en la ventana y, si se piden
+    los conteos, de los participantes. Con el modelo de lectura, sus filas ya reflejan
+    asignaciones y nombres, así que basta con su conteo y max(updated_at).
+    """
+    where = " AND ".join(clauses)
+    rule_clauses = []
+    if "date_hi" in params:
+        rule_clauses.append("cr.start_date < :date_hi")
+    if "date_lo" in params:
+        rule_clauses.append("(cr.until_date IS NULL OR cr.until_date >= :date_lo)")
+    if "type" in params:
+        rule_clauses.append("cr.type = :type")
+    rules_sql = "SELECT 0 AS cnt, NULL AS last_at" if volunteer_id is not None else f"""
+        SELECT COUNT(*) AS cnt, MAX(cr.updated_at) AS last_at FROM calendar_recurrences cr
+        WHERE {" AND ".join(rule_clauses) or "1=1"}"""
+
+    if use_read_model:
+        instances_sql = f"""
+            SELECT COUNT(*) AS cnt, MAX(ci.updated_at) AS last_at
+            FROM calendar_instances_rich ci WHERE {where}"""
+        assignments_sql = f"""
+            SELECT 0 AS cnt, NULL AS last_at, NULL AS v_last,
+                   COALESCE(SUM(ci.coordinator_id), 0) + COALESCE(SUM(ci.co_coordinator_id), 0) AS v_sum
+            FROM calendar_instances_rich ci WHERE {where}"""
+        participants_join = "calendar_instances_rich ci JOIN calendar_event_participants cep ON cep.event_id = ci.instance_id"
+    else:
+        instances_sql = f"""
+            SELECT COUNT(*) AS cnt, MAX(ci.updated_at) AS last_at
+            FROM calendar_instances ci WHERE {where}"""
+        assignments_sql = f"""
+            SELECT COUNT(*) AS cnt, MAX(ca.updated_at) AS last_at,
+                   MAX(v.updated_at) AS v_last, COALESCE(SUM(ca.volunteer_id), 0) AS v_sum
+            FROM calendar_instances ci
+            JOIN calendar_assignments ca ON ca.instance_id = ci.id
+            JOIN voluntarios v ON v.id = ca.volunteer_id
+            WHERE {where}"""
+        participants_join = "calendar_instances ci JOIN calendar_event_participants cep ON cep.event_id = ci.id"
+
+    participants_sql = "SELECT 0 AS cnt, NULL AS last_at" if not include_participants else f"""
+        SELECT COUNT(*) AS cnt, MAX(cep.updated_at) AS last_at
+        FROM {participants_join}
+        WHERE {where}"""
+
+    row = db.execute(text(f"""
+        SELECT i.cnt AS i_cnt, i.last_at AS i_last,
+               a.cnt AS a_cnt, a.last_at AS a_last, a.v_last AS v_last, a.v_sum AS v_sum,
+               r.cnt AS r_cnt, r.last_at AS r_last, p.cnt AS p_cnt, p.last_at AS p_last
+        FROM ({instances_sql}) i
+        CROSS JOIN ({assignments_sql}) a
+        CROSS JOIN ({rules_sql}) r
+        CROSS JOIN ({participants_sql}) p
+    """), params).fetchone()
+    return tuple(row)
+
+
+_EMPTY_PARTICIPANT_COUNTS = {"inscripto": 0, "cancelado": 0, "asistio": 0}
+
+
+def _load_participant_counts(db: Session, instance_ids: List[int]) -> dict:
+    """Cantidad de participantes por estado para varias instancias, con un GROUP BY por lote."""
+    result: dict = {}
+    stmt = text("""
+        SELECT event_id, status, COUNT(*) AS cnt
+        FROM calendar_event_participants
+        WHERE event_id IN :ids
+        GROUP BY event_id, status
+    """).bindparams(bindparam("ids", expanding=True))
+    chunk_size = calendar_read_model.IN_CHUNK_SIZE
+    for i in range(0, len(instance_ids), chunk_size):
+        for row in db.execute(stmt, {"ids": instance_ids[i:i + chunk_size]}):
+            counts = result.setdefault(row.event_id, dict(_EMPTY_PARTICIPANT_COUNTS))
+            counts[row.status] = row.cnt
+    return result
+
+
+_RECURRENCE_HORIZON_DAYS = 366
+
+
+def _project_recurrences(
+    db: Session,
+    lo: Optional[date],
+    hi: Optional[date],
+    type: Optional[str],
+    source_id: Optional[int] = None,
+) -> List[dict]:
+    """
+    Ocurrencias no materializadas de las reglas vigentes en [lo, hi), con la forma de
+    CalendarInstanceRich. Sin límite superior se proyecta hasta _RECURRENCE_HORIZON_DAYS.
+    """
+    q = db.query(CRModel)
+    if hi is not None:
+        q = q.filter(CRModel.start_date < hi)
+    if lo is not None:
+        q = q.filter(or_(CRModel.until_date.is_(None), CRModel.until_date >= lo))
+    if type is not None:
+        q = q.filter(CRModel.type == type)
+    if source_id is not None:
+        q = q.filter(CRModel.source_id == source_id)
+    rules = q.all()
+    if not rules:
+        return []
+
+    materialized = {
+        (r.recurrence_id, r.recurrence_date)
+        for r in db.query(CIModel.recurrence_id, CIModel.recurrence_date)
+        .filter(CIModel.recurrence_id.in_([rule.id for rule in rules]))
+        .filter(*([CIModel.recurrence_date >= lo] if lo is not None else []))
+        .filter(*([CIModel.recurrence_date < hi] if hi is not None else []))
+    }
+
+    projected = []
+    for rule in rules:
+        start = lo or rule.start_date
+        end = hi or start + timedelta(days=_RECURRENCE_HORIZON_DAYS)
+        for d in recurrence.expand(rule, start, end):
+            if (rule.id, d) in materialized:
+                continue
+            projected.append({
+                "id": None,
+                "recurrence_id": rule.id,
+                "type": rule.type,
+                "source_id": rule.source_id,
+                "date": str(d),
+                "start_time": _fmt_time(rule.start_time),
+                "end_time": _fmt_time(rule.end_time),
+                "notes": rule.notes,
+                "status": rule.status,
+                "coordinator": None,
+                "co_coordinator": None,
+            })
+    return projected
+
+
 @router.get("/instances", response_model=List[CalendarInstance])
 def list_instances(
     skip: int = 0,
@@ -130,6 +455,8 @@ def get_instance(id: int, db: Session = Depends(get_db)):
 def create_instance(data: CalendarInstanceCreate, db: Session = Depends(get_db)):
     ci = CIModel(**data.model_dump())
     db.add(ci)
+    db.flush()
+    calendar_read_model.refresh_instances(db, [ci.id])
     db.commit()
     db.refresh(ci)
     return ci
@@ -142,8 +469,10 @@ def update_instance(id: int, data: CalendarInstanceUpdate, db: Session = Depends
         raise HTTPException(status_code=404, detail="Instancia no encontrada")
     for key, value in data.model_dump(exclude_unset=True).items():
         setattr(ci, key, value)
+    calendar_read_model.refresh_instances(db, [id])
     db.commit()
     db.refresh(ci)
+    conflict_index.refresh_instances(db, [id])
     return ci
 
 
@@ -152,8 +481,283 @@ def delete_instance(id: int, db: Session = Depends(get_db)):
     ci = db.query(CIModel).filter(CIModel.id == id).first()
     if not ci:
         raise HTTPException(status_code=404, detail="Instancia no encontrada")
+    if ci.recurrence_id is not None:
+        # Si la ocurrencia venía de una regla, se excluye para que no vuelva a proyectarse
+        rule = db.query(CRModel).filter(CRModel.id == ci.recurrence_id).first()
+        if rule:
+            rule.exdates = sorted({*(rule.exdates or []), ci.recurrence_date.isoformat()})
     db.delete(ci)
     db.commit()
+    conflict_index.drop_instances([id])
+
+
+# ── Calendar Recurrences ──────────────────────────────────────────────
+
+def _get_recurrence_or_404(db: Session, id: int) -> CRModel:
+    rule = db.query(CRModel).filter(CRModel.id == id).first()
+    if not rule:
+        raise HTTPException(status_code=404, detail="Regla de recurrencia no encontrada")
+    return rule
+
+
+def _recurrence_values(values: dict) -> dict:
+    """Las exdates se guardan como strings ISO en la columna JSON."""
+    if values.get("exdates") is not None:
+        values["exdates"] = sorted({d.isoformat() for d in values["exdates"]})
+    return values
+
+
+@router.get("/recurrences", response_model=List[CalendarRecurrence])
+def list_recurrences(
+    type: Optional[str] = Query(None),
+    source_id: Optional[int] = Query(None),
+    db: Session = Depends(get_db),
+):
+    q = db.query(CRModel)
+    if type is not None:
+        q = q.filter(CRModel.type == type)
+    if source_id is not None:
+        q = q.filter(CRModel.source_id == source_id)
+    return q.order_by(CRModel.start_date).all()
+
+
+@router.get("/recurrences/{id}", response_model=CalendarRecurrence)
+def get_recurrence(id: int, db: Session = Depends(get_db)):
+    return _get_recurrence_or_404(db, id)
+
+
+@router.post("/recurrences", response_model=CalendarRecurrence, status_code=201)
+def create_recurrence(data: CalendarRecurrenceCreate, db: Session = Depends(get_db)):
+    if data.weekday is not None and data.freq != "weekly":
+        raise HTTPException(status_code=400, detail="weekday solo aplica a freq 'weekly'")
+    rule = CRModel(**_recurrence_values(data.model_dump()))
+    db.add(rule)
+    db.commit()
+    db.refresh(rule)
+    return rule
+
+
+@router.put("/recurrences/{id}", response_model=CalendarRecurrence)
+def update_recurrence(id: int, data: CalendarRecurrenceUpdate, db: Session = Depends(get_db)):
+    """Actualiza la regla; extender la serie es solo cambiar until_date/max_count."""
+    rule = _get_recurrence_or_404(db, id)
+    for key, value in _recurrence_values(data.model_dump(exclude_unset=True)).items():
+        setattr(rule, key, value)
+    db.commit()
+    db.refresh(rule)
+    return rule
+
+
+@router.delete("/recurrences/{id}", status_code=204)
+def delete_recurrence(id: int, db: Session = Depends(get_db)):
+    """Elimina la regla. Las ocurrencias ya materializadas quedan como instancias sueltas."""
+    rule = _get_recurrence_or_404(db, id)
+    materialized = [row.id for row in db.query(CIModel.id).filter(CIModel.recurrence_id == id)]
+    # Lo mismo que hace ON DELETE SET NULL, pero antes de refrescar el modelo de lectura
+    db.query(CIModel).filter(CIModel.recurrence_id == id).update(
+        {CIModel.recurrence_id: None}, synchronize_session=False
+    )
+    db.delete(rule)
+    calendar_read_model.refresh_instances(db, materialized)
+    db.commit()
+
+
+@router.get("/recurrences/{id}/occurrences", response_model=List[str])
+def list_recurrence_occurrences(
+    id: int,
+    date_from: date = Query(...),
+    date_to: date = Query(...),
+    db: Session = Depends(get_db),
+):
+    """Fechas de la serie entre date_from y date_to (inclusivos), materializadas o no."""
+    rule = _get_recurrence_or_404(db, id)
+    return [str(d) for d in recurrence.expand(rule, date_from, date_to + timedelta(days=1))]
+
+
+@router.post("/recurrences/{id}/materialize", response_model=CalendarInstance)
+def materialize_occurrence(id: int, data: MaterializeOccurrenceRequest, db: Session = Depends(get_db)):
+    """
+    Crea (o devuelve, si ya existe) la instancia física de una ocurrencia, para poder
+    asignarle coordinadores, participantes o notas. Es idempotente.
+    """
+    rule = _get_recurrence_or_404(db, id)
+    existing = db.query(CIModel).filter(
+        CIModel.recurrence_id == id, CIModel.recurrence_date == data.date
+    ).first()
+    if existing:
+        return existing
+    if not recurrence.is_occurrence(rule, data.date):
+        raise HTTPException(status_code=400, detail="La fecha no es una ocurrencia de la regla")
+
+    ci = CIModel(
+        type=rule.type,
+        source_id=rule.source_id,
+        date=data.date,
+        start_time=rule.start_time,
+        end_time=rule.end_time,
+        notes=rule.notes,
+        status=rule.status,
+        recurrence_id=id,
+        recurrence_date=data.date,
+    )
+    db.add(ci)
+    try:
+        db.flush()
+        calendar_read_model.refresh_instances(db, [ci.id])
+        db.commit()
+    except IntegrityError:
+        # Otra petición la materializó en paralelo (índice único recurrence_id + recurrence_date)
+        db.rollback()
+        return db.query(CIModel).filter(
+            CIModel.recurrence_id == id, CIModel.recurrence_date == data.date
+        ).one()
+    db.refresh(ci)
+    return ci
+
+
+# ── Feeds iCalendar ───────────────────────────────────────────────────
+# Las apps de calendario no pueden enviar X-API-Key: el frontend expone estos feeds a
+# través de su propio proxy autenticado y reenvía If-None-Match.
+
+_FEED_YIELD_PER = 200
+_FEED_SOURCE_TABLES = {"grupo": "grupos", "taller": "talleres", "actividad": "actividades"}
+_FEED_COLUMNS = """
+    ci.id, ci.recurrence_id, ci.recurrence_date, ci.type, ci.date, ci.start_time, ci.end_time,
+    ci.notes, ci.status, COALESCE(g.name, t.name, a.name) AS source_name"""
+_FEED_SOURCE_JOINS = """
+    LEFT JOIN grupos g ON ci.type = 'grupo' AND g.id = ci.source_id
+    LEFT JOIN talleres t ON ci.type = 'taller' AND t.id = ci.source_id
+    LEFT JOIN actividades a ON ci.type = 'actividad' AND a.id = ci.source_id"""
+
+
+def _feed_since() -> date:
+    return date.today() - timedelta(days=settings.CALENDAR_FEED_PAST_DAYS)
+
+
+def _stream_feed(name: str, sql: str, params: dict, extra_events: List[str] = ()):
+    """
+    Emite el .ics fila a fila desde un cursor del lado del servidor (yield_per), sin armar
+    la lista completa en memoria. Usa su propia sesión: la de la dependencia ya se cerró
+    cuando Starlette empieza a enviar el cuerpo.
+    """
+    dtstamp = datetime.utcnow()
+    yield ical.calendar_header(name, settings.CALENDAR_TIMEZONE)
+    db = SessionLocal()
+    try:
+        rows = db.execute(text(sql).execution_options(yield_per=_FEED_YIELD_PER), params)
+        for row in rows:
+            yield ical.vevent(
+                ical.event_uid(row.id, row.recurrence_id, row.recurrence_date, row.role),
+                row.date,
+                _fmt_time(row.start_time),
+                _fmt_time(row.end_time),
+                ical.event_summary(row.type, row.source_name, row.role),
+                dtstamp,
+                description=row.notes,
+                status=row.status,
+            )
+    finally:
+        db.close()
+    yield from extra_events
+    yield ical.calendar_footer()
+
+
+def _feed_response(body, etag: str, filename: str) -> StreamingResponse:
+    response = StreamingResponse(body, media_type="text/calendar; charset=utf-8")
+    response.headers["Content-Disposition"] = f'inline; filename="{filename}"'
+    set_etag(response, etag)
+    return response
+
+
+@router.get("/feeds/volunteer/{volunteer_id}.ics")
+def volunteer_calendar_feed(volunteer_id: int, request: Request, db: Session = Depends(get_db)):
+    """Feed iCalendar de las instancias donde el voluntario es coordinador o co-coordinador."""
+    v = db.query(VoluntarioModel).filter(VoluntarioModel.id == volunteer_id).first()
+    if not v:
+        raise HTTPException(status_code=404, detail="Voluntario no encontrado")
+
+    params = {"vol_id": volunteer_id, "since": _feed_since()}
+    fingerprint = db.execute(text("""
+        SELECT COUNT(*) AS cnt, MAX(ca.updated_at) AS a_last, MAX(ci.updated_at) AS i_last,
+               COALESCE(SUM(ci.id), 0) AS id_sum
+        FROM calendar_assignments ca
+        JOIN calendar_instances ci ON ci.id = ca.instance_id
+        WHERE ca.volunteer_id = :vol_id AND ci.date >= :since
+    """), params).fetchone()
+    etag = make_etag("feed-volunteer", volunteer_id, params["since"], v.name, v.last_name, *fingerprint)
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+
+    sql = f"""
+    SELECT {_FEED_COLUMNS}, ca.role
+    FROM calendar_assignments ca
+    JOIN calendar_instances ci ON ci.id = ca.instance_id
+    {_FEED_SOURCE_JOINS}
+    WHERE ca.volunteer_id = :vol_id AND ca.role IN ('coordinator', 'co_coordinator')
+      AND ci.date >= :since
+    ORDER BY ci.date ASC, ci.start_time ASC
+    """
+    name = f"ALMA - {v.name} {v.last_name or ''}".strip()
+    return _feed_response(_stream_feed(name, sql, params), etag, f"voluntario-{volunteer_id}.ics")
+
+
+@router.get("/feeds/series/{type}/{source_id}.ics")
+def series_calendar_feed(
+    type: Literal["grupo", "taller", "actividad"],
+    source_id: int,
+    request: Request,
+    db: Session = Depends(get_db),
+):
+    """Feed iCalendar de una serie (grupo, taller o actividad), incluidas sus reglas de recurrencia."""
+    source = db.execute(
+        text(f"SELECT name FROM {_FEED_SOURCE_TABLES[type]} WHERE id = :id"), {"id": source_id}
+    ).fetchone()
+    if not source:
+        raise HTTPException(status_code=404, detail="Serie no encontrada")
+
+    since = _feed_since()
+    until = date.today() + timedelta(days=_RECURRENCE_HORIZON_DAYS)
+    params = {"type": type, "source_id": source_id, "since": since}
+    fingerprint = db.execute(text("""
+        SELECT i.cnt AS i_cnt, i.last_at AS i_last, i.id_sum AS id_sum,
+               r.cnt AS r_cnt, r.last_at AS r_last
+        FROM (SELECT COUNT(*) AS cnt, MAX(updated_at) AS last_at, COALESCE(SUM(id), 0) AS id_sum
+              FROM calendar_instances
+              WHERE type = :type AND source_id = :source_id AND date >= :since) i
+        CROSS JOIN (SELECT COUNT(*) AS cnt, MAX(updated_at) AS last_at
+                    FROM calendar_recurrences
+                    WHERE type = :type AND source_id = :source_id) r
+    """), params).fetchone()
+    etag = make_etag("feed-series", type, source_id, since, source.name, *fingerprint)
+    cached = not_modified(request, etag)
+    if cached is not None:
+        return cached
+
+    dtstamp = datetime.utcnow()
+    projected = [
+        ical.vevent(
+            ical.event_uid(None, occ["recurrence_id"], occ["date"]),
+            occ["date"],
+            occ["start_time"],
+            occ["end_time"],
+            ical.event_summary(type, source.name),
+            dtstamp,
+            description=occ["notes"],
+            status=occ["status"],
+        )
+        for occ in _project_recurrences(db, since, until, type, source_id)
+    ]
+    sql = f"""
+    SELECT {_FEED_COLUMNS}, NULL AS role
+    FROM calendar_instances ci
+    {_FEED_SOURCE_JOINS}
+    WHERE ci.type = :type AND ci.source_id = :source_id AND ci.date >= :since
+    ORDER BY ci.date ASC, ci.start_time ASC
+    """
+    return _feed_response(
+        _stream_feed(source.name, sql, params, projected), etag, f"{type}-{source_id}.ics"
+    )
 
 
 # ── Calendar Assignments ──────────────────────────────────────────────
@@ -163,30 +767,77 @@ def list_assignments(instance_id: int, db: Session = Depends(get_db)):
     return db.query(CAModel).filter(CAModel.instance_id == instance_id).all()
 
 
+def _check_conflicts(
+    db: Session, volunteer_id: int, ci: CIModel, allow_conflicts: bool, response: Response
+) -> None:
+    """
+    Rechaza con 409 si el voluntario ya tiene otra instancia superpuesta; con
+    allow_conflicts=True la asignación sigue y los ids van en X-Calendar-Conflicts.
+    """
+    if ci.status == "cancelado":
+        return
+    clashes = conflict_index.find_conflicts(
+        db, volunteer_id, interval_for(ci.date, ci.start_time, ci.end_time), exclude_instance_id=ci.id
+    )
+    if not clashes:
+        return
+    ids = ", ".join(str(i) for i in clashes)
+    if not allow_conflicts:
+        raise HTTPException(
+            status_code=409,
+            detail=f"El voluntario ya está asignado en ese horario (instancias: {ids})",
+        )
+    response.headers["X-Calendar-Conflicts"] = ids.replace(" ", "")
+
+
 @router.post("/instances/{instance_id}/assignments", response_model=CalendarAssignment, status_code=201)
-def create_assignment(instance_id: int, data: CalendarAssignmentCreate, db: Session = Depends(get_db)):
-    if not db.query(CIModel).filter(CIModel.id == instance_id).first():
+def create_assignment(
+    instance_id: int,
+    data: CalendarAssignmentCreate,
+    response: Response,
+    allow_conflicts: bool = Query(False),
+    db: Session = Depends(get_db),
+):
+    ci = db.query(CIModel).filter(CIModel.id == instance_id).first()
+    if not ci:
         raise HTTPException(status_code=404, detail="Instancia no encontrada")
+    if db.query(CAModel).filter(CAModel.instance_id == instance_id, CAModel.role == data.role).first():
+        raise HTTPException(status_code=409, detail="La instancia ya tiene un asignado para ese rol")
+    _check_conflicts(db, data.volunteer_id, ci, allow_conflicts, response)
     ca = CAModel(**{**data.model_dump(), "instance_id": instance_id})
     db.add(ca)
+    calendar_read_model.refresh_instances(db, [instance_id])
     db.commit()
     db.refresh(ca)
+    conflict_index.refresh_instances(db, [instance_id])
     return ca
 
 
 @router.put("/instances/{instance_id}/assignments/by-role/{role}", response_model=CalendarAssignment)
 def upsert_assignment_by_role(
-    instance_id: int, role: str, data: AssignmentUpsertRequest, db: Session = Depends(get_db)
+    instance_id: int,
+    role: str,
+    data: AssignmentUpsertRequest,
+    response: Response,
+    allow_conflicts: bool = Query(False),
+    db: Session = Depends(get_db),
 ):
     """Crea o actualiza el asignado para un rol específico en una instancia."""
+    ci = db.query(CIModel).filter(CIModel.id == instance_id).first()
+    if not ci:
+        raise HTTPException(status_code=404, detail="Instancia no encontrada")
     ca = db.query(CAModel).filter(CAModel.instance_id == instance_id, CAModel.role == role).first()
+    if not ca or ca.volunteer_id != data.volunteer_id:
+        _check_conflicts(db, data.volunteer_id, ci, allow_conflicts, response)
     if ca:
         ca.volunteer_id = data.volunteer_id
     else:
         ca = CAModel(instance_id=instance_id, volunteer_id=data.volunteer_id, role=role)
         db.add(ca)
+    calendar_read_model.refresh_instances(db, [instance_id])
     db.commit()
     db.refresh(ca)
+    conflict_index.refresh_instances(db, [instance_id])
     return ca
 
 
@@ -196,18 +847,144 @@ def delete_assignment_by_role(instance_id: int, role: str, db: Session = Depends
     if not ca:
         raise HTTPException(status_code=404, detail="Asignación no encontrada")
     db.delete(ca)
+    calendar_read_model.refresh_instances(db, [instance_id])
+    db.commit()
+    conflict_index.refresh_instances(db, [instance_id])
+
+
+def _bulk_upsert_assignments(db: Session, rows: List[dict]) -> None:
+    """Upsert multi-fila sobre la clave única (instance_id, role)."""
+    if not rows:
+        return
+    stmt = mysql_insert(CAModel.__table__).values(rows)
+    db.execute(stmt.on_duplicate_key_update(volunteer_id=stmt.inserted.volunteer_id))
+
+
+def _bulk_delete_assignments(db: Session, keys: List[tuple]) -> None:
+    """Borra varias asignaciones (instance_id, role) en una sola sentencia."""
+    if not keys:
+        return
+    db.query(CAModel).filter(tuple_(CAModel.instance_id, CAModel.role).in_(keys)).delete(
+        synchronize_session=False
+    )
+
+
+@router.put("/assignments/batch", response_model=AssignmentBatchResponse)
+def batch_assignments(data: AssignmentBatchRequest, db: Session = Depends(get_db)):
+    """
+    Aplica muchas asignaciones (instance_id, role, volunteer_id o null) en una sola
+    transacción: una lectura de instancias, voluntarios y asignaciones actuales, un upsert
+    multi-fila y un único DELETE. Los ítems inválidos o en conflicto se informan con
+    status "error" y no impiden aplicar el resto. Si un (instance_id, role) se repite,
+    vale el último.
+    """
+    results: List[Optional[dict]] = [None] * len(data.items)
+    latest: dict = {}
+    for pos, item in enumerate(data.items):
+        key = (item.instance_id, item.role)
+        if key in latest:
+            prev = data.items[latest[key]]
+            results[latest[key]] = {
+                "instance_id": prev.instance_id, "role": prev.role, "volunteer_id": prev.volunteer_id,
+                "status": "error", "detail": "Reemplazado por un ítem posterior del lote",
+            }
+        latest[key] = pos
+
+    instance_ids = sorted({key[0] for key in latest})
+    instances = {ci.id: ci for ci in db.query(CIModel).filter(CIModel.id.in_(instance_ids))}
+    volunteer_ids = {data.items[pos].volunteer_id for pos in latest.values()} - {None}
+    known_volunteers = {
+        v.id for v in db.query(VoluntarioModel.id).filter(VoluntarioModel.id.in_(volunteer_ids))
+    }
+    current = {
+        (ca.instance_id, ca.role): ca.volunteer_id
+        for ca in db.query(CAModel.instance_id, CAModel.role, CAModel.volunteer_id)
+        .filter(CAModel.instance_id.in_(instance_ids))
+    }
+    # Instancias que cada voluntario deja en este lote: no cuentan como conflicto
+    released: dict = {}
+    for (instance_id, role), pos in latest.items():
+        old = current.get((instance_id, role))
+        if old is not None and old != data.items[pos].volunteer_id:
+            released.setdefault(old, set()).add(instance_id)
+
+    upserts, deletes = [], []
+    accepted: dict = {}  # volunteer_id -> [(intervalo, instance_id)] aceptados en este lote
+    for (instance_id, role), pos in sorted(latest.items(), key=lambda kv: kv[1]):
+        item = data.items[pos]
+        result = {"instance_id": instance_id, "role": role, "volunteer_id": item.volunteer_id}
+        results[pos] = result
+        ci = instances.get(instance_id)
+        old = current.get((instance_id, role))
+        if ci is None:
+            result.update(status="error", detail="Instancia no encontrada")
+        elif item.volunteer_id is None:
+            if old is None:
+                result.update(status="unchanged")
+            else:
+                deletes.append((instance_id, role))
+                result.update(status="removed")
+        elif item.volunteer_id not in known_volunteers:
+            result.update(status="error", detail="Voluntario no encontrado")
+        elif old == item.volunteer_id:
+            result.update(status="unchanged")
+        else:
+            clashes = []
+            if ci.status != "cancelado":
+                interval = interval_for(ci.date, ci.start_time, ci.end_time)
+                skip = released.get(item.volunteer_id, set())
+                clashes = [
+                    other for other in conflict_index.find_conflicts(
+                        db, item.volunteer_id, interval, exclude_instance_id=instance_id
+                    )
+                    if other not in skip
+                ]
+                clashes += [
+                    other for (s, e), other in accepted.get(item.volunteer_id, [])
+                    if s < interval[1] and e > interval[0] and other != instance_id
+                ]
+            if clashes and not data.allow_conflicts:
+                ids = ", ".join(str(i) for i in clashes)
+                result.update(status="error", detail=f"El voluntario ya está asignado en ese horario (instancias: {ids})")
+                continue
+            if ci.status != "cancelado":
+                accepted.setdefault(item.volunteer_id, []).append((interval, instance_id))
+            upserts.append({"instance_id": instance_id, "role": role, "volunteer_id": item.volunteer_id})
+            result.update(status="assigned")
+            if clashes:
+                result["detail"] = f"Asignado con conflicto (instancias: {', '.join(str(i) for i in clashes)})"
+
+    _bulk_upsert_assignments(db, upserts)
+    _bulk_delete_assignments(db, deletes)
+    touched = sorted({r["instance_id"] for r in upserts} | {k[0] for k in deletes})
+    calendar_read_model.refresh_instances(db, touched)
     db.commit()
+    conflict_index.refresh_instances(db, touched)
+
+    errors = sum(1 for r in results if r["status"] == "error")
+    return {"applied": len(upserts) + len(deletes), "errors": errors, "results": results}
 
 
 @router.put("/assignments/{id}", response_model=CalendarAssignment)
-def update_assignment(id: int, data: CalendarAssignmentUpdate, db: Session = Depends(get_db)):
+def update_assignment(
+    id: int,
+    data: CalendarAssignmentUpdate,
+    response: Response,
+    allow_conflicts: bool = Query(False),
+    db: Session = Depends(get_db),
+):
     ca = db.query(CAModel).filter(CAModel.id == id).first()
     if not ca:
         raise HTTPException(status_code=404, detail="Asignación no encontrada")
+    if data.volunteer_id is not None and data.volunteer_id != ca.volunteer_id:
+        ci = db.query(CIModel).filter(CIModel.id == ca.instance_id).first()
+        _check_conflicts(db, data.volunteer_id, ci, allow_conflicts, response)
     for key, value in data.model_dump(exclude_unset=True).items():
         setattr(ca, key, value)
+    calendar_read_model.refresh_instances(db, [ca.instance_id])
     db.commit()
     db.refresh(ca)
+    conflict_index.refresh_instances(db, [ca.instance_id])
     return ca
 
 
@@ -216,82 +993,522 @@ def delete_assignment(id: int, db: Session = Depends(get_db)):
     ca = db.query(CAModel).filter(CAModel.id == id).first()
     if not ca:
         raise HTTPException(status_code=404, detail="Asignación no encontrada")
+    instance_id = ca.instance_id
     db.delete(ca)
+    calendar_read_model.refresh_instances(db, [instance_id])
     db.commit()
+    conflict_index.refresh_instances(db, [instance_id])
+
+
+# ── Conflictos ────────────────────────────────────────────────────────
+
+@router.get("/conflicts", response_model=List[CalendarConflict])
+def list_conflicts(
+    date_from: date = Query(..., alias="from"),
+    date_to: date = Query(..., alias="to"),
+    db: Session = Depends(get_db),
+):
+    """Superposiciones de horario por voluntario entre from y to (inclusivos), en una pasada."""
+    lo, _ = interval_for(date_from, "00:00", "00:00")
+    hi, _ = interval_for(date_to + timedelta(days=1), "00:00", "00:00")
+    found = conflict_index.overlaps(db, lo, hi)
+    if not found:
+        return []
+
+    volunteer_ids = sorted({volunteer_id for volunteer_id, _, _ in found})
+    names = {
+        v.id: f"{v.name or ''} {v.last_name or ''}".strip() or None
+        for v in db.query(VoluntarioModel.id, VoluntarioModel.name, VoluntarioModel.last_name)
+        .filter(VoluntarioModel.id.in_(volunteer_ids))
+    }
+    result = []
+    for volunteer_id, first, second in found:
+        _, first_start = from_minutes(first[0])
+        _, first_end = from_minutes(first[1])
+        second_day, second_start = from_minutes(second[0])
+        _, second_end = from_minutes(second[1])
+        result.append({
+            "volunteer_id": volunteer_id,
+            "volunteer_name": names.get(volunteer_id),
+            "date": str(second_day),
+            "instance_id": first[2],
+            "start_time": first_start,
+            "end_time": first_end,
+            "conflicting_instance_id": second[2],
+            "conflicting_start_time": second_start,
+            "conflicting_end_time": second_end,
+        })
+    return result
+
+
+# ── Reparto automático ────────────────────────────────────────────────
+
+def _has_specialty(value, wanted: set) -> bool:
+    """specialties se guarda como lista JSON o, en registros viejos, como texto separado por comas."""
+    if not value:
+        return False
+    items = value if isinstance(value, list) else str(value).split(",")
+    return any(str(item).strip().lower() in wanted for item in items)
+
+
+def _eligible_volunteers(db: Session, data: AutoAssignRequest) -> List[int]:
+    q = db.query(VoluntarioModel.id, VoluntarioModel.specialties).filter(VoluntarioModel.status == "activo")
+    if data.volunteer_ids is not None:
+        q = q.filter(VoluntarioModel.id.in_(data.volunteer_ids))
+    rows = q.order_by(VoluntarioModel.id).all()
+    if data.specialties:
+        wanted = {s.strip().lower() for s in data.specialties}
+        rows = [row for row in rows if _has_specialty(row.specialties, wanted)]
+    return [row.id for row in rows]
+
+
+@router.post("/auto-assign", response_model=AutoAssignResponse)
+def auto_assign(data: AutoAssignRequest, db: Session = Depends(get_db)):
+    """
+    Propone (mode=preview) o guarda (mode=commit) coordinadores para los roles vacantes
+    de las instancias no canceladas del rango, repartidos de forma pareja entre los
+    voluntarios activos elegibles, sin superposiciones de horario y respetando los topes.
+    Ver app/services/roster.py.
+
+    En commit las asignaciones se escriben con un único upsert multi-fila.
+    """
+    if data.date_to < data.date_from:
+        raise HTTPException(status_code=400, detail="date_to debe ser posterior a date_from")
+    lo, hi = _date_window(None, None, data.date_from, data.date_to)
+
+    q = db.query(CIModel.id, CIModel.date, CIModel.start_time, CIModel.end_time).filter(
+        CIModel.date >= lo, CIModel.date < hi, CIModel.status != "cancelado"
+    )
+    if data.type is not None:
+        q = q.filter(CIModel.type == data.type)
+    instances = q.order_by(CIModel.date, CIModel.start_time).all()
+
+    volunteers = _eligible_volunteers(db, data)
+    eligible = set(volunteers)
+
+    filled = set()
+    taken: dict = {}
+    loads: dict = {}
+    stmt = text("""
+        SELECT instance_id, role, volunteer_id FROM calendar_assignments
+        WHERE instance_id IN :ids AND role IN ('coordinator', 'co_coordinator')
+    """).bindparams(bindparam("ids", expanding=True))
+    ids = [ci.id for ci in instances]
+    chunk_size = calendar_read_model.IN_CHUNK_SIZE
+    for i in range(0, len(ids), chunk_size):
+        for row in db.execute(stmt, {"ids": ids[i:i + chunk_size]}):
+            filled.add((row.instance_id, row.role))
+            taken.setdefault(row.instance_id, set()).add(row.volunteer_id)
+            if row.volunteer_id in eligible:
+                loads[row.volunteer_id] = loads.get(row.volunteer_id, 0) + 1
+
+    slots = [
+        (ci.id, role, *interval_for(ci.date, ci.start_time, ci.end_time))
+        for ci in instances
+        for role in data.roles
+        if (ci.id, role) not in filled
+    ]
+    # Los horarios ya comprometidos incluyen las asignaciones existentes del rango y las
+    # de instancias vecinas que se cruzan con sus bordes
+    busy = {
+        volunteer_id: [(start, end) for start, end, _ in entries]
+        for volunteer_id, entries in conflict_index.busy_between(
+            db, interval_for(lo, "00:00", "00:00")[0], interval_for(hi, "00:00", "00:00")[0]
+        ).items()
+        if volunteer_id in eligible
+    }
+    caps = {}
+    for volunteer_id in volunteers:
+        cap = data.caps.get(volunteer_id, data.max_per_volunteer)
+        if cap is not None:
+            caps[volunteer_id] = cap
+
+    assigned, unfilled = roster.solve(slots, volunteers, caps, busy, loads, taken)
+
+    def describe(index: int, volunteer_id: Optional[int] = None) -> dict:
+        instance_id, role, start, _ = slots[index]
+        day, start_time = from_minutes(start)
+        return {
+            "instance_id": instance_id, "role": role, "date": str(day),
+            "start_time": start_time, "volunteer_id": volunteer_id,
+        }
+
+    for volunteer_id in assigned.values():
+        loads[volunteer_id] = loads.get(volunteer_id, 0) + 1
+
+    if data.mode == "commit" and assigned:
+        rows = [
+            {"instance_id": slots[index][0], "role": slots[index][1], "volunteer_id": volunteer_id}
+            for index, volunteer_id in assigned.items()
+        ]
+        _bulk_upsert_assignments(db, rows)
+        touched = sorted({row["instance_id"] for row in rows})
+        calendar_read_model.refresh_instances(db, touched)
+        db.commit()
+        conflict_index.refresh_instances(db, touched)
+
+    return {
+        "mode": data.mode,
+        "assigned": len(assigned),
+        "unfilled": len(unfilled),
+        "assignments": [describe(index, volunteer_id) for index, volunteer_id in sorted(assigned.items())],
+        "unfilled_slots": [describe(index) for index in unfilled],
+        "loads": {volunteer_id: loads.get(volunteer_id, 0) for volunteer_id in volunteers},
+    }
+
+
+# ── Modelo de lectura ─────────────────────────────────────────────────
+
+@router.post("/read-model/rebuild")
+def rebuild_read_model(
+    batch_size: int = Query(calendar_read_model.IN_CHUNK_SIZE, ge=1, le=10000),
+    db: Session = Depends(get_db),
+):
+    """
+    Regenera calendar_instances_rich desde calendar_instances y calendar_assignments.
+    Funciona aunque CALENDAR_READ_MODEL_ENABLED esté apagado, para poblarlo antes de activarlo.
+    """
+    return {"rows": calendar_read_model.rebuild(db, batch_size)}
 
 
 # ── Generación bulk ───────────────────────────────────────────────────
 
-@router.post("/generate")
-def generate_calendar_instances(params: GenerateCalendarParams, db: Session = Depends(get_db)):
-    """Genera instancias de calendario alternando grupo/taller en un rango de fechas."""
-    start_time = params.start_time
-    end_hour = int(start_time.split(":")[0]) + 2
-    end_time = f"{str(end_hour).zfill(2)}:{start_time.split(':')[1]}:00"
+_GENERATE_CHUNK_SIZE = 500
+
+
+def _compute_generated_series(params: GenerateCalendarParams) -> List[dict]:
+    """Calcula en memoria la serie alternada grupo/taller, sin tocar la base."""
+    start_time = time.fromisoformat(params.start_time)
+    if start_time.hour + 2 > 23:
+        raise HTTPException(status_code=400, detail="start_time debe ser anterior a las 22:00")
+    end_time = start_time.replace(hour=start_time.hour + 2, second=0, microsecond=0)
 
     start = date.fromisoformat(params.start_date)
     end = date.fromisoformat(params.end_date)
+    if params.interval_days < 1:
+        raise HTTPException(status_code=400, detail="interval_days debe ser mayor a 0")
 
     types = ["grupo", "taller"]
     type_index = 1 if params.first_type == "taller" else 0
 
-    created_ids = []
+    rows = []
     current = start
-
     while current <= end:
         tipo = types[type_index % 2]
-        source_id = params.source_group_id if tipo == "grupo" else params.source_workshop_id
-
-        ci = CIModel(
-            type=tipo,
-            source_id=source_id,
-            date=current,
-            start_time=start_time,
-            end_time=end_time,
-            status="programado",
-        )
-        db.add(ci)
-        db.flush()
-        created_ids.append(ci.id)
-
+        rows.append({
+            "type": tipo,
+            "source_id": params.source_group_id if tipo == "grupo" else params.source_workshop_id,
+            "date": current,
+            "start_time": start_time,
+            "end_time": end_time,
+            "status": "programado",
+        })
         current += timedelta(days=params.interval_days)
         type_index += 1
+    return rows
+
+
+def _natural_key(row) -> tuple:
+    return (row["type"], row["source_id"], row["date"])
 
-    db.commit()
 
-    instances = db.query(CIModel).filter(CIModel.id.in_(created_ids)).order_by(CIModel.date).all()
+def _ids_by_natural_key(db: Session, rows: List[dict]) -> dict:
+    """
+    ids de calendar_instances con el mismo (type, source_id, date) que alguna de `rows`,
+    por clave y en orden de id. Dentro de la transacción ve las filas propias y, con
+    REPEATABLE READ, no las que otras transacciones confirmen después de la primera lectura.
+    """
+    table = CIModel.__table__
+    keys = {_natural_key(row) for row in rows}
+    stmt = (
+        select(table.c.id, table.c.type, table.c.source_id, table.c.date)
+        .where(table.c.date.in_({row["date"] for row in rows}))
+        .order_by(table.c.id)
+    )
+    found: dict = {}
+    for row in db.execute(stmt).mappings():
+        key = _natural_key(row)
+        if key in keys:
+            found.setdefault(key, []).append(row["id"])
+    return found
+
+
+@router.post("/generate")
+def generate_calendar_instances(params: GenerateCalendarParams, db: Session = Depends(get_db)):
+    """
+    Genera instancias de calendario alternando grupo/taller en un rango de fechas.
+
+    La serie se calcula completa en memoria y se escribe con un INSERT multi-fila por
+    bloque de _GENERATE_CHUNK_SIZE. Con dry_run=True solo devuelve las fechas calculadas.
+    """
+    rows = _compute_generated_series(params)
+
+    ids: List[Optional[int]] = [None] * len(rows)
+    if not params.dry_run:
+        table = CIModel.__table__
+        for i in range(0, len(rows), _GENERATE_CHUNK_SIZE):
+            chunk = rows[i:i + _GENERATE_CHUNK_SIZE]
+            # Los ids no se deducen de lastrowid (depende del motor y de cómo asigne el
+            # autoincremento): se vuelven a leer por (type, source_id, date) y se descartan
+            # los que ya existían antes del INSERT.
+            before = _ids_by_natural_key(db, chunk)
+            db.execute(table.insert().values(chunk))
+            after = _ids_by_natural_key(db, chunk)
+            new_ids = {key: [x for x in found if x not in before.get(key, ())] for key, found in after.items()}
+            for j, row in enumerate(chunk):
+                ids[i + j] = new_ids[_natural_key(row)].pop(0)
+        calendar_read_model.refresh_instances(db, ids)
+        db.commit()
+
     return {
-        "created": len(created_ids),
+        "created": 0 if params.dry_run else len(rows),
+        "dry_run": params.dry_run,
         "instances": [
             {
-                "id": ci.id, "type": ci.type, "source_id": ci.source_id,
-                "date": str(ci.date), "start_time": _fmt_time(ci.start_time),
-                "end_time": _fmt_time(ci.end_time), "notes": ci.notes,
-                "status": ci.status, "coordinator": None, "co_coordinator": None,
+                "id": ci_id, "type": row["type"], "source_id": row["source_id"],
+                "date": str(row["date"]), "start_time": _fmt_time(row["start_time"]),
+                "end_time": _fmt_time(row["end_time"]), "notes": None,
+                "status": row["status"], "coordinator": None, "co_coordinator": None,
             }
-            for ci in instances
+            for ci_id, row in zip(ids, rows)
         ],
     }
 
 
+def _clone_shift(data: CloneCalendarRequest, lo: date, hi: date):
+    """
+    Expresión SQL de días a sumar a ci.date, sus parámetros y el rango destino [lo, hi).
+    En el modo por mes, cada día de la semana tiene su propio corrimiento: la distancia
+    entre su primera aparición en el mes origen y en el mes destino.
+    """
+    if data.offset_days is not None:
+        if data.target_year is not None or data.target_month is not None:
+            raise HTTPException(status_code=400, detail="Usar offset_days o target_year/target_month, no ambos")
+        if data.offset_days == 0:
+            raise HTTPException(status_code=400, detail="offset_days no puede ser 0")
+        offset = timedelta(days=data.offset_days)
+        return ":offset", {"offset": data.offset_days}, lo + offset, hi + offset
+
+    if data.target_year is None or data.target_month is None:
+        raise HTTPException(status_code=400, detail="Se requiere offset_days o target_year y target_month")
+    if not 1 <= data.target_month <= 12:
+        raise HTTPException(status_code=400, detail="Mes inválido")
+    source_lo, source_hi = _month_range(lo.year, lo.month)
+    if hi > source_hi:
+        raise HTTPException(status_code=400, detail="Para copiar a otro mes el rango origen debe estar en un solo mes")
+    target_lo, target_hi = _month_range(data.target_year, data.target_month)
+    if target_lo == source_lo:
+        raise HTTPException(status_code=400, detail="El mes destino es el mismo que el origen")
+
+    params = {}
+    cases = []
+    for weekday in range(7):
+        first_source = source_lo + timedelta(days=(weekday - source_lo.weekday()) % 7)
+        first_target = target_lo + timedelta(days=(weekday - target_lo.weekday()) % 7)
+        # DAYOFWEEK de MySQL: 1 = domingo ... 7 = sábado
+        params[f"wd_{weekday}"] = (first_target - first_source).days
+        cases.append(f"WHEN {(weekday + 1) % 7 + 1} THEN :wd_{weekday}")
+    shift = f"CASE DAYOFWEEK(ci.date) {' '.join(cases)} END"
+    shifts = params.values()
+    return (
+        shift,
+        params,
+        max(target_lo, lo + timedelta(days=min(shifts))),
+        min(target_hi, hi + timedelta(days=max(shifts))),
+    )
+
+
+def _clone_targets(db: Session, lo: date, hi: date):
+    """Instancias sueltas (sin regla) del rango destino [lo, hi)."""
+    return db.execute(text("""
+        SELECT id, type, source_id, date, start_time FROM calendar_instances
+        WHERE date >= :lo AND date < :hi AND recurrence_id IS NULL
+    """), {"lo": lo, "hi": hi}).fetchall()
+
+
+@router.post("/clone", response_model=CloneCalendarResponse)
+def clone_calendar(data: CloneCalendarRequest, db: Session = Depends(get_db)):
+    """
+    Copia en el servidor las instancias de un rango de fechas (opcionalmente de un tipo) a
+    otro período, con sus asignaciones si copy_assignments=True. Las instancias se copian con
+    un INSERT ... SELECT; las asignaciones, con un INSERT multi-fila armado a partir del
+    emparejamiento explícito origen → copia. Todo en una sola transacción.
+
+    Las ocurrencias materializadas de reglas de recurrencia no se copian: la regla ya
+    proyecta las del período destino. Las asignaciones copiadas no se validan contra
+    conflictos de horario; GET /calendar/conflicts los muestra.
+    """
+    if data.date_to < data.date_from:
+        raise HTTPException(status_code=400, detail="date_to debe ser posterior a date_from")
+    lo, hi = _date_window(None, None, data.date_from, data.date_to)
+    shift, params, target_lo, target_hi = _clone_shift(data, lo, hi)
+
+    clauses, window = _date_window_sql(lo, hi, "ci.date")
+    params.update(window)
+    clauses.append("ci.recurrence_id IS NULL")
+    if data.type is not None:
+        clauses.append("ci.type = :type")
+        params["type"] = data.type
+    if data.offset_days is None:
+        # Un 5.º día de la semana que no existe en el mes destino cae fuera de él
+        clauses.append(f"DATE_ADD(ci.date, INTERVAL {shift} DAY) < :target_hi")
+        params["target_hi"] = _month_range(data.target_year, data.target_month)[1]
+    where = " AND ".join(clauses)
+
+    # La primera lectura fija la vista de la transacción: con REPEATABLE READ, lo que otras
+    # transacciones inserten en el destino después no aparece en las lecturas siguientes.
+    sources = db.execute(text(f"""
+        SELECT ci.id, ci.type, ci.source_id, ci.start_time,
+               DATE_ADD(ci.date, INTERVAL {shift} DAY) AS new_date
+        FROM calendar_instances ci
+        WHERE {where}
+        ORDER BY ci.id
+    """), params).fetchall()
+    before = {row.id for row in _clone_targets(db, target_lo, target_hi)}
+
+    result = db.execute(text(f"""
+        INSERT INTO calendar_instances (type, source_id, date, start_time, end_time, notes, status)
+        SELECT ci.type, ci.source_id, DATE_ADD(ci.date, INTERVAL {shift} DAY),
+               ci.start_time, ci.end_time, ci.notes, ci.status
+        FROM calendar_instances ci
+        WHERE {where}
+        ORDER BY ci.id
+    """), params)
+    instances = result.rowcount
+
+    assignments = 0
+    if data.copy_assignments and instances:
+        # Cada copia se empareja con su origen por (fecha, hora, tipo, fuente) entre las
+        # filas que no estaban antes del INSERT; no se supone nada del orden de los ids.
+        created: dict = {}
+        for row in _clone_targets(db, target_lo, target_hi):
+            if row.id not in before:
+                created.setdefault((str(row.date), row.start_time, row.type, row.source_id), []).append(row.id)
+        target_of = {}
+        for row in sources:
+            copies = created.get((str(row.new_date)[:10], row.start_time, row.type, row.source_id))
+            if copies:
+                target_of[row.id] = copies.pop(0)
+        rows = []
+        if target_of:
+            stmt = text("""
+                SELECT instance_id, volunteer_id, role FROM calendar_assignments
+                WHERE instance_id IN :ids ORDER BY id
+            """).bindparams(bindparam("ids", expanding=True))
+            for row in db.execute(stmt, {"ids": list(target_of)}):
+                rows.append({"instance_id": target_of[row.instance_id], "volunteer_id": row.volunteer_id, "role": row.role})
+        if rows:
+            db.execute(CAModel.__table__.insert().values(rows))
+        assignments = len(rows)
+
+    calendar_read_model.refresh_window(db, target_lo, target_hi)
+    db.commit()
+    if assignments:
+        conflict_index.invalidate()
+
+    return {
+        "instances": instances,
+        "assignments": assignments,
+        "target_from": target_lo,
+        "target_to": target_hi - timedelta(days=1),
+    }
+
+
 @router.post("/bulk-count")
 def bulk_count(filters: BulkDeleteFilters, db: Session = Depends(get_db)):
+    """Cuenta lo que borraría /bulk-delete con los mismos filtros (y el mismo cursor after_id)."""
     where, bind = _build_bulk_where(filters)
     row = db.execute(text(f"SELECT COUNT(*) AS cnt FROM calendar_instances WHERE {where}"), bind).fetchone()
-    return {"count": row.cnt if row else 0}
+    count = row.cnt if row else 0
+    if not filters.chunked:
+        return {"count": count}
+    batch_size = _bulk_batch_size(filters)
+    return {"count": count, "batch_size": batch_size, "batches": -(-count // batch_size)}
 
 
 @router.post("/bulk-delete")
 def bulk_delete(filters: BulkDeleteFilters, db: Session = Depends(get_db)):
+    """
+    Borra las instancias que cumplen los filtros (en cascada, sus asignaciones y participantes).
+
+    Con chunked=True borra por lotes de batch_size ids, en orden de id y con un commit por
+    lote, para no retener locks sobre la tabla durante todo el borrado. Con max_batches se
+    acota el trabajo por petición: si la respuesta trae done=False, se continúa enviando
+    after_id=last_id.
+    """
     where, bind = _build_bulk_where(filters)
-    result = db.execute(text(f"DELETE FROM calendar_instances WHERE {where}"), bind)
-    db.commit()
-    return {"deleted": result.rowcount}
+    if not filters.chunked:
+        result = db.execute(text(f"DELETE FROM calendar_instances WHERE {where}"), bind)
+        db.commit()
+        conflict_index.invalidate()
+        return {"deleted": result.rowcount}
+
+    batch_size = _bulk_batch_size(filters)
+    select_ids = text(
+        f"SELECT id FROM calendar_instances WHERE {where} ORDER BY id LIMIT :batch_size"
+    )
+    delete_ids = text("DELETE FROM calendar_instances WHERE id IN :ids").bindparams(
+        bindparam("ids", expanding=True)
+    )
+
+    deleted = 0
+    batches = 0
+    last_id = filters.after_id
+    done = False
+    while filters.max_batches is None or batches < filters.max_batches:
+        bind["after_id"] = last_id or 0
+        ids = [row.id for row in db.execute(select_ids, {**bind, "batch_size": batch_size})]
+        if not ids:
+            done = True
+            break
+        deleted += db.execute(delete_ids, {"ids": ids}).rowcount
+        db.commit()
+        conflict_index.drop_instances(ids)
+        batches += 1
+        last_id = ids[-1]
+        if len(ids) < batch_size:
+            done = True
+            break
+
+    remaining = 0
+    if not done:
+        bind["after_id"] = last_id or 0
+        remaining = db.execute(
+            text(f"SELECT COUNT(*) AS cnt FROM calendar_instances WHERE {where}"), bind
+        ).fetchone().cnt
+        done = remaining == 0
+    return {
+        "deleted": deleted,
+        "batches": batches,
+        "last_id": last_id,
+        "remaining": remaining,
+        "done": done,
+    }
+
+
+def _bulk_batch_size(filters: BulkDeleteFilters) -> int:
+    # batch_size < 1 ya lo rechaza el modelo (422)
+    return filters.batch_size if filters.batch_size is not None else settings.CALENDAR_DELETE_BATCH_SIZE
 
 
 def _build_bulk_where(filters: BulkDeleteFilters):
+    """
+    Planificador común de /bulk-count y /bulk-delete: condición WHERE y parámetros para
+    el scope pedido, más el cursor after_id cuando se trabaja por lotes.
+    """
+    where, bind = _build_scope_where(filters)
+    if filters.chunked:
+        where += " AND id > :after_id"
+        bind["after_id"] = filters.after_id or 0
+    return where, bind
+
+
+def _build_scope_where(filters: BulkDeleteFilters):
     if filters.scope == "month":
-        return "YEAR(date) = :year AND MONTH(date) = :month", {"year": filters.year, "month": filters.month}
+        if filters.year is None or filters.month is None:
+            raise HTTPException(status_code=400, detail="El scope 'month' requiere year y month")
+        clauses, bind = _date_window_sql(*_date_window(filters.year, filters.month))
+        return " AND ".join(clauses), bind
     elif filters.scope == "type":
         return "type = :type", {"type": filters.type}
     elif filters.scope == "series":
@@ -314,6 +1531,10 @@ def list_event_participants(event_id: int, db: Session = Depends(get_db)):
 def add_event_participant(event_id: int, data: CalendarEventParticipantCreate, db: Session = Depends(get_db)):
     if not db.query(CIModel).filter(CIModel.id == event_id).first():
         raise HTTPException(status_code=404, detail="Instancia no encontrada")
+    if db.query(CEPModel).filter(
+        CEPModel.event_id == event_id, CEPModel.participant_id == data.participant_id
+    ).first():
+        raise HTTPException(status_code=409, detail="El participante ya está registrado en esta instancia")
     cep = CEPModel(**{**data.model_dump(), "event_id": event_id})
     db.add(cep)
     db.commit()
@@ -321,6 +1542,49 @@ def add_event_participant(event_id: int, data: CalendarEventParticipantCreate, d
     return cep
 
 
+@router.post("/instances/{event_id}/check-in", response_model=CheckInResponse)
+def check_in_participants(event_id: int, data: CheckInRequest, db: Session = Depends(get_db)):
+    """
+    Marca asistencia ("asistio") de uno o varios participantes, por id o email.
+    Resuelve todos con una consulta y escribe con un único INSERT ... ON DUPLICATE KEY
+    UPDATE: repetir el escaneo, o escanear desde varios dispositivos a la vez, es idempotente.
+    """
+    if not db.query(CIModel.id).filter(CIModel.id == event_id).first():
+        raise HTTPException(status_code=404, detail="Instancia no encontrada")
+
+    requested_ids = set(data.participant_ids)
+    requested_emails = {e.strip().lower() for e in data.emails if e.strip()}
+    if not requested_ids and not requested_emails:
+        raise HTTPException(status_code=400, detail="Se requiere al menos un participante")
+
+    found = db.query(ParticipantModel.id, ParticipantModel.email).filter(
+        or_(
+            ParticipantModel.id.in_(requested_ids),
+            # la collation de MySQL compara emails sin distinguir mayúsculas y usa el índice único
+            ParticipantModel.email.in_(requested_emails),
+        )
+    ).all()
+    known_ids = {p.id for p in found}
+    matched_emails = {p.email.lower() for p in found if p.email}
+    participant_ids = sorted(
+        (requested_ids & known_ids) | {p.id for p in found if p.email and p.email.lower() in requested_emails}
+    )
+
+    if participant_ids:
+        stmt = mysql_insert(CEPModel.__table__).values(
+            [{"event_id": event_id, "participant_id": pid, "status": "asistio"} for pid in participant_ids]
+        )
+        db.execute(stmt.on_duplicate_key_update(status=stmt.inserted.status))
+        db.commit()
+
+    return {
+        "event_id": event_id,
+        "checked_in": participant_ids,
+        "unknown_participant_ids": sorted(requested_ids - known_ids),
+        "unknown_emails": sorted(requested_emails - matched_emails),
+    }
+
+
 @router.put("/event-participants/{id}", response_model=CalendarEventParticipant)
 def update_event_participant(id: int, data: CalendarEventParticipantUpdate, db: Session = Depends(get_db)):
     cep = db.query(CEPModel).filter(CEPModel.id == id).first()
@@ -1,17 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import bindparam, func, select, text
+from sqlalchemy.orm import Session, aliased
 from typing import List, Optional
 
 from app.database import get_db
+from app.pagination import NEXT_CURSOR_HEADER, after, encode_cursor
 from app.models.idea import Idea as IdeaModel
 from app.models.idea_comment import IdeaComment as IdeaCommentModel
-from app.schemas.idea import Idea, IdeaCreate, IdeaUpdate, IdeaCommentCreate, IdeaCommentOut
+from app.schemas.idea import (
+    Idea, IdeaCreate, IdeaUpdate, IdeaCommentCreate, IdeaCommentOut, IdeaSearchResult, IdeaCategoryCount,
+)
+from app.services import idea_categories, idea_search
 
 router = APIRouter()
 
 
-def _serialize_idea(idea: IdeaModel) -> dict:
-    """Serializa una idea incluyendo nombre del creador y cantidad de comentarios."""
+def _serialize_idea(idea: IdeaModel, comment_count: Optional[int] = None) -> dict:
+    """
+    Serializa una idea incluyendo nombre del creador y cantidad de comentarios.
+    Los listados pasan comment_count ya calculado; si no, se cuenta con una consulta.
+    """
     creator_name = None
     if idea.created_by is not None:
         creator_name = f"{idea.created_by.name or ''} {idea.created_by.last_name or ''}".strip() or None
@@ -22,7 +30,7 @@ def _serialize_idea(idea: IdeaModel) -> dict:
         "category": idea.category,
         "created_by_volunteer_id": idea.created_by_volunteer_id,
         "created_by_name": creator_name,
-        "comment_count": idea.comments.count(),
+        "comment_count": idea.comments.count() if comment_count is None else comment_count,
         "created_at": idea.created_at,
         "updated_at": idea.updated_at,
     }
@@ -43,33 +51,140 @@ def _serialize_comment(c: IdeaCommentModel) -> dict:
     }
 
 
+_LATEST_COMMENTS_SQL = text("""
+    SELECT c.id, c.idea_id, c.volunteer_id, c.body, c.created_at, v.name, v.last_name
+    FROM (
+        SELECT ic.id, ic.idea_id, ic.volunteer_id, ic.body, ic.created_at,
+               ROW_NUMBER() OVER (PARTITION BY ic.idea_id ORDER BY ic.created_at DESC, ic.id DESC) AS rn
+        FROM idea_comments ic
+        WHERE ic.idea_id IN :ids
+    ) c
+    LEFT JOIN voluntarios v ON v.id = c.volunteer_id
+    WHERE c.rn <= :n
+    ORDER BY c.idea_id, c.rn DESC
+""").bindparams(bindparam("ids", expanding=True))
+
+
+def _latest_comments(db: Session, idea_ids: List[int], n: int) -> dict:
+    """
+    Últimos n comentarios de cada idea (en orden cronológico) con una sola consulta
+    ventaneada. Devuelve {idea_id: [comentario serializado]}.
+    """
+    result: dict = {idea_id: [] for idea_id in idea_ids}
+    if not idea_ids:
+        return result
+    for row in db.execute(_LATEST_COMMENTS_SQL, {"ids": idea_ids, "n": n}):
+        volunteer_name = f"{row.name or ''} {row.last_name or ''}".strip() or None
+        result[row.idea_id].append({
+            "id": row.id,
+            "idea_id": row.idea_id,
+            "volunteer_id": row.volunteer_id,
+            "volunteer_name": volunteer_name,
+            "body": row.body,
+            "created_at": row.created_at,
+        })
+    return result
+
+
 # ── Ideas ──────────────────────────────────────────────────────────────
 
 @router.get("/", response_model=List[Idea])
 def list_ideas(
+    response: Response,
     skip: int = 0,
     limit: int = 500,
     category: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None),
+    include_comments: int = Query(0, ge=0, le=20),
     db: Session = Depends(get_db),
 ):
+    """
+    Ideas de la más nueva a la más vieja. Si hay más, X-Next-Cursor trae el cursor de la
+    página siguiente; pasarlo en cursor (en lugar de skip) pagina por clave sin OFFSET.
+
+    Con include_comments=N cada idea trae en comments sus últimos N comentarios, cargados
+    para toda la página con una sola consulta.
+    """
     q = db.query(IdeaModel)
     if category is not None:
         q = q.filter(IdeaModel.category == category)
-    ideas = q.order_by(IdeaModel.created_at.desc()).offset(skip).limit(limit).all()
-    return [_serialize_idea(i) for i in ideas]
+    q = q.order_by(IdeaModel.created_at.desc(), IdeaModel.id.desc())
+    if cursor is not None:
+        q = q.filter(after(IdeaModel.created_at, IdeaModel.id, cursor, descending=True))
+    else:
+        q = q.offset(skip)
+    # Conteo de comentarios en la misma sentencia, correlacionado con las filas de la
+    # página ya recortada: cuesta lo que los comentarios de esas ideas (índice por idea_id),
+    # no un GROUP BY sobre toda la tabla.
+    page = aliased(IdeaModel, q.limit(limit + 1).subquery("page"))
+    comment_count = (
+        select(func.count(IdeaCommentModel.id))
+        .where(IdeaCommentModel.idea_id == page.id)
+        .scalar_subquery()
+    )
+    rows = db.query(page, comment_count).order_by(page.created_at.desc(), page.id.desc()).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1][0]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.created_at, last.id)
+    result = [_serialize_idea(idea, comment_count) for idea, comment_count in rows]
+    if include_comments:
+        comments = _latest_comments(db, [r["id"] for r in result], include_comments)
+        for r in result:
+            r["comments"] = comments[r["id"]]
+    return result
 
 
 @router.get("/categories", response_model=List[str])
 def list_categories(db: Session = Depends(get_db)):
-    """Devuelve las categorías distintas que existen en ideas (sin nulls)."""
-    rows = (
-        db.query(IdeaModel.category)
-        .filter(IdeaModel.category.isnot(None), IdeaModel.category != "")
-        .distinct()
-        .order_by(IdeaModel.category)
+    """Devuelve las categorías distintas que existen en ideas (sin nulls), desde la caché."""
+    return idea_categories.cache.names(db)
+
+
+@router.get("/categories/counts", response_model=List[IdeaCategoryCount])
+def list_category_counts(db: Session = Depends(get_db)):
+    """Cantidad de ideas por categoría, desde la caché."""
+    return [{"category": category, "count": count} for category, count in idea_categories.cache.counts(db)]
+
+
+@router.get("/search", response_model=List[IdeaSearchResult])
+def search_ideas(
+    q: str = Query(..., min_length=2, max_length=200),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+):
+    """
+    Busca en título, cuerpo y comentarios de las ideas, ordenado por relevancia.
+    Ver app/services/idea_search.py.
+    """
+    ranked = idea_search.search(db, q, skip, limit)
+    if not ranked:
+        return []
+    ids = [idea_id for idea_id, _ in ranked]
+    counts = dict(
+        db.query(IdeaCommentModel.idea_id, func.count(IdeaCommentModel.id))
+        .filter(IdeaCommentModel.idea_id.in_(ids))
+        .group_by(IdeaCommentModel.idea_id)
         .all()
     )
-    return [r[0] for r in rows]
+    ideas = {idea.id: idea for idea in db.query(IdeaModel).filter(IdeaModel.id.in_(ids))}
+    terms = set(idea_search.tokenize(q))
+    comments = idea_search.matching_comments(db, ids, terms)
+
+    results = []
+    for idea_id, score in ranked:
+        idea = ideas.get(idea_id)
+        if idea is None:
+            continue
+        results.append({
+            **_serialize_idea(idea, counts.get(idea_id, 0)),
+            "score": score,
+            "title_highlight": idea_search.highlight(idea.title, terms),
+            "body_snippet": idea_search.snippet(idea.body, terms),
+            "comment_snippet": idea_search.snippet(comments.get(idea_id), terms),
+        })
+    return results
 
 
 @router.get("/{id}", response_model=Idea)
@@ -86,7 +201,9 @@ def create_idea(data: IdeaCreate, db: Session = Depends(get_db)):
     db.add(idea)
     db.commit()
     db.refresh(idea)
-    return _serialize_idea(idea)
+    idea_search.index.refresh(db, idea.id)
+    idea_categories.cache.add(idea.category)
+    return _serialize_idea(idea, comment_count=0)
 
 
 @router.put("/{id}", response_model=Idea)
@@ -94,10 +211,13 @@ def update_idea(id: int, data: IdeaUpdate, db: Session = Depends(get_db)):
     idea = db.query(IdeaModel).filter(IdeaModel.id == id).first()
     if not idea:
         raise HTTPException(status_code=404, detail="Idea no encontrada")
+    old_category = idea.category
     for key, value in data.model_dump(exclude_unset=True).items():
         setattr(idea, key, value)
     db.commit()
     db.refresh(idea)
+    idea_search.index.refresh(db, id)
+    idea_categories.cache.replace(old_category, idea.category)
     return _serialize_idea(idea)
 
 
@@ -106,22 +226,39 @@ def delete_idea(id: int, db: Session = Depends(get_db)):
     idea = db.query(IdeaModel).filter(IdeaModel.id == id).first()
     if not idea:
         raise HTTPException(status_code=404, detail="Idea no encontrada")
+    category = idea.category
     db.delete(idea)
     db.commit()
+    idea_search.index.drop(id)
+    idea_categories.cache.remove(category)
 
 
 # ── Comentarios ────────────────────────────────────────────────────────
 
 @router.get("/{idea_id}/comments", response_model=List[IdeaCommentOut])
-def list_comments(idea_id: int, db: Session = Depends(get_db)):
-    if not db.query(IdeaModel).filter(IdeaModel.id == idea_id).first():
+def list_comments(
+    idea_id: int,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = Query(None),
+    db: Session = Depends(get_db),
+):
+    """
+    Comentarios del más viejo al más nuevo. Sin limit devuelve el hilo completo; con limit
+    devuelve una página y, si hay más, X-Next-Cursor para pedir la siguiente con cursor.
+    """
+    if not db.query(IdeaModel.id).filter(IdeaModel.id == idea_id).first():
         raise HTTPException(status_code=404, detail="Idea no encontrada")
-    comments = (
-        db.query(IdeaCommentModel)
-        .filter(IdeaCommentModel.idea_id == idea_id)
-        .order_by(IdeaCommentModel.created_at.asc())
-        .all()
-    )
+    q = db.query(IdeaCommentModel).filter(IdeaCommentModel.idea_id == idea_id)
+    if cursor is not None:
+        q = q.filter(after(IdeaCommentModel.created_at, IdeaCommentModel.id, cursor, descending=False))
+    q = q.order_by(IdeaCommentModel.created_at.asc(), IdeaCommentModel.id.asc())
+    if limit is None:
+        return [_serialize_comment(c) for c in q.all()]
+    comments = q.limit(limit + 1).all()
+    if len(comments) > limit:
+        comments = comments[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(comments[-1].created_at, comments[-1].id)
     return [_serialize_comment(c) for c in comments]
 
 
@@ -137,6 +274,7 @@ def create_comment(idea_id: int, data: IdeaCommentCreate, volunteer_id: int = Qu
     db.add(comment)
     db.commit()
     db.refresh(comment)
+    idea_search.index.refresh(db, idea_id)
     return _serialize_comment(comment)
 
 
@@ -150,3 +288,4 @@ def delete_comment(idea_id: int, comment_id: int, db: Session = Depends(get_db))
         raise HTTPException(status_code=404, detail="Comentario no encontrado")
     db.delete(comment)
     db.commit()
+    idea_search.index.refresh(db, idea_id)
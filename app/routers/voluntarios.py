@@ -5,6 +5,7 @@ from typing import List, Optional
 from app.database import get_db
 from app.models.voluntario import Voluntario as VoluntarioModel
 from app.schemas.voluntario import Voluntario, VoluntarioCreate, VoluntarioUpdate, VoluntarioAuth
+from app.services import calendar_read_model
 
 router = APIRouter()
 
@@ -64,8 +65,11 @@ def update_voluntario(id: int, data: VoluntarioUpdate, db: Session = Depends(get
     v = db.query(VoluntarioModel).filter(VoluntarioModel.id == id).first()
     if not v:
         raise HTTPException(status_code=404, detail="Voluntario no encontrado")
-    for key, value in data.model_dump(exclude_unset=True).items():
+    changes = data.model_dump(exclude_unset=True)
+    for key, value in changes.items():
         setattr(v, key, value)
+    if "name" in changes or "last_name" in changes:
+        calendar_read_model.refresh_volunteer(db, id, v.name, v.last_name)
     db.commit()
     db.refresh(v)
     return v
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, ConfigDict
-from typing import Optional
-from datetime import datetime
+from typing import List, Optional
+from datetime import date, datetime
 
 
 # ── Auth Users ───────────────────────────────────────────────────────
@@ -75,6 +75,24 @@ class AuthLoginEvent(AuthLoginEventCreate):
     created_at: Optional[datetime] = None
 
 
+class AuthLoginDailyStat(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    day: date
+    email: str
+    auth_user_id: Optional[int] = None
+    success_count: int
+    failure_count: int
+
+
+class LoginEventsPurgeResult(BaseModel):
+    cutoff: datetime
+    batches: int
+    deleted: int
+    partitions_added: List[str] = []
+    partitions_dropped: List[str] = []
+
+
 # ── Auth Sessions ─────────────────────────────────────────────────────
 
 class AuthSessionCreate(BaseModel):
@@ -97,6 +115,38 @@ class AuthSession(AuthSessionCreate):
     created_at: Optional[datetime] = None
 
 
+class ResolvedSessionUser(BaseModel):
+    id: int
+    email: str
+    is_active: bool
+    email_verified: bool
+    is_volunteer: bool
+    volunteer_id: Optional[int] = None
+
+
+class ResolvedSessionVolunteer(BaseModel):
+    id: int
+    name: str
+    last_name: Optional[str] = None
+    status: str
+    is_admin: bool
+
+
+class ResolvedSessionParticipant(BaseModel):
+    id: int
+    is_active: bool
+    name: Optional[str] = None
+    last_name: Optional[str] = None
+
+
+class ResolvedSession(BaseModel):
+    """Sesión vigente con su usuario y el voluntario o participante vinculado."""
+    session: AuthSession
+    user: ResolvedSessionUser
+    volunteer: Optional[ResolvedSessionVolunteer] = None
+    participant: Optional[ResolvedSessionParticipant] = None  # vinculado por email
+
+
 # ── Password Reset Tokens ─────────────────────────────────────────────
 
 class PasswordResetTokenCreate(BaseModel):
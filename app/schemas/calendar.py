@@ -1,5 +1,5 @@
-from pydantic import BaseModel, ConfigDict
-from typing import Optional, Literal, List, Any
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from typing import Optional, Literal, List, Dict, Any
 from datetime import date, time, datetime
 
 
@@ -12,8 +12,12 @@ class VolunteerRef(BaseModel):
 
 
 class CalendarInstanceRich(BaseModel):
-    """Instancia de calendario con información de coordinadores incluida."""
-    id: int
+    """
+    Instancia de calendario con información de coordinadores incluida.
+    Las ocurrencias proyectadas de una regla de recurrencia vienen con id=None y recurrence_id.
+    """
+    id: Optional[int] = None
+    recurrence_id: Optional[int] = None
     type: str
     source_id: Optional[int] = None
     date: str
@@ -23,6 +27,7 @@ class CalendarInstanceRich(BaseModel):
     status: str
     coordinator: Optional[VolunteerRef] = None
     co_coordinator: Optional[VolunteerRef] = None
+    participant_counts: Optional[Dict[str, int]] = None  # solo con include_participant_counts
 
 
 # ── Operaciones bulk ──────────────────────────────────────────────────
@@ -33,6 +38,11 @@ class BulkDeleteFilters(BaseModel):
     month: Optional[int] = None
     type: Optional[str] = None
     source_id: Optional[int] = None
+    # Borrado por lotes: batch_size ids por commit, reanudable desde after_id
+    chunked: bool = False
+    batch_size: Optional[int] = Field(None, ge=1)
+    after_id: Optional[int] = None
+    max_batches: Optional[int] = None
 
 
 class GenerateCalendarParams(BaseModel):
@@ -43,12 +53,106 @@ class GenerateCalendarParams(BaseModel):
     interval_days: int = 14
     source_group_id: Optional[int] = None
     source_workshop_id: Optional[int] = None
+    dry_run: bool = False  # True: solo calcula y devuelve las fechas, sin escribir
+
+
+class CloneCalendarRequest(BaseModel):
+    """
+    Copia las instancias de [date_from, date_to] corriéndolas offset_days días, o bien al mes
+    target_year/target_month conservando el día de la semana y su orden en el mes
+    (el 2.º martes pasa al 2.º martes; un 5.º que no existe en el destino se omite).
+    """
+    date_from: date
+    date_to: date
+    offset_days: Optional[int] = None
+    target_year: Optional[int] = None
+    target_month: Optional[int] = None
+    type: Optional[str] = None
+    copy_assignments: bool = False
+
+
+class CloneCalendarResponse(BaseModel):
+    instances: int
+    assignments: int
+    target_from: date
+    target_to: date
 
 
 class AssignmentUpsertRequest(BaseModel):
     volunteer_id: int
 
 
+class AssignmentBatchItem(BaseModel):
+    instance_id: int
+    role: Literal["coordinator", "co_coordinator"]
+    volunteer_id: Optional[int] = None  # None = quitar el asignado de ese rol
+
+
+class AssignmentBatchRequest(BaseModel):
+    items: List[AssignmentBatchItem]
+    allow_conflicts: bool = False
+
+
+class AssignmentBatchResult(BaseModel):
+    instance_id: int
+    role: str
+    volunteer_id: Optional[int] = None
+    status: Literal["assigned", "removed", "unchanged", "error"]
+    detail: Optional[str] = None
+
+
+class AssignmentBatchResponse(BaseModel):
+    applied: int
+    errors: int
+    results: List[AssignmentBatchResult]
+
+
+class CalendarConflict(BaseModel):
+    """Dos instancias superpuestas asignadas al mismo voluntario."""
+    volunteer_id: int
+    volunteer_name: Optional[str] = None
+    date: str
+    instance_id: int
+    start_time: str
+    end_time: str
+    conflicting_instance_id: int
+    conflicting_start_time: str
+    conflicting_end_time: str
+
+
+class AutoAssignRequest(BaseModel):
+    """
+    Reparto automático de coordinadores en [date_from, date_to]. Solo se cubren los roles
+    vacantes: las asignaciones existentes se respetan y cuentan para el tope y el balance.
+    """
+    date_from: date
+    date_to: date
+    type: Optional[str] = None
+    roles: List[Literal["coordinator", "co_coordinator"]] = ["coordinator", "co_coordinator"]
+    specialties: Optional[List[str]] = None  # solo voluntarios con alguna de estas especialidades
+    volunteer_ids: Optional[List[int]] = None  # solo estos voluntarios
+    max_per_volunteer: Optional[int] = None  # tope general de asignaciones en el rango
+    caps: Dict[int, int] = {}  # topes por voluntario; tienen prioridad sobre max_per_volunteer
+    mode: Literal["preview", "commit"] = "preview"
+
+
+class AutoAssignSlot(BaseModel):
+    instance_id: int
+    role: str
+    date: str
+    start_time: str
+    volunteer_id: Optional[int] = None  # None = sin cubrir
+
+
+class AutoAssignResponse(BaseModel):
+    mode: str
+    assigned: int
+    unfilled: int
+    assignments: List[AutoAssignSlot]
+    unfilled_slots: List[AutoAssignSlot]
+    loads: Dict[int, int]  # asignaciones por voluntario en el rango, incluidas las previas
+
+
 # ── Calendar Instances ────────────────────────────────────────────────
 
 class CalendarInstanceBase(BaseModel):
@@ -79,10 +183,72 @@ class CalendarInstance(CalendarInstanceBase):
     model_config = ConfigDict(from_attributes=True)
 
     id: int
+    recurrence_id: Optional[int] = None
+    recurrence_date: Optional[date] = None
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
 
+# ── Calendar Recurrences ──────────────────────────────────────────────
+
+class CalendarRecurrenceBase(BaseModel):
+    type: Literal["grupo", "taller", "actividad"]
+    source_id: Optional[int] = None
+    start_date: date
+    start_time: time = time(10, 0)
+    end_time: time = time(12, 0)
+    freq: Literal["daily", "weekly"] = "weekly"
+    repeat_interval: int = 1
+    weekday: Optional[int] = None
+    until_date: Optional[date] = None
+    max_count: Optional[int] = None
+    exdates: List[date] = []
+    notes: Optional[str] = None
+    status: Literal["programado", "realizado", "cancelado"] = "programado"
+
+    @field_validator("repeat_interval")
+    @classmethod
+    def interval_positive(cls, v: int) -> int:
+        if v < 1:
+            raise ValueError("repeat_interval debe ser mayor a 0")
+        return v
+
+    @field_validator("weekday")
+    @classmethod
+    def weekday_range(cls, v: Optional[int]) -> Optional[int]:
+        if v is not None and not 0 <= v <= 6:
+            raise ValueError("weekday debe estar entre 0 (lunes) y 6 (domingo)")
+        return v
+
+
+class CalendarRecurrenceCreate(CalendarRecurrenceBase):
+    pass
+
+
+class CalendarRecurrenceUpdate(BaseModel):
+    source_id: Optional[int] = None
+    start_time: Optional[time] = None
+    end_time: Optional[time] = None
+    until_date: Optional[date] = None
+    max_count: Optional[int] = None
+    exdates: Optional[List[date]] = None
+    notes: Optional[str] = None
+    status: Optional[Literal["programado", "realizado", "cancelado"]] = None
+
+
+class CalendarRecurrence(CalendarRecurrenceBase):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    exdates: Optional[List[date]] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
+class MaterializeOccurrenceRequest(BaseModel):
+    date: date
+
+
 # ── Calendar Assignments ──────────────────────────────────────────────
 
 class CalendarAssignmentBase(BaseModel):
@@ -130,3 +296,16 @@ class CalendarEventParticipant(CalendarEventParticipantBase):
     id: int
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
+
+
+class CheckInRequest(BaseModel):
+    """Participantes a marcar como presentes, por id y/o por email (p. ej. desde un QR)."""
+    participant_ids: List[int] = []
+    emails: List[str] = []
+
+
+class CheckInResponse(BaseModel):
+    event_id: int
+    checked_in: List[int]
+    unknown_participant_ids: List[int] = []
+    unknown_emails: List[str] = []
@@ -98,3 +98,17 @@ class Idea(IdeaBase):
     comment_count: int = 0
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
+    comments: Optional[List[IdeaCommentOut]] = None  # solo con include_comments
+
+
+class IdeaSearchResult(Idea):
+    """Idea encontrada por GET /ideas/search. Los campos resaltados traen HTML escapado con <mark>."""
+    score: float
+    title_highlight: str
+    body_snippet: Optional[str] = None  # None si la coincidencia no está en el cuerpo
+    comment_snippet: Optional[str] = None  # fragmento del primer comentario que coincide
+
+
+class IdeaCategoryCount(BaseModel):
+    category: str
+    count: int
@@ -0,0 +1,190 @@
+"""
+Limpieza global de tokens y sesiones que ya no sirven.
+
+Borra de email_verification_tokens y password_reset_tokens los tokens vencidos o usados,
+y de auth_sessions las sesiones vencidas o revocadas, una vez que pasaron
+AUTH_SWEEP_RETAIN_HOURS desde el vencimiento, uso o revocación (así un enlace usado dos
+veces todavía responde "ya usado" en lugar de 404 durante ese margen).
+
+Borra por tandas de AUTH_SWEEP_BATCH_SIZE filas, cada una en su propia transacción, y como
+mucho AUTH_SWEEP_MAX_BATCHES tandas por tabla y corrida: una corrida sobre una tabla muy
+atrasada no bloquea a los logins, y lo que queda se borra en las siguientes. Cada condición
+(vencido; usado o revocado) se barre por separado, ordenada por su propia columna, para que
+cada tanda sea un rango sobre su índice (migrations/009) en lugar de un OR que termina
+recorriendo la clave primaria.
+
+Corre en un hilo de fondo cada AUTH_SWEEP_INTERVAL_SECONDS (arrancado en el lifespan de
+app/main.py; 0 lo desactiva) o a mano con python -m app.cli sweep-auth-tokens. Con varios
+workers cada uno corre el suyo; no hay problema, solo borran las mismas filas.
+"""
+import logging
+import threading
+import time as _time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session
+
+from config import settings
+from app.database import SessionLocal
+from app.services import session_cache
+
+log = logging.getLogger(__name__)
+
+# tabla -> (columna de hash, columna de uso/revocación)
+_TABLES: Dict[str, Tuple[str, str]] = {
+    "email_verification_tokens": ("token_hash", "used_at"),
+    "password_reset_tokens": ("token_hash", "used_at"),
+    "auth_sessions": ("session_token_hash", "revoked_at"),
+}
+
+
+def _columns(table: str) -> Tuple[str, str]:
+    """Columnas que se barren, cada una con su índice: vencimiento y uso/revocación."""
+    return "expires_at", _TABLES[table][1]
+
+
+def _select_sql(table: str, column: str):
+    hash_col, _ = _TABLES[table]
+    return text(f"""
+        SELECT id, {hash_col} AS token_hash FROM {table}
+        WHERE {column} < :cutoff
+        ORDER BY {column}
+        LIMIT :limit
+    """)
+
+
+def _delete_sql(table: str):
+    return text(f"DELETE FROM {table} WHERE id IN :ids").bindparams(bindparam("ids", expanding=True))
+
+
+_SELECT = {(table, column): _select_sql(table, column) for table in _TABLES for column in _columns(table)}
+_DELETE = {table: _delete_sql(table) for table in _TABLES}
+
+
+def sweep_table(db: Session, table: str, cutoff: datetime, batch_size: int, max_batches: int) -> Tuple[int, bool]:
+    """Borra hasta max_batches tandas de `table`. Devuelve (filas borradas, si quedó algo pendiente)."""
+    deleted = batches = 0
+    for column in _columns(table):
+        while True:
+            if batches >= max_batches:
+                return deleted, True
+            rows = db.execute(_SELECT[table, column], {"cutoff": cutoff, "limit": batch_size}).fetchall()
+            if not rows:
+                break
+            db.execute(_DELETE[table], {"ids": [row.id for row in rows]})
+            db.commit()
+            batches += 1
+            deleted += len(rows)
+            if table == "auth_sessions":
+                for row in rows:
+                    session_cache.cache.invalidate(row.token_hash)
+            if len(rows) < batch_size:
+                break
+    return deleted, False
+
+
+def sweep(
+    db: Session,
+    now: Optional[datetime] = None,
+    batch_size: Optional[int] = None,
+    max_batches: Optional[int] = None,
+) -> Dict:
+    """Una corrida sobre las tres tablas. Devuelve lo borrado por tabla."""
+    now = now or datetime.utcnow()
+    cutoff = now - timedelta(hours=settings.AUTH_SWEEP_RETAIN_HOURS)
+    batch_size = batch_size or settings.AUTH_SWEEP_BATCH_SIZE
+    max_batches = max_batches or settings.AUTH_SWEEP_MAX_BATCHES
+    deleted: Dict[str, int] = {}
+    pending: List[str] = []
+    for table in _TABLES:
+        deleted[table], more = sweep_table(db, table, cutoff, batch_size, max_batches)
+        if more:
+            pending.append(table)
+    return {"cutoff": cutoff, "deleted": deleted, "pending": pending}
+
+
+# ── Hilo de fondo y métricas ──────────────────────────────────────────
+
+class Sweeper:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stats = {
+            "runs": 0,
+            "failed_runs": 0,
+            "deleted": {table: 0 for table in _TABLES},
+            "last_run_at": None,
+            "last_duration_ms": None,
+            "last_deleted": None,
+            "last_pending": [],
+            "last_error": None,
+        }
+
+    def run_once(self, **kwargs) -> Dict:
+        """Corre sweep() con su propia sesión y registra el resultado en las métricas."""
+        started = _time.perf_counter()
+        db = SessionLocal()
+        try:
+            result = sweep(db, **kwargs)
+        except Exception as exc:
+            db.rollback()
+            with self._lock:
+                self._stats["failed_runs"] += 1
+                self._stats["last_error"] = repr(exc)
+            raise
+        finally:
+            db.close()
+        duration_ms = round((_time.perf_counter() - started) * 1000, 1)
+        with self._lock:
+            self._stats["runs"] += 1
+            for table, n in result["deleted"].items():
+                self._stats["deleted"][table] += n
+            self._stats["last_run_at"] = datetime.utcnow()
+            self._stats["last_duration_ms"] = duration_ms
+            self._stats["last_deleted"] = result["deleted"]
+            self._stats["last_pending"] = result["pending"]
+            self._stats["last_error"] = None
+        log.info("Limpieza de tokens y sesiones: %s en %.1f ms", result["deleted"], duration_ms)
+        return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self._stats,
+                "deleted": dict(self._stats["deleted"]),
+                "running": self._thread is not None,
+                "interval_seconds": settings.AUTH_SWEEP_INTERVAL_SECONDS,
+            }
+
+    def start(self) -> None:
+        if settings.AUTH_SWEEP_INTERVAL_SECONDS <= 0:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._wake.clear()
+            self._thread = threading.Thread(target=self._run, name="auth-sweeper", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        with self._lock:
+            thread = self._thread
+        if thread is None:
+            return
+        self._wake.set()
+        thread.join(timeout)
+        with self._lock:
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._wake.wait(settings.AUTH_SWEEP_INTERVAL_SECONDS):
+            try:
+                self.run_once()
+            except Exception:
+                log.exception("Falló la limpieza de tokens y sesiones")
+
+
+sweeper = Sweeper()
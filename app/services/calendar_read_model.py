@@ -0,0 +1,166 @@
+"""
+Modelo de lectura del calendario: calendar_instances_rich guarda cada instancia ya unida
+a sus coordinadores (la forma de CalendarInstanceRich), para que la vista mensual sea una
+sola lectura por rango sobre (date, start_time).
+
+Los routers lo mantienen al día de forma incremental dentro de la misma transacción que
+la escritura (refresh_instances / refresh_volunteer); los borrados de instancias se
+propagan solos por la FK con ON DELETE CASCADE. rebuild() lo regenera completo sin dejarlo
+vacío en el medio: python -m app.cli rebuild-calendar-read-model.
+
+Solo se usa con CALENDAR_READ_MODEL_ENABLED; mientras está apagado, las funciones de
+mantenimiento no hacen nada.
+"""
+from datetime import date
+from typing import Iterable, List, Optional
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.orm import Session
+
+from config import settings
+from app.models.calendar import CalendarInstanceReadModel as ReadModel
+
+IN_CHUNK_SIZE = 1000
+
+_UPDATABLE_COLUMNS = [
+    "recurrence_id", "type", "source_id", "date", "start_time", "end_time", "notes", "status",
+    "coordinator_id", "coordinator_name", "coordinator_last_name",
+    "co_coordinator_id", "co_coordinator_name", "co_coordinator_last_name",
+]
+
+
+def enabled() -> bool:
+    return settings.CALENDAR_READ_MODEL_ENABLED
+
+
+def load_coordinators(db: Session, instance_ids: List[int]) -> dict:
+    """
+    Carga coordinador y co-coordinador de varias instancias con una consulta por lote
+    de ids, pivotando los roles en Python. Si una instancia tuviera más de una fila por
+    rol, se conserva la de menor id en lugar de multiplicar filas.
+    Devuelve {instance_id: {"coordinator": {...} | None, "co_coordinator": {...} | None}}.
+    """
+    result: dict = {}
+    stmt = text("""
+        SELECT ca.instance_id, ca.role, v.id AS vol_id, v.name, v.last_name
+        FROM calendar_assignments ca
+        JOIN voluntarios v ON v.id = ca.volunteer_id
+        WHERE ca.instance_id IN :ids AND ca.role IN ('coordinator', 'co_coordinator')
+        ORDER BY ca.id
+    """).bindparams(bindparam("ids", expanding=True))
+    for i in range(0, len(instance_ids), IN_CHUNK_SIZE):
+        chunk = instance_ids[i:i + IN_CHUNK_SIZE]
+        for row in db.execute(stmt, {"ids": chunk}):
+            roles = result.setdefault(row.instance_id, {})
+            if row.role not in roles:
+                roles[row.role] = {"id": row.vol_id, "name": row.name, "last_name": row.last_name or ""}
+    return result
+
+
+def _write(db: Session, instance_ids: List[int]) -> int:
+    """Recalcula y guarda (upsert) las filas de un lote de instancias."""
+    stmt = text("""
+        SELECT id, recurrence_id, type, source_id, date, start_time, end_time, notes, status
+        FROM calendar_instances WHERE id IN :ids
+    """).bindparams(bindparam("ids", expanding=True))
+    rows = db.execute(stmt, {"ids": instance_ids}).fetchall()
+    coordinators = load_coordinators(db, [row.id for row in rows])
+
+    values = []
+    for row in rows:
+        roles = coordinators.get(row.id, {})
+        coord = roles.get("coordinator") or {}
+        cocoord = roles.get("co_coordinator") or {}
+        values.append({
+            "instance_id": row.id,
+            "recurrence_id": row.recurrence_id,
+            "type": row.type,
+            "source_id": row.source_id,
+            "date": row.date,
+            "start_time": row.start_time,
+            "end_time": row.end_time,
+            "notes": row.notes,
+            "status": row.status,
+            "coordinator_id": coord.get("id"),
+            "coordinator_name": coord.get("name"),
+            "coordinator_last_name": coord.get("last_name"),
+            "co_coordinator_id": cocoord.get("id"),
+            "co_coordinator_name": cocoord.get("name"),
+            "co_coordinator_last_name": cocoord.get("last_name"),
+        })
+
+    gone = set(instance_ids) - {row.id for row in rows}
+    if gone:
+        db.query(ReadModel).filter(ReadModel.instance_id.in_(gone)).delete(synchronize_session=False)
+    if values:
+        insert = mysql_insert(ReadModel.__table__).values(values)
+        db.execute(insert.on_duplicate_key_update(
+            {col: insert.inserted[col] for col in _UPDATABLE_COLUMNS}
+        ))
+    return len(values)
+
+
+def refresh_instances(db: Session, instance_ids: Iterable[int]) -> None:
+    """Actualiza las filas de esas instancias. No hace commit: va en la transacción del llamador."""
+    if not enabled():
+        return
+    ids = sorted(set(instance_ids))
+    if not ids:
+        return
+    db.flush()
+    for i in range(0, len(ids), IN_CHUNK_SIZE):
+        _write(db, ids[i:i + IN_CHUNK_SIZE])
+
+
+def refresh_window(db: Session, lo: date, hi: date) -> None:
+    """Actualiza todas las instancias con fecha en [lo, hi)."""
+    if not enabled():
+        return
+    db.flush()
+    ids = [row.id for row in db.execute(
+        text("SELECT id FROM calendar_instances WHERE date >= :lo AND date < :hi"), {"lo": lo, "hi": hi}
+    )]
+    refresh_instances(db, ids)
+
+
+def refresh_volunteer(db: Session, volunteer_id: int, name: Optional[str], last_name: Optional[str]) -> None:
+    """Propaga un cambio de nombre del voluntario a las filas donde figura como asignado."""
+    if not enabled():
+        return
+    params = {"vol_id": volunteer_id, "name": name, "last_name": last_name or ""}
+    db.execute(text("""
+        UPDATE calendar_instances_rich
+        SET coordinator_name = :name, coordinator_last_name = :last_name
+        WHERE coordinator_id = :vol_id
+    """), params)
+    db.execute(text("""
+        UPDATE calendar_instances_rich
+        SET co_coordinator_name = :name, co_coordinator_last_name = :last_name
+        WHERE co_coordinator_id = :vol_id
+    """), params)
+
+
+def rebuild(db: Session, batch_size: int = IN_CHUNK_SIZE) -> int:
+    """
+    Regenera el modelo de lectura completo recorriendo calendar_instances por lotes de id,
+    con un commit por lote. Las filas se reemplazan in situ, así que la vista sigue
+    respondiendo mientras tanto.
+    """
+    total = 0
+    last_id = 0
+    select_ids = text("SELECT id FROM calendar_instances WHERE id > :after ORDER BY id LIMIT :limit")
+    while True:
+        ids = [row.id for row in db.execute(select_ids, {"after": last_id, "limit": batch_size})]
+        if not ids:
+            break
+        total += _write(db, ids)
+        db.commit()
+        last_id = ids[-1]
+    db.execute(text("""
+        DELETE r FROM calendar_instances_rich r
+        LEFT JOIN calendar_instances ci ON ci.id = r.instance_id
+        WHERE ci.id IS NULL
+    """))
+    db.commit()
+    return total
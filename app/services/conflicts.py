@@ -0,0 +1,188 @@
+"""
+Índice en memoria de los horarios asignados a cada voluntario, para detectar superposiciones.
+
+Cada asignación (voluntario, instancia) se guarda como un intervalo en minutos absolutos
+(fecha.toordinal() * 1440 + minutos del día), en una lista ordenada por inicio por voluntario.
+Buscar superposiciones para un horario nuevo es una búsqueda binaria más los vecinos que
+efectivamente se superponen.
+
+El índice se carga perezosamente desde calendar_assignments y los routers lo actualizan
+después de cada escritura. Es por proceso: si la API corre con varios workers, el TTL
+(CALENDAR_CONFLICT_INDEX_TTL_SECONDS) acota cuánto puede tardar en ver escrituras ajenas.
+"""
+import bisect
+import threading
+import time as _time
+from datetime import date, time, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session
+
+from config import settings
+
+_MINUTES_PER_DAY = 1440
+
+_ASSIGNMENTS_SQL = """
+    SELECT ca.instance_id, ca.volunteer_id, ci.date, ci.start_time, ci.end_time
+    FROM calendar_assignments ca
+    JOIN calendar_instances ci ON ci.id = ca.instance_id
+    WHERE ci.status <> 'cancelado'
+"""
+
+
+def to_minutes(value) -> int:
+    """Minutos desde medianoche para time, timedelta (PyMySQL TIME) o 'HH:MM[:SS]'."""
+    if isinstance(value, timedelta):
+        return int(value.total_seconds()) // 60
+    if isinstance(value, time):
+        return value.hour * 60 + value.minute
+    hours, minutes = str(value).split(":")[:2]
+    return int(hours) * 60 + int(minutes)
+
+
+def interval_for(day, start, end) -> Tuple[int, int]:
+    if isinstance(day, str):
+        day = date.fromisoformat(day)
+    base = day.toordinal() * _MINUTES_PER_DAY
+    lo = base + to_minutes(start)
+    return lo, max(lo, base + to_minutes(end))
+
+
+def from_minutes(value: int) -> Tuple[date, str]:
+    day, minutes = divmod(value, _MINUTES_PER_DAY)
+    return date.fromordinal(day), f"{minutes // 60:02d}:{minutes % 60:02d}:00"
+
+
+class VolunteerIntervalIndex:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._loaded_at: Optional[float] = None
+        # volunteer_id -> [(inicio, fin, instance_id)] ordenada por inicio
+        self._by_volunteer: Dict[int, List[Tuple[int, int, int]]] = {}
+        # volunteer_id -> duración máxima de sus intervalos (acota la búsqueda hacia atrás)
+        self._max_span: Dict[int, int] = {}
+        # instance_id -> [volunteer_id] (con repetición si cubre ambos roles)
+        self._by_instance: Dict[int, List[int]] = {}
+        self._instance_interval: Dict[int, Tuple[int, int]] = {}
+
+    # ── Carga ─────────────────────────────────────────────────────────
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._loaded_at = None
+
+    def ensure_loaded(self, db: Session) -> None:
+        with self._lock:
+            ttl = settings.CALENDAR_CONFLICT_INDEX_TTL_SECONDS
+            if self._loaded_at is not None and (ttl <= 0 or _time.monotonic() - self._loaded_at < ttl):
+                return
+            self._by_volunteer, self._max_span = {}, {}
+            self._by_instance, self._instance_interval = {}, {}
+            for row in db.execute(text(_ASSIGNMENTS_SQL)):
+                self._add(row.volunteer_id, row.instance_id, interval_for(row.date, row.start_time, row.end_time))
+            for entries in self._by_volunteer.values():
+                entries.sort()
+            self._loaded_at = _time.monotonic()
+
+    # ── Escrituras ────────────────────────────────────────────────────
+
+    def _add(self, volunteer_id: int, instance_id: int, interval: Tuple[int, int]) -> None:
+        entries = self._by_volunteer.setdefault(volunteer_id, [])
+        bisect.insort(entries, (interval[0], interval[1], instance_id))
+        self._max_span[volunteer_id] = max(self._max_span.get(volunteer_id, 0), interval[1] - interval[0])
+        self._by_instance.setdefault(instance_id, []).append(volunteer_id)
+        self._instance_interval[instance_id] = interval
+
+    def _drop(self, instance_id: int) -> None:
+        interval = self._instance_interval.pop(instance_id, None)
+        for volunteer_id in self._by_instance.pop(instance_id, []):
+            entries = self._by_volunteer.get(volunteer_id, [])
+            pos = bisect.bisect_left(entries, (interval[0], interval[1], instance_id))
+            if pos < len(entries) and entries[pos][2] == instance_id:
+                entries.pop(pos)
+
+    def drop_instances(self, instance_ids: Iterable[int]) -> None:
+        with self._lock:
+            for instance_id in instance_ids:
+                self._drop(instance_id)
+
+    def refresh_instances(self, db: Session, instance_ids: List[int]) -> None:
+        """Vuelve a leer las asignaciones de esas instancias (tras crear, mover o reasignar)."""
+        if not instance_ids:
+            return
+        with self._lock:
+            if self._loaded_at is None:
+                return  # se cargará completo en la próxima consulta
+            stmt = text(_ASSIGNMENTS_SQL + " AND ca.instance_id IN :ids").bindparams(
+                bindparam("ids", expanding=True)
+            )
+            rows = db.execute(stmt, {"ids": list(instance_ids)}).fetchall()
+            for instance_id in instance_ids:
+                self._drop(instance_id)
+            for row in rows:
+                self._add(row.volunteer_id, row.instance_id, interval_for(row.date, row.start_time, row.end_time))
+
+    # ── Consultas ─────────────────────────────────────────────────────
+
+    def find_conflicts(
+        self,
+        db: Session,
+        volunteer_id: int,
+        interval: Tuple[int, int],
+        exclude_instance_id: Optional[int] = None,
+    ) -> List[int]:
+        """Ids de instancias del voluntario cuyo horario se superpone con `interval`."""
+        self.ensure_loaded(db)
+        start, end = interval
+        with self._lock:
+            entries = self._by_volunteer.get(volunteer_id, [])
+            lo = bisect.bisect_left(entries, (start - self._max_span.get(volunteer_id, 0),))
+            hi = bisect.bisect_left(entries, (end,))
+            # dict.fromkeys: una instancia aparece dos veces si el voluntario cubre ambos roles
+            return list(dict.fromkeys(
+                instance_id
+                for s, e, instance_id in entries[lo:hi]
+                if e > start and s < end and instance_id != exclude_instance_id
+            ))
+
+    def busy_between(self, db: Session, start: int, end: int) -> Dict[int, List[Tuple[int, int, int]]]:
+        """Intervalos (inicio, fin, instance_id) de cada voluntario que se cruzan con [start, end)."""
+        self.ensure_loaded(db)
+        found = {}
+        with self._lock:
+            for volunteer_id, entries in self._by_volunteer.items():
+                lo = bisect.bisect_left(entries, (start - self._max_span.get(volunteer_id, 0),))
+                hi = bisect.bisect_left(entries, (end,))
+                hits = [entry for entry in entries[lo:hi] if entry[1] > start]
+                if hits:
+                    found[volunteer_id] = hits
+        return found
+
+    def overlaps(self, db: Session, start: int, end: int) -> List[Tuple[int, Tuple[int, int, int], Tuple[int, int, int]]]:
+        """
+        Todas las superposiciones con inicio en [start, end), en una pasada por voluntario
+        (barrido sobre la lista ya ordenada). Devuelve (volunteer_id, entrada, entrada_en_conflicto),
+        una vez por par de instancias aunque el voluntario tenga más de un rol en alguna.
+        """
+        self.ensure_loaded(db)
+        found = []
+        seen = set()
+        with self._lock:
+            for volunteer_id, entries in self._by_volunteer.items():
+                lo = bisect.bisect_left(entries, (start - self._max_span.get(volunteer_id, 0),))
+                hi = bisect.bisect_left(entries, (end,))
+                active: List[Tuple[int, int, int]] = []
+                for entry in entries[lo:hi]:
+                    active = [a for a in active if a[1] > entry[0]]
+                    for other in active:
+                        if other[2] != entry[2] and entry[0] >= start:
+                            pair = (volunteer_id, min(other[2], entry[2]), max(other[2], entry[2]))
+                            if pair not in seen:
+                                seen.add(pair)
+                                found.append((volunteer_id, other, entry))
+                    active.append(entry)
+        return found
+
+
+conflict_index = VolunteerIntervalIndex()
@@ -0,0 +1,116 @@
+"""
+Generación de iCalendar (RFC 5545) línea por línea, para poder emitir los feeds en streaming.
+
+Las horas se emiten como "floating time" (sin zona) y el calendario declara
+X-WR-TIMEZONE, igual que las guarda la base (hora local de ALMA, sin zona).
+"""
+from datetime import date, datetime
+from typing import Optional, Union
+
+PRODID = "-//ALMA Platform//Calendario//ES"
+_TYPE_LABELS = {"grupo": "Grupo", "taller": "Taller", "actividad": "Actividad"}
+_ROLE_LABELS = {"coordinator": "coordinador/a", "co_coordinator": "co-coordinador/a"}
+
+
+def escape_text(value: str) -> str:
+    return (
+        value.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def fold(line: str) -> str:
+    """Corta la línea en tramos de 75 octetos (sin partir caracteres UTF-8) y agrega CRLF."""
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line + "\r\n"
+    parts, current, size = [], [], 0
+    limit = 75
+    for ch in line:
+        ch_size = len(ch.encode("utf-8"))
+        if size + ch_size > limit:
+            parts.append("".join(current))
+            current, size, limit = [], 0, 74  # las continuaciones empiezan con un espacio
+        current.append(ch)
+        size += ch_size
+    parts.append("".join(current))
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _local(day: Union[date, str], hhmmss: str) -> str:
+    if isinstance(day, str):
+        day = date.fromisoformat(day)
+    return day.strftime("%Y%m%d") + "T" + hhmmss.replace(":", "")[:6].zfill(6)
+
+
+def calendar_header(name: str, timezone: str) -> str:
+    return "".join(fold(line) for line in (
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:{PRODID}",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{escape_text(name)}",
+        f"X-WR-TIMEZONE:{timezone}",
+    ))
+
+
+def calendar_footer() -> str:
+    return "END:VCALENDAR\r\n"
+
+
+def event_uid(
+    instance_id: Optional[int],
+    recurrence_id: Optional[int] = None,
+    recurrence_date: Optional[Union[date, str]] = None,
+    role: Optional[str] = None,
+) -> str:
+    """
+    UID estable: una ocurrencia de una regla conserva su UID al materializarse. En el feed
+    de un voluntario se agrega el rol, por si cubre ambos roles en la misma instancia.
+    """
+    if recurrence_id is not None and recurrence_date is not None:
+        uid = f"recurrence-{recurrence_id}-{recurrence_date}"
+    else:
+        uid = f"calendar-instance-{instance_id}"
+    if role:
+        uid += f"-{role}"
+    return uid + "@alma-platform"
+
+
+def event_summary(type: str, source_name: Optional[str], role: Optional[str] = None) -> str:
+    summary = source_name or _TYPE_LABELS.get(type, type)
+    if role in _ROLE_LABELS:
+        summary += f" ({_ROLE_LABELS[role]})"
+    return summary
+
+
+def vevent(
+    uid: str,
+    day: Union[date, str],
+    start_time: str,
+    end_time: str,
+    summary: str,
+    dtstamp: datetime,
+    description: Optional[str] = None,
+    status: Optional[str] = None,
+) -> str:
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{uid}",
+        f"DTSTAMP:{dtstamp.strftime('%Y%m%dT%H%M%SZ')}",
+        f"DTSTART:{_local(day, start_time)}",
+        f"DTEND:{_local(day, end_time)}",
+        f"SUMMARY:{escape_text(summary)}",
+    ]
+    if description:
+        lines.append(f"DESCRIPTION:{escape_text(description)}")
+    if status == "cancelado":
+        lines.append("STATUS:CANCELLED")
+    else:
+        lines.append("STATUS:CONFIRMED")
+    lines.append("END:VEVENT")
+    return "".join(fold(line) for line in lines)
@@ -0,0 +1,102 @@
+"""
+Caché en memoria de las categorías de ideas, como multiconjunto {categoría: cantidad de ideas}.
+
+Se carga perezosamente con un único GROUP BY y los routers la actualizan después de crear,
+editar o borrar una idea, así que GET /ideas/categories no consulta la base en régimen.
+Es por proceso: con varios workers, IDEA_CATEGORY_CACHE_TTL_SECONDS acota cuánto puede
+tardar en ver escrituras hechas por otro.
+
+Las claves agrupan como utf8mb4_unicode_ci (la collation con que compara el GROUP BY de
+MySQL si la tabla la usa): sin distinguir mayúsculas ni tildes e ignorando los espacios
+finales (PAD SPACE), así que "Educación", "educacion " y "EDUCACION" son la misma
+categoría; los espacios iniciales sí cuentan. Con utf8mb4_0900_ai_ci (NO PAD, la de
+MySQL 8 por defecto) los espacios finales también cuentan, pero la API ya los recorta al
+guardar. Cada clave guarda una forma para mostrar (la más usada al cargar, o la primera
+que llegó después).
+"""
+import threading
+import time as _time
+import unicodedata
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from config import settings
+
+
+def _key(category: Optional[str]) -> Optional[str]:
+    folded = unicodedata.normalize("NFKD", (category or "").rstrip().casefold())
+    key = "".join(ch for ch in folded if not unicodedata.combining(ch))
+    return key or None
+
+
+class CategoryCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        # clave normalizada -> cantidad de ideas / forma para mostrar
+        self._counts: Counter = Counter()
+        self._display: Dict[str, str] = {}
+        self._loaded_at: Optional[float] = None
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._loaded_at = None
+
+    def _ensure_loaded(self, db: Session) -> None:
+        ttl = settings.IDEA_CATEGORY_CACHE_TTL_SECONDS
+        if self._loaded_at is not None and (ttl <= 0 or _time.monotonic() - self._loaded_at < ttl):
+            return
+        rows = db.execute(text("""
+            SELECT category, COUNT(*) AS cnt FROM ideas
+            WHERE category IS NOT NULL AND category <> ''
+            GROUP BY category
+        """))
+        counts: Counter = Counter()
+        display: Dict[str, Tuple[int, str]] = {}
+        for row in rows:
+            key = _key(row.category)
+            if key is None:
+                continue
+            counts[key] += row.cnt
+            if key not in display or row.cnt > display[key][0]:
+                display[key] = (row.cnt, row.category.rstrip())
+        self._counts = counts
+        self._display = {key: name for key, (_, name) in display.items()}
+        self._loaded_at = _time.monotonic()
+
+    def counts(self, db: Session) -> List[Tuple[str, int]]:
+        """(categoría, cantidad) ordenadas alfabéticamente sin distinguir mayúsculas."""
+        with self._lock:
+            self._ensure_loaded(db)
+            return [(self._display[key], self._counts[key]) for key in sorted(self._counts)]
+
+    def names(self, db: Session) -> List[str]:
+        return [category for category, _ in self.counts(db)]
+
+    def replace(self, old: Optional[str], new: Optional[str]) -> None:
+        """Registra que una idea pasó de la categoría old a new (None = sin categoría)."""
+        old_key, new_key = _key(old), _key(new)
+        if old_key == new_key:
+            return
+        with self._lock:
+            if self._loaded_at is None:
+                return  # la próxima carga ya lo ve
+            if old_key:
+                self._counts[old_key] -= 1
+                if self._counts[old_key] <= 0:
+                    del self._counts[old_key]
+                    self._display.pop(old_key, None)
+            if new_key:
+                self._counts[new_key] += 1
+                self._display.setdefault(new_key, new.rstrip())
+
+    def add(self, category: Optional[str]) -> None:
+        self.replace(None, category)
+
+    def remove(self, category: Optional[str]) -> None:
+        self.replace(category, None)
+
+
+cache = CategoryCache()
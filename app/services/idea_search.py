@@ -0,0 +1,220 @@
+"""
+Búsqueda de texto sobre ideas y sus comentarios para GET /ideas/search.
+
+En MySQL usa los índices FULLTEXT (migrations/006_ideas_fulltext.sql) con MATCH ... AGAINST
+en modo lenguaje natural: la relevancia de la idea (título y cuerpo, con peso doble) se
+suma a la de sus comentarios. Con otro motor (SQLite en pruebas) usa un índice invertido
+en memoria con ranking BM25, que se carga perezosamente y los routers mantienen al día
+idea por idea.
+
+El resaltado escapa el HTML antes de envolver los términos en <mark>, así que el
+resultado se puede insertar tal cual en la página.
+"""
+import heapq
+import html
+import math
+import re
+import threading
+import unicodedata
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session
+
+_WORD = re.compile(r"\w+")
+_MIN_TOKEN = 2
+_TITLE_WEIGHT = 2
+_SNIPPET_CHARS = 160
+
+_BM25_K1 = 1.2
+_BM25_B = 0.75
+
+
+@lru_cache(maxsize=65536)
+def _fold(word: str) -> str:
+    """Minúsculas y sin tildes, como la collation *_ai_ci de MySQL."""
+    decomposed = unicodedata.normalize("NFKD", word.lower())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def tokenize(value: Optional[str]) -> List[str]:
+    return [t for t in (_fold(m.group()) for m in _WORD.finditer(value or "")) if len(t) >= _MIN_TOKEN]
+
+
+def highlight(value: Optional[str], terms: Set[str]) -> str:
+    """Texto con HTML escapado y cada palabra buscada envuelta en <mark>."""
+    value = value or ""
+    out = []
+    pos = 0
+    for m in _WORD.finditer(value):
+        if _fold(m.group()) in terms:
+            out.append(html.escape(value[pos:m.start()]))
+            out.append(f"<mark>{html.escape(m.group())}</mark>")
+            pos = m.end()
+    out.append(html.escape(value[pos:]))
+    return "".join(out)
+
+
+def snippet(value: Optional[str], terms: Set[str], width: int = _SNIPPET_CHARS) -> Optional[str]:
+    """Fragmento de hasta `width` caracteres alrededor de la primera coincidencia, resaltado."""
+    value = value or ""
+    first = next((m for m in _WORD.finditer(value) if _fold(m.group()) in terms), None)
+    if first is None:
+        return None
+    start = max(0, first.start() - width // 3)
+    if start:
+        space = value.find(" ", start)
+        start = space + 1 if 0 <= space < first.start() else start
+    end = min(len(value), start + width)
+    if end < len(value):
+        space = value.rfind(" ", first.end(), end)
+        end = space if space > 0 else end
+    return ("…" if start else "") + highlight(value[start:end], terms) + ("…" if end < len(value) else "")
+
+
+# ── Índice invertido (fallback) ───────────────────────────────────────
+
+class InvertedIndex:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._loaded = False
+        # término -> {idea_id: frecuencia ponderada}
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._doc_terms: Dict[int, Counter] = {}
+        self._doc_len: Dict[int, int] = {}
+        self._total_len = 0
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._loaded = False
+
+    def ensure_loaded(self, db: Session) -> None:
+        with self._lock:
+            if self._loaded:
+                return
+            self._postings, self._doc_terms, self._doc_len, self._total_len = {}, {}, {}, 0
+            comments: Dict[int, List[str]] = {}
+            for row in db.execute(text("SELECT idea_id, body FROM idea_comments")):
+                comments.setdefault(row.idea_id, []).append(row.body)
+            for row in db.execute(text("SELECT id, title, body FROM ideas")):
+                self._add(row.id, row.title, row.body, comments.get(row.id, ()))
+            self._loaded = True
+
+    def _add(self, idea_id: int, title: str, body: str, comments) -> None:
+        terms = Counter()
+        for token in tokenize(title):
+            terms[token] += _TITLE_WEIGHT
+        terms.update(tokenize(body))
+        for comment in comments:
+            terms.update(tokenize(comment))
+        self._doc_terms[idea_id] = terms
+        length = sum(terms.values())
+        self._doc_len[idea_id] = length
+        self._total_len += length
+        for token, tf in terms.items():
+            self._postings.setdefault(token, {})[idea_id] = tf
+
+    def _drop(self, idea_id: int) -> None:
+        terms = self._doc_terms.pop(idea_id, None)
+        if terms is None:
+            return
+        self._total_len -= self._doc_len.pop(idea_id)
+        for token in terms:
+            posting = self._postings[token]
+            del posting[idea_id]
+            if not posting:
+                del self._postings[token]
+
+    def drop(self, idea_id: int) -> None:
+        with self._lock:
+            if self._loaded:
+                self._drop(idea_id)
+
+    def refresh(self, db: Session, idea_id: int) -> None:
+        """Reindexa una idea tras crearla, editarla o cambiar sus comentarios (si el índice está en uso)."""
+        with self._lock:
+            if not self._loaded:
+                return
+            self._drop(idea_id)
+            idea = db.execute(text("SELECT id, title, body FROM ideas WHERE id = :id"), {"id": idea_id}).fetchone()
+            if idea is None:
+                return
+            comments = [
+                row.body for row in db.execute(
+                    text("SELECT body FROM idea_comments WHERE idea_id = :id"), {"id": idea_id}
+                )
+            ]
+            self._add(idea.id, idea.title, idea.body, comments)
+
+    def search(self, db: Session, terms: Set[str], skip: int, limit: int) -> List[Tuple[int, float]]:
+        self.ensure_loaded(db)
+        with self._lock:
+            docs = len(self._doc_len)
+            if not docs:
+                return []
+            base = _BM25_K1 * (1 - _BM25_B)
+            per_len = _BM25_K1 * _BM25_B * docs / self._total_len
+            doc_len = self._doc_len
+            scores: Dict[int, float] = {}
+            for token in terms:
+                posting = self._postings.get(token)
+                if not posting:
+                    continue
+                weight = (_BM25_K1 + 1) * math.log(1 + (docs - len(posting) + 0.5) / (len(posting) + 0.5))
+                for idea_id, tf in posting.items():
+                    scores[idea_id] = scores.get(idea_id, 0.0) + weight * tf / (tf + base + per_len * doc_len[idea_id])
+        top = heapq.nlargest(skip + limit, scores.items(), key=lambda item: (item[1], item[0]))
+        return top[skip:]
+
+
+index = InvertedIndex()
+
+
+# ── Búsqueda ──────────────────────────────────────────────────────────
+
+_MYSQL_SEARCH_SQL = text("""
+    SELECT id, SUM(score) AS score
+    FROM (
+        SELECT id, MATCH(title, body) AGAINST (:q IN NATURAL LANGUAGE MODE) * 2 AS score
+        FROM ideas
+        WHERE MATCH(title, body) AGAINST (:q IN NATURAL LANGUAGE MODE)
+        UNION ALL
+        SELECT idea_id, MATCH(body) AGAINST (:q IN NATURAL LANGUAGE MODE)
+        FROM idea_comments
+        WHERE MATCH(body) AGAINST (:q IN NATURAL LANGUAGE MODE)
+    ) matches
+    GROUP BY id
+    ORDER BY score DESC, id DESC
+    LIMIT :limit OFFSET :skip
+""")
+
+
+def uses_fulltext(db: Session) -> bool:
+    return db.get_bind().dialect.name == "mysql"
+
+
+def search(db: Session, q: str, skip: int = 0, limit: int = 20) -> List[Tuple[int, float]]:
+    """[(idea_id, relevancia)] de mayor a menor relevancia."""
+    if uses_fulltext(db):
+        rows = db.execute(_MYSQL_SEARCH_SQL, {"q": q, "skip": skip, "limit": limit})
+        return [(row.id, float(row.score)) for row in rows]
+    terms = set(tokenize(q))
+    if not terms:
+        return []
+    return index.search(db, terms, skip, limit)
+
+
+def matching_comments(db: Session, idea_ids: List[int], terms: Set[str]) -> Dict[int, str]:
+    """Primer comentario de cada idea que contiene algún término buscado."""
+    if not idea_ids or not terms:
+        return {}
+    stmt = text("""
+        SELECT idea_id, body FROM idea_comments WHERE idea_id IN :ids ORDER BY created_at, id
+    """).bindparams(bindparam("ids", expanding=True))
+    found: Dict[int, str] = {}
+    for row in db.execute(stmt, {"ids": idea_ids}):
+        if row.idea_id not in found and terms.intersection(tokenize(row.body)):
+            found[row.idea_id] = row.body
+    return found
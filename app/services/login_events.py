@@ -0,0 +1,243 @@
+"""
+Buffer de escritura diferida (write-behind) para auth_login_events.
+
+POST /auth/login-events/async encola el evento y responde enseguida; un hilo de fondo
+vacía la cola con un INSERT multi-fila cada LOGIN_EVENTS_FLUSH_SIZE eventos o cada
+LOGIN_EVENTS_FLUSH_INTERVAL_SECONDS, lo que ocurra primero. En el mismo lote, los logins
+exitosos actualizan last_login_* de cada usuario una sola vez, con el evento más reciente.
+
+La cola está acotada (LOGIN_EVENTS_BUFFER_MAX). Si está llena, submit() espera hasta
+LOGIN_EVENTS_ENQUEUE_TIMEOUT_SECONDS y, si sigue llena, devuelve False para que el llamador
+escriba en forma sincrónica: la contrapresión frena al que produce en lugar de perder eventos.
+
+Si la base rechaza un lote por sus datos (IntegrityError o DataError, p. ej. un auth_user_id
+que ya no existe), el lote se parte en mitades hasta aislar las filas malas: las demás se
+escriben y las malas van al log de descartes (logger app.services.login_events.dead_letter)
+en lugar de volver a la cola y trabarla. Otros errores (base caída, conexión cortada)
+devuelven el lote al final de la cola para reintentarlo, hasta LOGIN_EVENTS_MAX_ATTEMPTS
+intentos por evento. new_event() recorta los textos al largo de sus columnas.
+
+Se arranca y se drena en el lifespan de la app (app/main.py).
+"""
+import logging
+import threading
+import time as _time
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy import bindparam, update
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.orm import Session
+
+from config import settings
+from app.database import SessionLocal
+from app.models.auth import AuthLoginEvent as ALEModel, AuthUser as AuthUserModel
+
+log = logging.getLogger(__name__)
+dead_letter_log = logging.getLogger(__name__ + ".dead_letter")
+
+# Errores que dependen de las filas del lote y no se arreglan reintentando
+_ROW_ERRORS = (IntegrityError, DataError)
+
+# Evento en la cola junto con los intentos de escritura que ya fallaron
+_Entry = Tuple[dict, int]
+
+_LAST_LOGIN_UPDATE = (
+    update(AuthUserModel.__table__)
+    .where(AuthUserModel.__table__.c.id == bindparam("user_id"))
+    .where(
+        (AuthUserModel.__table__.c.last_login_at.is_(None))
+        | (AuthUserModel.__table__.c.last_login_at < bindparam("at"))
+    )
+    .values(
+        last_login_at=bindparam("at"),
+        last_login_ip=bindparam("ip"),
+        last_login_user_agent=bindparam("user_agent"),
+    )
+)
+
+
+def write_events(db: Session, events: List[dict]) -> None:
+    """Inserta los eventos en un solo INSERT y actualiza last_login_* por usuario. No hace commit."""
+    if not events:
+        return
+    db.execute(ALEModel.__table__.insert().values(events))
+    latest: Dict[int, dict] = {}
+    for event in events:
+        user_id = event["auth_user_id"]
+        if event["success"] and user_id is not None:
+            if user_id not in latest or event["created_at"] >= latest[user_id]["created_at"]:
+                latest[user_id] = event
+    if latest:
+        db.execute(_LAST_LOGIN_UPDATE, [
+            {"user_id": user_id, "at": e["created_at"], "ip": e["ip_address"], "user_agent": e["user_agent"]}
+            for user_id, e in latest.items()
+        ])
+
+
+class LoginEventBuffer:
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._queue: Deque[_Entry] = deque()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self._stats = {
+            "enqueued": 0, "written": 0, "batches": 0, "rejected": 0,
+            "failed_batches": 0, "retried": 0, "dead_lettered": 0,
+        }
+
+    # ── Productores ───────────────────────────────────────────────────
+
+    def submit(self, event: dict) -> bool:
+        """Encola un evento (con created_at ya fijado). False si la cola sigue llena tras esperar."""
+        deadline = _time.monotonic() + settings.LOGIN_EVENTS_ENQUEUE_TIMEOUT_SECONDS
+        with self._cond:
+            while len(self._queue) >= settings.LOGIN_EVENTS_BUFFER_MAX or self._thread is None:
+                remaining = deadline - _time.monotonic()
+                if self._thread is None or self._stopping or remaining <= 0:
+                    self._stats["rejected"] += 1
+                    return False
+                self._cond.wait(remaining)
+            self._queue.append((event, 0))
+            self._stats["enqueued"] += 1
+            if len(self._queue) >= settings.LOGIN_EVENTS_FLUSH_SIZE:
+                self._cond.notify_all()
+            return True
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {**self._stats, "queued": len(self._queue), "running": self._thread is not None}
+
+    # ── Hilo de fondo ─────────────────────────────────────────────────
+
+    def start(self) -> None:
+        with self._cond:
+            if self._thread is not None:
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="login-events-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Deja de aceptar eventos, escribe lo que quedaba en la cola y termina el hilo."""
+        with self._cond:
+            thread = self._thread
+            if thread is None:
+                return
+            self._stopping = True
+            self._cond.notify_all()
+        thread.join(timeout)
+        with self._cond:
+            self._thread = None
+
+    def _take_batch(self) -> List[_Entry]:
+        with self._cond:
+            deadline = _time.monotonic() + settings.LOGIN_EVENTS_FLUSH_INTERVAL_SECONDS
+            while not self._stopping and len(self._queue) < settings.LOGIN_EVENTS_FLUSH_SIZE:
+                remaining = deadline - _time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            size = min(len(self._queue), settings.LOGIN_EVENTS_FLUSH_SIZE)
+            batch = [self._queue.popleft() for _ in range(size)]
+            if batch:
+                self._cond.notify_all()  # despierta a productores esperando lugar
+            return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._take_batch()
+            if batch:
+                self._flush(batch)
+            with self._cond:
+                if self._stopping and not self._queue:
+                    return
+
+    def _write(self, events: List[dict]) -> Optional[Exception]:
+        """Escribe los eventos en una transacción propia. Devuelve el error si falló."""
+        db = SessionLocal()
+        try:
+            write_events(db, events)
+            db.commit()
+        except Exception as exc:
+            db.rollback()
+            return exc
+        finally:
+            db.close()
+        return None
+
+    def _write_isolating(self, batch: List[_Entry], bad: List[_Entry], retry: List[_Entry]) -> int:
+        """
+        Escribe el lote; si la base lo rechaza por sus datos, lo parte en mitades hasta aislar
+        las filas que fallan solas (van a `bad`). Lo que falla por otros errores va a `retry`.
+        Devuelve cuántos eventos se escribieron.
+        """
+        exc = self._write([event for event, _ in batch])
+        if exc is None:
+            return len(batch)
+        if not isinstance(exc, _ROW_ERRORS):
+            log.warning("No se pudieron escribir %d eventos de login, se reintentan: %s", len(batch), exc)
+            retry.extend(batch)
+            return 0
+        if len(batch) == 1:
+            log.warning("Evento de login rechazado por la base: %s", exc)
+            bad.extend(batch)
+            return 0
+        mid = len(batch) // 2
+        return self._write_isolating(batch[:mid], bad, retry) + self._write_isolating(batch[mid:], bad, retry)
+
+    def _dead_letter(self, entries: List[_Entry], reason: str) -> None:
+        for event, attempts in entries:
+            dead_letter_log.error("Evento de login descartado (%s, %d intentos): %r", reason, attempts, event)
+        self._stats["dead_lettered"] += len(entries)
+
+    def _flush(self, batch: List[_Entry]) -> None:
+        bad: List[_Entry] = []
+        retry: List[_Entry] = []
+        written = self._write_isolating(batch, bad, retry)
+        with self._cond:
+            self._stats["written"] += written
+            if written:
+                self._stats["batches"] += 1
+            if not (bad or retry):
+                return
+            self._stats["failed_batches"] += 1
+            self._dead_letter(bad, "rechazado por la base")
+            retry = [(event, attempts + 1) for event, attempts in retry]
+            if self._stopping:
+                self._dead_letter(retry, "la app se detiene")
+                return
+            self._dead_letter([e for e in retry if e[1] >= settings.LOGIN_EVENTS_MAX_ATTEMPTS], "sin más reintentos")
+            retry = [e for e in retry if e[1] < settings.LOGIN_EVENTS_MAX_ATTEMPTS]
+            # Al final de la cola, para no demorar a los eventos que llegaron después
+            room = max(0, settings.LOGIN_EVENTS_BUFFER_MAX - len(self._queue))
+            self._queue.extend(retry[:room])
+            self._stats["retried"] += min(room, len(retry))
+            self._dead_letter(retry[room:], "cola llena")
+        if retry and not written:
+            # La base no acepta nada: esperar en lugar de reintentar enseguida
+            _time.sleep(settings.LOGIN_EVENTS_FLUSH_INTERVAL_SECONDS)
+
+
+_TEXT_LENGTHS = {
+    name: ALEModel.__table__.c[name].type.length
+    for name in ("email", "failure_reason", "ip_address", "user_agent")
+}
+
+
+def new_event(data: dict) -> dict:
+    """
+    Fila lista para insertar: la hora es la del login, no la de la escritura diferida. Los
+    textos se recortan al largo de su columna para que un user agent largo no haga fallar
+    el lote entero.
+    """
+    event = {**data, "created_at": datetime.utcnow()}
+    for name, length in _TEXT_LENGTHS.items():
+        value = event.get(name)
+        if isinstance(value, str) and len(value) > length:
+            event[name] = value[:length]
+    return event
+
+
+buffer = LoginEventBuffer()
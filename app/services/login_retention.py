@@ -0,0 +1,229 @@
+"""
+Retención de auth_login_events.
+
+Los eventos con más de LOGIN_EVENTS_RETENTION_DAYS días se resumen en
+auth_login_daily_stats (una fila por día y email con la cantidad de logins exitosos y
+fallidos) y se borran. El borrado va en tandas de LOGIN_EVENTS_PURGE_BATCH_SIZE filas, cada
+una en su propia transacción junto con su resumen: los bloqueos duran poco y, si el proceso
+se corta, volver a correrlo no cuenta dos veces el mismo evento.
+
+Con LOGIN_EVENTS_PARTITIONED=True (la tabla particionada por mes, ver
+migrations/008_auth_login_events_retention.sql) además se crean por adelantado las
+particiones de los próximos LOGIN_EVENTS_PARTITIONS_AHEAD meses y los meses vencidos
+enteros se resumen y se descartan con DROP PARTITION en lugar de borrarse fila por fila.
+Particionar la tabla es trabajo de la migración: acá solo se parte pmax, y si la tabla no
+está particionada o falta la tabla de marcas se corta con PartitioningError.
+
+Los límites de las particiones y los días del resumen están en UTC.
+"""
+import calendar
+import re
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session
+
+from config import settings
+
+_TABLE = "auth_login_events"
+_ROLLED_TABLE = "auth_login_events_rolled_partitions"
+_MIGRATION = "migrations/008_auth_login_events_retention.sql"
+_PARTITION_NAME = re.compile(r"^p\d{6}$")
+_MAXVALUE_PARTITION = "pmax"
+
+_EXPIRED_IDS_SQL = text("""
+    SELECT id FROM auth_login_events
+    WHERE created_at < :before
+    ORDER BY created_at, id
+    LIMIT :limit
+""")
+
+# Suma sobre lo que ya hubiera para ese día y email (puede haber tandas anteriores del mismo día)
+_ROLLUP_SELECT = """
+    INSERT INTO auth_login_daily_stats (day, email, auth_user_id, success_count, failure_count)
+    SELECT DATE(created_at), email, MAX(auth_user_id), SUM(success = 1), SUM(success = 0)
+    FROM auth_login_events {source}
+    GROUP BY DATE(created_at), email
+    ON DUPLICATE KEY UPDATE
+        auth_login_daily_stats.auth_user_id =
+            COALESCE(VALUES(auth_user_id), auth_login_daily_stats.auth_user_id),
+        auth_login_daily_stats.success_count =
+            auth_login_daily_stats.success_count + VALUES(success_count),
+        auth_login_daily_stats.failure_count =
+            auth_login_daily_stats.failure_count + VALUES(failure_count)
+"""
+
+_ROLLUP_IDS_SQL = text(_ROLLUP_SELECT.format(source="WHERE id IN :ids")).bindparams(
+    bindparam("ids", expanding=True)
+)
+
+_DELETE_IDS_SQL = text("DELETE FROM auth_login_events WHERE id IN :ids").bindparams(
+    bindparam("ids", expanding=True)
+)
+
+_PARTITIONS_SQL = text("""
+    SELECT PARTITION_NAME AS name, PARTITION_DESCRIPTION AS bound
+    FROM information_schema.PARTITIONS
+    WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND PARTITION_NAME IS NOT NULL
+    ORDER BY PARTITION_ORDINAL_POSITION
+""")
+
+
+_TABLE_EXISTS_SQL = text("""
+    SELECT 1 FROM information_schema.TABLES
+    WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table
+""")
+
+
+class PartitioningError(RuntimeError):
+    """LOGIN_EVENTS_PARTITIONED está activo pero la base no tiene lo que crea la migración."""
+
+
+def cutoff_for(now: Optional[datetime] = None, days: Optional[int] = None) -> datetime:
+    """Comienzo (UTC) del primer día que se conserva entero."""
+    now = now or datetime.utcnow()
+    days = settings.LOGIN_EVENTS_RETENTION_DAYS if days is None else days
+    return datetime.combine(now.date() - timedelta(days=days), datetime.min.time())
+
+
+# ── Tandas ────────────────────────────────────────────────────────────
+
+def purge_batches(db: Session, before: datetime, batch_size: int) -> Tuple[int, int]:
+    """
+    Resume y borra los eventos anteriores a `before`, de a `batch_size`, con un commit por
+    tanda. Devuelve (tandas, filas borradas). Los eventos sin created_at no se tocan.
+    """
+    batches = deleted = 0
+    while True:
+        ids = [row.id for row in db.execute(_EXPIRED_IDS_SQL, {"before": before, "limit": batch_size})]
+        if not ids:
+            return batches, deleted
+        db.execute(_ROLLUP_IDS_SQL, {"ids": ids})
+        db.execute(_DELETE_IDS_SQL, {"ids": ids})
+        db.commit()
+        batches += 1
+        deleted += len(ids)
+        if len(ids) < batch_size:
+            return batches, deleted
+
+
+# ── Particiones mensuales ─────────────────────────────────────────────
+
+def _month_start(day: date, months: int = 0) -> date:
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _bound(month: date) -> int:
+    """Límite (exclusivo) de la partición de `month`: UNIX_TIMESTAMP del 1° del mes siguiente."""
+    return calendar.timegm(_month_start(month, 1).timetuple())
+
+
+def _partition_name(month: date) -> str:
+    return f"p{month:%Y%m}"
+
+
+def partitions(db: Session) -> List[Tuple[str, Optional[int]]]:
+    """[(nombre, límite)] en orden; el límite de la partición MAXVALUE es None."""
+    rows = db.execute(_PARTITIONS_SQL, {"table": _TABLE})
+    return [(row.name, None if row.bound == "MAXVALUE" else int(row.bound)) for row in rows]
+
+
+def check_partitioning(db: Session) -> List[Tuple[str, Optional[int]]]:
+    """
+    Verifica que la tabla esté particionada con pmax y que exista la tabla de marcas, y
+    devuelve las particiones. No crea nada: eso lo hace la sección opcional de la migración.
+    """
+    existing = partitions(db)
+    if not existing:
+        raise PartitioningError(
+            f"{_TABLE} no está particionada: aplicar la sección de particiones de {_MIGRATION} "
+            f"antes de activar LOGIN_EVENTS_PARTITIONED"
+        )
+    if not any(name == _MAXVALUE_PARTITION for name, _ in existing):
+        raise PartitioningError(
+            f"{_TABLE} no tiene la partición {_MAXVALUE_PARTITION} (VALUES LESS THAN MAXVALUE) "
+            f"que se parte para agregar meses; ver {_MIGRATION}"
+        )
+    if db.execute(_TABLE_EXISTS_SQL, {"table": _ROLLED_TABLE}).first() is None:
+        raise PartitioningError(f"Falta la tabla {_ROLLED_TABLE}; ver {_MIGRATION}")
+    return existing
+
+
+def ensure_partitions(db: Session, today: date, ahead: int) -> List[str]:
+    """
+    Agrega, partiendo pmax con REORGANIZE PARTITION, las particiones del mes actual y los
+    `ahead` siguientes que falten. Nunca particiona la tabla (ver check_partitioning).
+    """
+    existing = check_partitioning(db)
+    last = max((b for _, b in existing if b is not None), default=None)
+    months = [_month_start(today, i) for i in range(ahead + 1)]
+    new = [m for m in months if last is None or _bound(m) > last]
+    if not new:
+        return []
+    parts = ", ".join(
+        f"PARTITION {_partition_name(m)} VALUES LESS THAN ({_bound(m)})" for m in new
+    )
+    db.execute(text(
+        f"ALTER TABLE {_TABLE} REORGANIZE PARTITION {_MAXVALUE_PARTITION} INTO "
+        f"({parts}, PARTITION {_MAXVALUE_PARTITION} VALUES LESS THAN MAXVALUE)"
+    ))
+    return [_partition_name(m) for m in new]
+
+
+def drop_expired_partitions(db: Session, before: datetime) -> List[str]:
+    """
+    Resume y descarta las particiones cuyo mes terminó antes de `before`.
+
+    El resumen y la marca en auth_login_events_rolled_partitions van en la misma
+    transacción; DROP PARTITION no es transaccional, así que si el proceso se corta entre
+    los dos pasos la marca evita volver a sumar la partición en la próxima corrida.
+    """
+    limit = calendar.timegm(before.timetuple())
+    dropped = []
+    for name, bound in partitions(db):
+        if bound is None or bound > limit or not _PARTITION_NAME.match(name):
+            continue
+        rolled = db.execute(
+            text("SELECT 1 FROM auth_login_events_rolled_partitions WHERE partition_name = :name"),
+            {"name": name},
+        ).first()
+        if rolled is None:
+            db.execute(text(_ROLLUP_SELECT.format(source=f"PARTITION ({name})")))
+            db.execute(
+                text("INSERT INTO auth_login_events_rolled_partitions (partition_name) VALUES (:name)"),
+                {"name": name},
+            )
+            db.commit()
+        db.execute(text(f"ALTER TABLE {_TABLE} DROP PARTITION {name}"))
+        dropped.append(name)
+    return dropped
+
+
+# ── Corrida completa ──────────────────────────────────────────────────
+
+def run(
+    db: Session,
+    now: Optional[datetime] = None,
+    days: Optional[int] = None,
+    batch_size: Optional[int] = None,
+) -> Dict:
+    """Aplica la retención completa y devuelve lo que hizo."""
+    now = now or datetime.utcnow()
+    before = cutoff_for(now, days)
+    batch_size = batch_size or settings.LOGIN_EVENTS_PURGE_BATCH_SIZE
+    added: List[str] = []
+    dropped: List[str] = []
+    if settings.LOGIN_EVENTS_PARTITIONED:
+        added = ensure_partitions(db, now.date(), settings.LOGIN_EVENTS_PARTITIONS_AHEAD)
+        dropped = drop_expired_partitions(db, before)
+    # Lo que queda vencido en la partición del mes parcialmente vencido (o todo, sin particiones)
+    batches, deleted = purge_batches(db, before, batch_size)
+    return {
+        "cutoff": before,
+        "batches": batches,
+        "deleted": deleted,
+        "partitions_added": added,
+        "partitions_dropped": dropped,
+    }
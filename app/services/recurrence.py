@@ -0,0 +1,60 @@
+"""
+Motor de expansión de reglas de recurrencia (subconjunto de RRULE).
+
+Una regla produce las fechas  ancla + k * paso  con k = 0, 1, 2, …, donde:
+  - paso  = repeat_interval días (freq 'daily') o repeat_interval semanas (freq 'weekly')
+  - ancla = start_date, o el primer `weekday` a partir de start_date (solo 'weekly')
+La serie termina en until_date (inclusive) y/o tras max_count ocurrencias. Las fechas de
+exdates se omiten pero, como en RFC 5545, siguen contando para max_count.
+
+La expansión salta directo a la primera ocurrencia de la ventana pedida, así que el costo
+depende del tamaño de la ventana y no de la antigüedad de la serie.
+"""
+from datetime import date, timedelta
+from typing import Iterator, Optional
+
+
+def step_days(rule) -> int:
+    return rule.repeat_interval * (7 if rule.freq == "weekly" else 1)
+
+
+def anchor_date(rule) -> date:
+    if rule.freq == "weekly" and rule.weekday is not None:
+        return rule.start_date + timedelta(days=(rule.weekday - rule.start_date.weekday()) % 7)
+    return rule.start_date
+
+
+def last_date(rule) -> Optional[date]:
+    """Última fecha posible de la serie, o None si es infinita."""
+    candidates = []
+    if rule.until_date is not None:
+        candidates.append(rule.until_date)
+    if rule.max_count is not None:
+        candidates.append(anchor_date(rule) + timedelta(days=step_days(rule) * (rule.max_count - 1)))
+    return min(candidates) if candidates else None
+
+
+def excluded_dates(rule) -> set:
+    return {date.fromisoformat(d) for d in (rule.exdates or [])}
+
+
+def expand(rule, lo: date, hi: date) -> Iterator[date]:
+    """Ocurrencias de la regla en el rango semiabierto [lo, hi), en orden."""
+    step = step_days(rule)
+    anchor = anchor_date(rule)
+    end = last_date(rule)
+    if rule.max_count is not None and rule.max_count < 1:
+        return
+    excluded = excluded_dates(rule)
+
+    k = max(0, -(-(lo - anchor).days // step))  # ceil((lo - anchor) / step)
+    current = anchor + timedelta(days=k * step)
+    while current < hi and (end is None or current <= end):
+        if current not in excluded:
+            yield current
+        current += timedelta(days=step)
+
+
+def is_occurrence(rule, d: date) -> bool:
+    """True si `d` es una ocurrencia vigente (no excluida) de la regla."""
+    return next(expand(rule, d, d + timedelta(days=1)), None) == d
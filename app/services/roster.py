@@ -0,0 +1,205 @@
+"""
+Reparto automático de coordinadores y co-coordinadores entre voluntarios.
+
+Voraz con reparación: los huecos se recorren en orden cronológico y cada uno va al
+voluntario elegible con menos asignaciones (a igual carga, al que hace más que no recibe
+una) que esté libre en ese horario y no haya llegado a su tope. Los voluntarios se
+mantienen en un heap por carga, así que cada hueco cuesta O(k log V) con k los
+voluntarios ocupados que hay que saltear.
+
+Los huecos que quedan sin cubrir se reparan con un camino de aumento de largo uno: se
+busca un voluntario w bloqueado por una sola asignación nueva (o que llegó a su tope), se
+mueve esa asignación a otro voluntario libre y el hueco queda para w. La reparación
+recorre los voluntarios por carga en una lista que se mantiene ordenada al asignar y
+liberar (sin volver a ordenar por hueco), y se corta apenas todos llegaron a su tope:
+sin un voluntario con lugar ningún movimiento puede cubrir un hueco más.
+
+Todo trabaja en memoria sobre intervalos en minutos absolutos (ver conflicts.interval_for);
+no toca la base.
+"""
+import bisect
+import heapq
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+# (instance_id, role, inicio, fin)
+Slot = Tuple[int, str, int, int]
+
+# Marca de los intervalos ya comprometidos fuera del reparto: no se pueden mover
+_FIXED = -1
+
+
+class _Roster:
+    def __init__(
+        self,
+        slots: Sequence[Slot],
+        volunteers: Iterable[int],
+        caps: Dict[int, int],
+        busy: Dict[int, List[Tuple[int, int]]],
+        loads: Dict[int, int],
+        taken: Dict[int, Set[int]],
+    ):
+        self.slots = slots
+        self.volunteers = list(volunteers)
+        self.caps = caps
+        self.load = {v: loads.get(v, 0) for v in self.volunteers}
+        # (carga, posición, volunteer_id) ordenada; la posición desempata como el orden de entrada
+        self.position = {v: i for i, v in enumerate(self.volunteers)}
+        self.by_load = sorted((self.load[v], self.position[v], v) for v in self.volunteers)
+        self.with_room = sum(not self.at_cap(v) for v in self.volunteers)
+        # volunteer_id -> [(inicio, fin, índice de hueco | _FIXED)] ordenada por inicio
+        self.agenda: Dict[int, List[Tuple[int, int, int]]] = {}
+        self.max_span: Dict[int, int] = {}
+        for v in self.volunteers:
+            for start, end in busy.get(v, ()):
+                self._book(v, start, end, _FIXED)
+        self.members = {iid: set(vols) for iid, vols in taken.items()}
+        self.assigned: Dict[int, int] = {}
+        self.by_volunteer: Dict[int, Set[int]] = {v: set() for v in self.volunteers}
+
+    # ── Agenda ────────────────────────────────────────────────────────
+
+    def _book(self, v: int, start: int, end: int, key: int) -> None:
+        bisect.insort(self.agenda.setdefault(v, []), (start, end, key))
+        self.max_span[v] = max(self.max_span.get(v, 0), end - start)
+
+    def _unbook(self, v: int, start: int, end: int, key: int) -> None:
+        entries = self.agenda[v]
+        del entries[bisect.bisect_left(entries, (start, end, key))]
+
+    def blockers(self, v: int, index: int) -> List[int]:
+        """Lo que impide darle el hueco a v: otro rol en la misma instancia o superposiciones."""
+        instance_id, _, start, end = self.slots[index]
+        if v in self.members.get(instance_id, ()):
+            return [_FIXED]
+        entries = self.agenda.get(v, [])
+        lo = bisect.bisect_left(entries, (start - self.max_span.get(v, 0),))
+        hi = bisect.bisect_left(entries, (end,))
+        return [key for s, e, key in entries[lo:hi] if e > start and s < end]
+
+    def at_cap(self, v: int) -> bool:
+        cap = self.caps.get(v)
+        return cap is not None and self.load[v] >= cap
+
+    def _add_load(self, v: int, delta: int) -> None:
+        was_at_cap = self.at_cap(v)
+        del self.by_load[bisect.bisect_left(self.by_load, (self.load[v], self.position[v], v))]
+        self.load[v] += delta
+        bisect.insort(self.by_load, (self.load[v], self.position[v], v))
+        self.with_room += was_at_cap - self.at_cap(v)
+
+    def assign(self, index: int, v: int) -> None:
+        instance_id, _, start, end = self.slots[index]
+        self._book(v, start, end, index)
+        self.members.setdefault(instance_id, set()).add(v)
+        self.assigned[index] = v
+        self.by_volunteer[v].add(index)
+        self._add_load(v, 1)
+
+    def release(self, index: int) -> int:
+        instance_id, _, start, end = self.slots[index]
+        v = self.assigned.pop(index)
+        self._unbook(v, start, end, index)
+        self.members[instance_id].discard(v)
+        self.by_volunteer[v].discard(index)
+        self._add_load(v, -1)
+        return v
+
+    # ── Reparto ───────────────────────────────────────────────────────
+
+    def greedy(self) -> List[int]:
+        heap = [(self.load[v], 0, v) for v in self.volunteers if not self.at_cap(v)]
+        heapq.heapify(heap)
+        # Cronológico y, en la misma instancia, el coordinador antes que el co-coordinador
+        order = sorted(
+            range(len(self.slots)),
+            key=lambda i: (self.slots[i][2], self.slots[i][0], self.slots[i][1] != "coordinator"),
+        )
+        unfilled = []
+        for turn, index in enumerate(order, start=1):
+            skipped = []
+            chosen = None
+            while heap:
+                entry = heapq.heappop(heap)
+                v = entry[2]
+                if self.at_cap(v):
+                    continue  # en la fase voraz la carga solo sube: no vuelve al heap
+                if self.blockers(v, index):
+                    skipped.append(entry)
+                    continue
+                chosen = v
+                break
+            for entry in skipped:
+                heapq.heappush(heap, entry)
+            if chosen is None:
+                unfilled.append(index)
+                continue
+            self.assign(index, chosen)
+            heapq.heappush(heap, (self.load[chosen], turn, chosen))
+        return unfilled
+
+    def _free_volunteer(self, index: int, exclude: int) -> Optional[int]:
+        for _, _, x in self.by_load:
+            if x != exclude and not self.at_cap(x) and not self.blockers(x, index):
+                return x
+        return None
+
+    def repair(self, unfilled: List[int]) -> List[int]:
+        still = []
+        # Huecos ya asignados sin reemplazo posible; se limpia cada vez que algo se mueve
+        stuck: Set[int] = set()
+        for n, index in enumerate(unfilled):
+            if not self.with_room:
+                still.extend(unfilled[n:])
+                break
+            if self._repair_one(index, stuck):
+                stuck.clear()
+            else:
+                still.append(index)
+        return still
+
+    def _repair_one(self, index: int, stuck: Set[int]) -> bool:
+        # Copia: mover una asignación reordena by_load mientras se recorre
+        for _, _, w in list(self.by_load):
+            blocking = self.blockers(w, index)
+            if _FIXED in blocking or len(blocking) > 1:
+                continue
+            if not blocking and not self.at_cap(w):
+                self.assign(index, w)  # una reparación anterior lo liberó
+                return True
+            movable = blocking or sorted(self.by_volunteer[w])
+            for other in movable:
+                if other in stuck:
+                    continue
+                self.release(other)
+                x = self._free_volunteer(other, exclude=w)
+                if x is None or self.blockers(w, index) or self.at_cap(w):
+                    self.assign(other, w)
+                    stuck.add(other)
+                    continue
+                self.assign(other, x)
+                self.assign(index, w)
+                return True
+        return False
+
+
+def solve(
+    slots: Sequence[Slot],
+    volunteers: Iterable[int],
+    caps: Optional[Dict[int, int]] = None,
+    busy: Optional[Dict[int, List[Tuple[int, int]]]] = None,
+    loads: Optional[Dict[int, int]] = None,
+    taken: Optional[Dict[int, Set[int]]] = None,
+) -> Tuple[Dict[int, int], List[int]]:
+    """
+    Reparte los huecos entre los voluntarios sin superposiciones de horario.
+
+    caps: tope de asignaciones por voluntario (sin entrada = sin tope), incluyendo loads.
+    busy: intervalos ya comprometidos por voluntario, que no se pueden mover.
+    loads: asignaciones previas que cuentan para el tope y el balance.
+    taken: voluntarios que ya ocupan otro rol en cada instancia.
+
+    Devuelve ({índice de hueco: volunteer_id}, [índices de huecos sin cubrir]).
+    """
+    roster = _Roster(slots, volunteers, caps or {}, busy or {}, loads or {}, taken or {})
+    unfilled = roster.repair(roster.greedy())
+    return roster.assigned, sorted(unfilled)
@@ -0,0 +1,147 @@
+"""
+Caché en memoria de sesiones por hash de token para GET /auth/sessions/by-hash/{token_hash}.
+
+LRU acotada (SESSION_CACHE_MAX_ENTRIES) con vencimiento por entrada: las sesiones
+encontradas duran SESSION_CACHE_TTL_SECONDS y los hashes inexistentes (caché negativa)
+SESSION_CACHE_NEGATIVE_TTL_SECONDS. Los routers invalidan en el momento al crear, editar o
+revocar una sesión y al desactivar o borrar un usuario.
+
+Es por proceso: con varios workers, una revocación hecha en otro worker se ve recién al
+vencer la entrada, por eso el TTL por defecto es corto.
+
+Para que un lector lento no vuelva a guardar una sesión que se revocó mientras la leía de
+la base, cada invalidación avanza un contador (epoch) y queda anotada con su epoch. El
+lector toma snapshot() antes de consultar la base y put() descarta la escritura si desde
+entonces se invalidó ese hash, ese usuario o toda la caché. Las anotaciones están acotadas
+a SESSION_CACHE_MAX_ENTRIES; si la que haría falta ya se descartó, put() también se descarta.
+"""
+import threading
+import time as _time
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Set
+
+from config import settings
+
+# Devuelto por get() cuando el hash no está en caché (None significa "sesión inexistente")
+MISS = object()
+
+
+class SessionCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        # token_hash -> (vence_en, sesión serializada | None)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._by_user: Dict[int, Set[str]] = {}
+        # ("hash", token_hash) | ("user", auth_user_id) | ("all", None) -> epoch de su última invalidación
+        self._epoch = 0
+        self._invalidated: "OrderedDict[Hashable, int]" = OrderedDict()
+        self._forgotten_epoch = 0  # mayor epoch de las anotaciones ya descartadas
+        self._stats = {
+            "hits": 0, "negative_hits": 0, "misses": 0, "evictions": 0, "expirations": 0,
+            "invalidations": 0, "stale_puts": 0,
+        }
+
+    def get(self, token_hash: str):
+        """La sesión cacheada (dict), None si se sabe que no existe, o MISS."""
+        now = _time.monotonic()
+        with self._lock:
+            entry = self._entries.get(token_hash)
+            if entry is None:
+                self._stats["misses"] += 1
+                return MISS
+            expires_at, value = entry
+            if expires_at <= now:
+                self._drop(token_hash)
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
+                return MISS
+            self._entries.move_to_end(token_hash)
+            self._stats["hits" if value is not None else "negative_hits"] += 1
+            return value
+
+    def snapshot(self) -> int:
+        """Epoch actual: tomarlo antes de leer la sesión de la base y pasarlo a put()."""
+        with self._lock:
+            return self._epoch
+
+    def put(self, token_hash: str, value: Optional[dict], since: Optional[int] = None) -> None:
+        ttl = settings.SESSION_CACHE_TTL_SECONDS if value is not None else settings.SESSION_CACHE_NEGATIVE_TTL_SECONDS
+        if ttl <= 0:
+            return
+        with self._lock:
+            if since is not None and self._invalidated_since(token_hash, value, since):
+                self._stats["stale_puts"] += 1
+                return
+            self._drop(token_hash)
+            self._entries[token_hash] = (_time.monotonic() + ttl, value)
+            if value is not None:
+                self._by_user.setdefault(value["auth_user_id"], set()).add(token_hash)
+            while len(self._entries) > settings.SESSION_CACHE_MAX_ENTRIES:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self._stats["evictions"] += 1
+
+    def _invalidated_since(self, token_hash: str, value: Optional[dict], since: int) -> bool:
+        if since >= self._epoch:
+            return False
+        if since < self._forgotten_epoch:
+            return True
+        keys = [("hash", token_hash), ("all", None)]
+        if value is not None:
+            keys.append(("user", value["auth_user_id"]))
+        return any(self._invalidated.get(key, 0) > since for key in keys)
+
+    def _mark_invalidated(self, key: Hashable) -> None:
+        self._epoch += 1
+        self._invalidated[key] = self._epoch
+        self._invalidated.move_to_end(key)
+        while len(self._invalidated) > settings.SESSION_CACHE_MAX_ENTRIES:
+            _, epoch = self._invalidated.popitem(last=False)
+            self._forgotten_epoch = max(self._forgotten_epoch, epoch)
+
+    def _drop(self, token_hash: str) -> bool:
+        entry = self._entries.pop(token_hash, None)
+        if entry is None:
+            return False
+        value = entry[1]
+        if value is not None:
+            hashes = self._by_user.get(value["auth_user_id"])
+            if hashes is not None:
+                hashes.discard(token_hash)
+                if not hashes:
+                    del self._by_user[value["auth_user_id"]]
+        return True
+
+    def invalidate(self, token_hash: str) -> None:
+        with self._lock:
+            self._mark_invalidated(("hash", token_hash))
+            if self._drop(token_hash):
+                self._stats["invalidations"] += 1
+
+    def invalidate_user(self, auth_user_id: int) -> None:
+        """Descarta todas las sesiones cacheadas de un usuario."""
+        with self._lock:
+            self._mark_invalidated(("user", auth_user_id))
+            for token_hash in list(self._by_user.get(auth_user_id, ())):
+                self._drop(token_hash)
+                self._stats["invalidations"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._mark_invalidated(("all", None))
+            self._entries.clear()
+            self._by_user.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["negative_hits"] + self._stats["misses"]
+            hit_rate = (self._stats["hits"] + self._stats["negative_hits"]) / lookups if lookups else 0.0
+            return {
+                **self._stats,
+                "size": len(self._entries),
+                "max_entries": settings.SESSION_CACHE_MAX_ENTRIES,
+                "hit_rate": round(hit_rate, 4),
+            }
+
+
+cache = SessionCache()
@@ -23,6 +23,55 @@ class Settings(BaseSettings):
 
     ALMA_REGISTER_TOKEN: str = "123456"
 
+    # Tamaño de lote por defecto para /calendar/bulk-delete con chunked=True
+    CALENDAR_DELETE_BATCH_SIZE: int = 500
+
+    # Feeds iCalendar: zona horaria declarada (las horas se guardan sin zona) y días hacia atrás incluidos
+    CALENDAR_TIMEZONE: str = "America/Argentina/Buenos_Aires"
+    CALENDAR_FEED_PAST_DAYS: int = 180
+
+    # Segundos tras los que el índice de conflictos de voluntarios se recarga desde la base
+    # (relevante solo con varios workers; 0 = no recargar)
+    CALENDAR_CONFLICT_INDEX_TTL_SECONDS: int = 300
+
+    # Lee /calendar/instances-rich desde calendar_instances_rich (reconstruir antes de activarlo)
+    CALENDAR_READ_MODEL_ENABLED: bool = False
+
+    # Segundos tras los que la caché de categorías de ideas se recarga (0 = no recargar)
+    IDEA_CATEGORY_CACHE_TTL_SECONDS: int = 300
+
+    # Caché de /auth/sessions/by-hash: TTL de sesiones encontradas, de hashes inexistentes y
+    # tamaño máximo. El TTL acota cuánto tarda otro worker en ver una revocación (0 = sin caché)
+    SESSION_CACHE_TTL_SECONDS: int = 30
+    SESSION_CACHE_NEGATIVE_TTL_SECONDS: int = 5
+    SESSION_CACHE_MAX_ENTRIES: int = 10000
+
+    # Escritura diferida de /auth/login-events/async: tamaño máximo de la cola, lote por
+    # INSERT, espera máxima antes de escribir, espera de un productor con la cola llena e
+    # intentos por evento ante errores de la base que no son de sus datos (caída, conexión)
+    LOGIN_EVENTS_BUFFER_MAX: int = 10000
+    LOGIN_EVENTS_FLUSH_SIZE: int = 200
+    LOGIN_EVENTS_FLUSH_INTERVAL_SECONDS: float = 1.0
+    LOGIN_EVENTS_ENQUEUE_TIMEOUT_SECONDS: float = 0.05
+    LOGIN_EVENTS_MAX_ATTEMPTS: int = 5
+
+    # Retención: días de eventos que se conservan enteros (los anteriores se resumen por día
+    # en auth_login_daily_stats y se borran) y filas por tanda de borrado. Con la tabla
+    # particionada por mes (migrations/008) se crean particiones por adelantado y se
+    # descartan las vencidas enteras
+    LOGIN_EVENTS_RETENTION_DAYS: int = 180
+    LOGIN_EVENTS_PURGE_BATCH_SIZE: int = 5000
+    LOGIN_EVENTS_PARTITIONED: bool = False
+    LOGIN_EVENTS_PARTITIONS_AHEAD: int = 3
+
+    # Limpieza de tokens y sesiones vencidos, usados o revocados: cada cuánto corre en la API
+    # (0 = no correr, p. ej. si se usa el comando por cron), horas de margen antes de borrar,
+    # filas por tanda y tandas máximas por tabla en cada corrida
+    AUTH_SWEEP_INTERVAL_SECONDS: int = 900
+    AUTH_SWEEP_RETAIN_HOURS: int = 24
+    AUTH_SWEEP_BATCH_SIZE: int = 1000
+    AUTH_SWEEP_MAX_BATCHES: int = 50
+
     VERSION: str = "1.1.0"
 
     @property
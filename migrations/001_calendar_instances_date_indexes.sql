@@ -0,0 +1,13 @@
+-- Índices para los filtros por rango de fechas del calendario.
+--
+-- /calendar/instances-rich y /calendar/bulk-* filtran con rangos semiabiertos
+-- (date >= :date_lo AND date < :date_hi), que MySQL resuelve con un range scan
+-- sobre (date, start_time) y además devuelve las filas ya ordenadas.
+-- (type, source_id, date) cubre los filtros por serie.
+--
+-- Ejecutar con un usuario con permisos de ALTER (el usuario de la app solo tiene DML):
+--   mysql -u root -p alma_platform < migrations/001_calendar_instances_date_indexes.sql
+
+ALTER TABLE calendar_instances
+    ADD INDEX idx_calendar_instances_date_start (date, start_time),
+    ADD INDEX idx_calendar_instances_type_source_date (type, source_id, date);
@@ -0,0 +1,34 @@
+-- Reglas de recurrencia para el calendario.
+--
+-- Las ocurrencias de una regla se proyectan al leer /calendar/instances-rich y solo se
+-- guardan en calendar_instances cuando se materializan (POST /calendar/recurrences/{id}/materialize).
+-- (recurrence_id, recurrence_date) identifica la ocurrencia original de una instancia
+-- materializada; el índice único hace idempotente la materialización concurrente.
+
+CREATE TABLE calendar_recurrences (
+    id              INT AUTO_INCREMENT PRIMARY KEY,
+    type            VARCHAR(20)  NOT NULL,
+    source_id       INT          NULL,
+    start_date      DATE         NOT NULL,
+    start_time      TIME         NOT NULL,
+    end_time        TIME         NOT NULL,
+    freq            VARCHAR(10)  NOT NULL DEFAULT 'weekly',
+    repeat_interval INT          NOT NULL DEFAULT 1,
+    weekday         TINYINT      NULL,
+    until_date      DATE         NULL,
+    max_count       INT          NULL,
+    exdates         JSON         NULL,
+    notes           TEXT         NULL,
+    status          VARCHAR(20)  NOT NULL DEFAULT 'programado',
+    created_at      TIMESTAMP    NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at      TIMESTAMP    NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX idx_calendar_recurrences_window (start_date, until_date),
+    INDEX idx_calendar_recurrences_type_source (type, source_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+ALTER TABLE calendar_instances
+    ADD COLUMN recurrence_id   INT  NULL AFTER status,
+    ADD COLUMN recurrence_date DATE NULL AFTER recurrence_id,
+    ADD UNIQUE INDEX uq_calendar_instances_recurrence (recurrence_id, recurrence_date),
+    ADD CONSTRAINT fk_calendar_instances_recurrence
+        FOREIGN KEY (recurrence_id) REFERENCES calendar_recurrences (id) ON DELETE SET NULL;
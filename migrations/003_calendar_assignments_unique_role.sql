@@ -0,0 +1,16 @@
+-- Un solo asignado por (instancia, rol).
+--
+-- Habilita el upsert multi-fila (INSERT ... ON DUPLICATE KEY UPDATE) de
+-- PUT /calendar/assignments/batch. Antes de crear el índice se eliminan los
+-- duplicados que pudiera haber, conservando la fila de menor id (la misma que ya
+-- mostraba /calendar/instances-rich).
+
+DELETE ca
+FROM calendar_assignments ca
+JOIN calendar_assignments keep
+    ON keep.instance_id = ca.instance_id
+   AND keep.role = ca.role
+   AND keep.id < ca.id;
+
+ALTER TABLE calendar_assignments
+    ADD UNIQUE INDEX uq_calendar_assignments_instance_role (instance_id, role);
@@ -0,0 +1,16 @@
+-- Un solo registro por (instancia, participante).
+--
+-- Permite que POST /calendar/instances/{event_id}/check-in marque asistencia con un
+-- único INSERT ... ON DUPLICATE KEY UPDATE, idempotente aunque varios dispositivos
+-- escaneen al mismo participante a la vez. Antes se eliminan duplicados conservando
+-- la fila de menor id.
+
+DELETE cep
+FROM calendar_event_participants cep
+JOIN calendar_event_participants keep
+    ON keep.event_id = cep.event_id
+   AND keep.participant_id = cep.participant_id
+   AND keep.id < cep.id;
+
+ALTER TABLE calendar_event_participants
+    ADD UNIQUE INDEX uq_calendar_event_participants_event_participant (event_id, participant_id);
@@ -0,0 +1,30 @@
+-- Modelo de lectura desnormalizado para /calendar/instances-rich.
+--
+-- Una fila por instancia con sus coordinadores ya resueltos. Se mantiene desde la API
+-- y se borra en cascada con la instancia. Después de crear la tabla, poblarla con
+--   python -m app.cli rebuild-calendar-read-model
+-- y recién entonces activar CALENDAR_READ_MODEL_ENABLED=True.
+
+CREATE TABLE calendar_instances_rich (
+    instance_id              INT          NOT NULL PRIMARY KEY,
+    recurrence_id            INT          NULL,
+    type                     VARCHAR(20)  NOT NULL,
+    source_id                INT          NULL,
+    date                     DATE         NOT NULL,
+    start_time               TIME         NOT NULL,
+    end_time                 TIME         NOT NULL,
+    notes                    TEXT         NULL,
+    status                   VARCHAR(20)  NOT NULL,
+    coordinator_id           INT          NULL,
+    coordinator_name         VARCHAR(100) NULL,
+    coordinator_last_name    VARCHAR(100) NULL,
+    co_coordinator_id        INT          NULL,
+    co_coordinator_name      VARCHAR(100) NULL,
+    co_coordinator_last_name VARCHAR(100) NULL,
+    updated_at               TIMESTAMP    NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX idx_calendar_instances_rich_date_start (date, start_time),
+    INDEX idx_calendar_instances_rich_coordinator (coordinator_id, date),
+    INDEX idx_calendar_instances_rich_co_coordinator (co_coordinator_id, date),
+    CONSTRAINT fk_calendar_instances_rich_instance
+        FOREIGN KEY (instance_id) REFERENCES calendar_instances (id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
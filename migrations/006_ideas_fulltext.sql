@@ -0,0 +1,11 @@
+-- Índices FULLTEXT para GET /ideas/search.
+--
+-- La búsqueda usa MATCH ... AGAINST en modo lenguaje natural sobre título y cuerpo de
+-- la idea y sobre el cuerpo de sus comentarios, y suma las relevancias por idea
+-- (el título y el cuerpo de la idea pesan el doble que los comentarios).
+
+ALTER TABLE ideas
+    ADD FULLTEXT INDEX ft_ideas_title_body (title, body);
+
+ALTER TABLE idea_comments
+    ADD FULLTEXT INDEX ft_idea_comments_body (body);
@@ -0,0 +1,12 @@
+-- Índices para la paginación por cursor (created_at, id) de GET /ideas/ y
+-- GET /ideas/{idea_id}/comments.
+--
+-- Con el cursor, cada página es un rango sobre el índice que arranca en la última fila
+-- entregada, así que una página profunda cuesta lo mismo que la primera.
+
+ALTER TABLE ideas
+    ADD INDEX idx_ideas_created_id (created_at, id),
+    ADD INDEX idx_ideas_category_created_id (category, created_at, id);
+
+ALTER TABLE idea_comments
+    ADD INDEX idx_idea_comments_idea_created_id (idea_id, created_at, id);
@@ -0,0 +1,51 @@
+-- Retención de auth_login_events.
+--
+-- auth_login_daily_stats guarda, por día (UTC) y email, cuántos logins fueron exitosos y
+-- cuántos fallidos; ahí se resumen los eventos antes de borrarlos con
+--   python -m app.cli purge-login-events
+-- Los índices (created_at, id) sirven a la vez a la paginación por cursor de
+-- GET /auth/login-events y a la búsqueda de las filas vencidas de cada tanda.
+
+CREATE TABLE auth_login_daily_stats (
+    day           DATE         NOT NULL,
+    email         VARCHAR(150) NOT NULL,
+    auth_user_id  INT          NULL,
+    success_count INT          NOT NULL DEFAULT 0,
+    failure_count INT          NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, email),
+    INDEX idx_auth_login_daily_stats_user_day (auth_user_id, day),
+    CONSTRAINT fk_auth_login_daily_stats_user
+        FOREIGN KEY (auth_user_id) REFERENCES auth_users (id) ON DELETE SET NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+ALTER TABLE auth_login_events
+    ADD INDEX idx_auth_login_events_created_id (created_at, id),
+    ADD INDEX idx_auth_login_events_user_created_id (auth_user_id, created_at, id);
+
+-- ── Opcional: particiones mensuales ───────────────────────────────────
+--
+-- Con la tabla particionada por mes, los meses vencidos se descartan con DROP PARTITION
+-- (instantáneo) en lugar de borrarse fila por fila. MySQL exige que la clave primaria
+-- incluya la columna de partición y no admite claves foráneas en tablas particionadas:
+-- al borrar un usuario sus eventos ya no pasan auth_user_id a NULL.
+--
+-- Reemplazar <fk_auth_user> por el nombre que muestra SHOW CREATE TABLE auth_login_events,
+-- correr lo siguiente, activar LOGIN_EVENTS_PARTITIONED=True y correr purge-login-events,
+-- que parte pmax en las particiones del mes actual y los siguientes. purge-login-events no
+-- particiona la tabla ni crea la tabla de marcas: si falta algo de esto, corta con error.
+--
+-- CREATE TABLE auth_login_events_rolled_partitions (
+--     partition_name VARCHAR(16) NOT NULL PRIMARY KEY,
+--     rolled_at      TIMESTAMP   NOT NULL DEFAULT CURRENT_TIMESTAMP
+-- ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+--
+-- UPDATE auth_login_events SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL;
+-- ALTER TABLE auth_login_events DROP FOREIGN KEY <fk_auth_user>;
+-- ALTER TABLE auth_login_events
+--     MODIFY created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+--     DROP PRIMARY KEY,
+--     ADD PRIMARY KEY (id, created_at);
+-- ALTER TABLE auth_login_events
+--     PARTITION BY RANGE (UNIX_TIMESTAMP(created_at)) (
+--         PARTITION pmax VALUES LESS THAN MAXVALUE
+--     );
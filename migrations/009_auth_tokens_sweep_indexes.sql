@@ -0,0 +1,16 @@
+-- Índices para la limpieza global de tokens y sesiones (app/services/auth_sweeper.py).
+--
+-- Cada tanda busca filas con expires_at o used_at / revoked_at anteriores al corte; sin
+-- estos índices cada tanda recorre la tabla entera.
+
+ALTER TABLE email_verification_tokens
+    ADD INDEX idx_email_verification_tokens_expires (expires_at),
+    ADD INDEX idx_email_verification_tokens_used (used_at);
+
+ALTER TABLE password_reset_tokens
+    ADD INDEX idx_password_reset_tokens_expires (expires_at),
+    ADD INDEX idx_password_reset_tokens_used (used_at);
+
+ALTER TABLE auth_sessions
+    ADD INDEX idx_auth_sessions_expires (expires_at),
+    ADD INDEX idx_auth_sessions_revoked (revoked_at);
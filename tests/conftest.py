@@ -0,0 +1,91 @@
+"""
+Fixtures comunes: una base SQLite en memoria con el esquema de los modelos y un
+TestClient con get_db y la API key sobreescritos. Las pruebas que necesitan MySQL
+(planes de ejecución reales) se saltean si no está ALMA_TEST_MYSQL_URL.
+"""
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base, get_db
+from app.deps import verify_api_key
+from app.main import app
+
+MYSQL_URL = os.environ.get("ALMA_TEST_MYSQL_URL")
+
+
+@pytest.fixture
+def engine():
+    eng = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(eng)
+    yield eng
+    eng.dispose()
+
+
+@pytest.fixture
+def session_factory(engine):
+    return sessionmaker(bind=engine, autoflush=False)
+
+
+@pytest.fixture
+def db(session_factory):
+    session = session_factory()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def client(session_factory):
+    def override_get_db():
+        session = session_factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[verify_api_key] = lambda: None
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def mysql_engine():
+    if not MYSQL_URL:
+        pytest.skip("ALMA_TEST_MYSQL_URL no está definida")
+    eng = create_engine(MYSQL_URL)
+    yield eng
+    eng.dispose()
+
+
+class StatementCounter:
+    """Cuenta las sentencias que llegan al motor mientras está activo."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+        self.parameters = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+        self.parameters.append(parameters)
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._record)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+@pytest.fixture
+def count_statements(engine):
+    return lambda: StatementCounter(engine)
@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+
+from app.models.auth import AuthSession, AuthUser, EmailVerificationToken
+from app.services import auth_sweeper
+
+NOW = datetime(2026, 10, 17, 12, 0)
+OLD = NOW - timedelta(days=3)
+FRESH = NOW + timedelta(days=3)
+
+
+@pytest.mark.parametrize("table, column", [
+    (table, column) for table in auth_sweeper._TABLES for column in auth_sweeper._columns(table)
+])
+def test_each_sweep_query_ranges_over_its_index(db, table, column):
+    plan = [
+        row[-1] for row in db.execute(
+            text("EXPLAIN QUERY PLAN " + auth_sweeper._SELECT[table, column].text),
+            {"cutoff": NOW, "limit": 100},
+        )
+    ]
+    assert any(step.startswith(f"SEARCH {table} USING INDEX") and f"({column}<?)" in step for step in plan), plan
+    assert not any("TEMP B-TREE" in step for step in plan), plan
+
+
+def test_sweep_deletes_expired_used_and_revoked_rows_only(db):
+    db.add(AuthUser(id=1, email="a@x.io", password_hash="x"))
+    db.add_all([
+        EmailVerificationToken(id=1, auth_user_id=1, token_hash="e-expired", expires_at=OLD),
+        EmailVerificationToken(id=2, auth_user_id=1, token_hash="e-used", expires_at=FRESH, used_at=OLD),
+        EmailVerificationToken(id=3, auth_user_id=1, token_hash="e-live", expires_at=FRESH),
+        AuthSession(id=1, auth_user_id=1, session_token_hash="s-expired", expires_at=OLD),
+        AuthSession(id=2, auth_user_id=1, session_token_hash="s-revoked", expires_at=FRESH, revoked_at=OLD),
+        AuthSession(id=3, auth_user_id=1, session_token_hash="s-live", expires_at=FRESH),
+    ])
+    db.commit()
+
+    result = auth_sweeper.sweep(db, now=NOW + timedelta(days=1), batch_size=1, max_batches=10)
+
+    assert result["deleted"] == {"email_verification_tokens": 2, "password_reset_tokens": 0, "auth_sessions": 2}
+    assert result["pending"] == []
+    assert [t.id for t in db.query(EmailVerificationToken)] == [3]
+    assert [s.id for s in db.query(AuthSession)] == [3]
+
+
+def test_sweep_stops_at_max_batches_and_reports_pending(db):
+    db.add(AuthUser(id=1, email="a@x.io", password_hash="x"))
+    db.add_all(
+        AuthSession(id=i, auth_user_id=1, session_token_hash=f"s{i}", expires_at=OLD) for i in range(1, 6)
+    )
+    db.commit()
+
+    deleted, pending = auth_sweeper.sweep_table(db, "auth_sessions", NOW, batch_size=2, max_batches=2)
+
+    assert (deleted, pending) == (4, True)
+    assert db.query(AuthSession).count() == 1
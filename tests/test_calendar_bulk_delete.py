@@ -0,0 +1,15 @@
+import pytest
+
+
+@pytest.mark.parametrize("batch_size", [0, -5])
+def test_non_positive_batch_size_is_rejected(client, batch_size):
+    for path in ("/calendar/bulk-count", "/calendar/bulk-delete"):
+        response = client.post(path, json={"scope": "all", "chunked": True, "batch_size": batch_size})
+        assert response.status_code == 422
+
+
+def test_missing_batch_size_uses_the_default(client, monkeypatch):
+    monkeypatch.setattr("app.routers.calendar.settings.CALENDAR_DELETE_BATCH_SIZE", 250)
+    response = client.post("/calendar/bulk-count", json={"scope": "all", "chunked": True})
+    assert response.status_code == 200
+    assert response.json()["batch_size"] == 250
@@ -0,0 +1,41 @@
+from datetime import date, time
+
+from app.models.calendar import CalendarInstance
+from app.routers import calendar as calendar_router
+
+
+def test_generate_returns_the_ids_of_the_inserted_rows(db, client, monkeypatch):
+    refreshed = []
+    monkeypatch.setattr(
+        calendar_router.calendar_read_model, "refresh_instances",
+        lambda session, ids: refreshed.extend(ids),
+    )
+    monkeypatch.setattr(calendar_router, "_GENERATE_CHUNK_SIZE", 2)
+    # Una instancia previa con la misma (type, source_id, date) que la primera generada
+    db.add(CalendarInstance(id=40, type="grupo", source_id=3, date=date(2025, 1, 6),
+                            start_time=time(18), end_time=time(20)))
+    db.commit()
+
+    response = client.post("/calendar/generate", json={
+        "start_date": "2025-01-06", "end_date": "2025-02-03", "first_type": "grupo",
+        "interval_days": 7, "source_group_id": 3, "source_workshop_id": 4,
+    })
+
+    assert response.status_code == 200
+    instances = response.json()["instances"]
+    assert len(instances) == 5
+    assert 40 not in [i["id"] for i in instances]
+    for item in instances:
+        row = db.get(CalendarInstance, item["id"])
+        assert (row.type, row.source_id, str(row.date)) == (item["type"], item["source_id"], item["date"])
+    assert refreshed == [i["id"] for i in instances]
+
+
+def test_generate_dry_run_writes_nothing(db, client):
+    response = client.post("/calendar/generate", json={
+        "start_date": "2025-01-06", "end_date": "2025-01-20", "first_type": "taller", "dry_run": True,
+    })
+
+    assert response.status_code == 200
+    assert [i["id"] for i in response.json()["instances"]] == [None, None]
+    assert db.query(CalendarInstance).count() == 0
@@ -0,0 +1,56 @@
+"""
+Regresión de planes de las consultas por rango de /calendar/instances-rich: si alguna
+vuelve a filtrar con YEAR()/MONTH() o pierde el índice, pasa a recorrer toda la tabla.
+"""
+from datetime import date
+
+from sqlalchemy import text
+
+from app.routers.calendar import _date_window, _rich_filters, _rich_instances_sql
+
+MONTH = _date_window(2025, 3)
+
+
+def _month_query(volunteer_id=None, type=None):
+    clauses, params = _rich_filters(*MONTH, type, volunteer_id)
+    return _rich_instances_sql(clauses), params
+
+
+def _sqlite_plan(db, sql, params):
+    return [row[-1] for row in db.execute(text("EXPLAIN QUERY PLAN " + sql), params)]
+
+
+def _mysql_plan(conn, sql, params):
+    return {row.table: row for row in conn.execute(text("EXPLAIN " + sql), params)}
+
+
+def test_month_window_is_half_open():
+    assert MONTH == (date(2025, 3, 1), date(2025, 4, 1))
+
+
+def test_month_query_uses_date_index(db):
+    plan = _sqlite_plan(db, *_month_query())
+    assert any("USING INDEX idx_calendar_instances_date_start" in step for step in plan), plan
+    assert not any(step.startswith("SCAN ci") for step in plan), plan
+
+
+def test_volunteer_filter_uses_date_index(db):
+    plan = _sqlite_plan(db, *_month_query(volunteer_id=7))
+    assert any("USING INDEX idx_calendar_instances_date_start" in step for step in plan), plan
+    assert not any(step.startswith("SCAN ci") for step in plan), plan
+
+
+def test_month_query_uses_date_index_on_mysql(mysql_engine):
+    with mysql_engine.connect() as conn:
+        for sql, params in (_month_query(), _month_query(volunteer_id=7)):
+            ci = _mysql_plan(conn, sql, params)["ci"]
+            assert ci.type != "ALL", ci
+            assert ci.key in ("idx_calendar_instances_date_start", "idx_calendar_instances_type_source_date"), ci
+
+
+def test_series_query_uses_type_source_index_on_mysql(mysql_engine):
+    sql = "SELECT id FROM calendar_instances ci WHERE ci.type = :type AND ci.source_id = :source_id" \
+          " AND ci.date >= :date_lo AND ci.date < :date_hi"
+    with mysql_engine.connect() as conn:
+        ci = _mysql_plan(conn, sql, {"type": "taller", "source_id": 1, "date_lo": MONTH[0], "date_hi": MONTH[1]})["ci"]
+        assert ci.key == "idx_calendar_instances_type_source_date", ci
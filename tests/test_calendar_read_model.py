@@ -0,0 +1,29 @@
+from datetime import date, time
+
+from app.models.calendar import CalendarInstance, CalendarRecurrence
+from app.routers import calendar as calendar_router
+
+
+def test_delete_recurrence_refreshes_materialized_instances(db, client, monkeypatch):
+    refreshed = []
+    monkeypatch.setattr(
+        calendar_router.calendar_read_model, "refresh_instances",
+        lambda session, ids: refreshed.extend(ids),
+    )
+    db.add(CalendarRecurrence(
+        id=1, type="taller", start_date=date(2025, 3, 3), start_time=time(9), end_time=time(11),
+        freq="weekly", repeat_interval=1, status="programado",
+    ))
+    db.add(CalendarInstance(
+        id=5, type="taller", date=date(2025, 3, 10), start_time=time(9), end_time=time(11),
+        status="programado", recurrence_id=1, recurrence_date=date(2025, 3, 10),
+    ))
+    db.add(CalendarInstance(id=6, type="taller", date=date(2025, 3, 11), start_time=time(9), end_time=time(11)))
+    db.commit()
+
+    assert client.delete("/calendar/recurrences/1").status_code == 204
+
+    assert refreshed == [5]
+    db.expire_all()
+    assert db.get(CalendarInstance, 5).recurrence_id is None
+    assert db.get(CalendarRecurrence, 1) is None
@@ -0,0 +1,39 @@
+from datetime import date, time
+
+import pytest
+
+from app.models.calendar import CalendarAssignment, CalendarInstance
+from app.models.voluntario import Voluntario
+from app.services.conflicts import conflict_index, interval_for
+
+
+@pytest.fixture(autouse=True)
+def fresh_index():
+    conflict_index.invalidate()
+    yield
+    conflict_index.invalidate()
+
+
+def _instance(db, id, start, end, day=date(2025, 3, 10)):
+    db.add(CalendarInstance(id=id, type="taller", date=day, start_time=start, end_time=end, status="programado"))
+
+
+def test_conflict_pair_reported_once_when_volunteer_has_both_roles(db, client):
+    db.add(Voluntario(id=1, name="Ana", registration_date=date(2024, 1, 1)))
+    _instance(db, 10, time(9), time(11))
+    _instance(db, 11, time(10), time(12))
+    db.flush()
+    db.add_all([
+        CalendarAssignment(instance_id=10, volunteer_id=1, role="coordinator"),
+        CalendarAssignment(instance_id=10, volunteer_id=1, role="co_coordinator"),
+        CalendarAssignment(instance_id=11, volunteer_id=1, role="coordinator"),
+        CalendarAssignment(instance_id=11, volunteer_id=1, role="co_coordinator"),
+    ])
+    db.commit()
+
+    r = client.get("/calendar/conflicts", params={"from": "2025-03-01", "to": "2025-03-31"})
+
+    assert r.status_code == 200
+    pairs = [(c["volunteer_id"], c["instance_id"], c["conflicting_instance_id"]) for c in r.json()]
+    assert pairs == [(1, 10, 11)]
+    assert conflict_index.find_conflicts(db, 1, interval_for(date(2025, 3, 10), "08:00", "13:00")) == [10, 11]
@@ -0,0 +1,61 @@
+from datetime import date
+
+import pytest
+
+from app.models.idea import Idea
+from app.models.voluntario import Voluntario
+from app.services.idea_categories import cache
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    cache.invalidate()
+    yield
+    cache.invalidate()
+
+
+def _idea(client, category):
+    r = client.post("/ideas/", json={
+        "title": "t", "body": "b", "category": category, "created_by_volunteer_id": 1,
+    })
+    assert r.status_code in (200, 201), r.text
+    return r.json()["id"]
+
+
+def test_categories_fold_case_and_spaces_on_load(db, client):
+    db.add(Voluntario(id=1, name="Ana", registration_date=date(2024, 1, 1)))
+    db.add_all(Idea(title="t", body="b", category=c, created_by_volunteer_id=1) for c in ("Salud", "salud", "Salud ", "Arte"))
+    db.commit()
+
+    counts = client.get("/ideas/categories/counts").json()
+
+    assert counts == [{"category": "Arte", "count": 1}, {"category": "Salud", "count": 3}]
+
+
+def test_categories_fold_case_on_writes(db, client):
+    db.add(Voluntario(id=1, name="Ana", registration_date=date(2024, 1, 1)))
+    db.commit()
+    assert client.get("/ideas/categories").json() == []
+
+    first = _idea(client, "Salud")
+    second = _idea(client, "SALUD ")
+    assert client.get("/ideas/categories/counts").json() == [{"category": "Salud", "count": 2}]
+
+    assert client.put(f"/ideas/{first}", json={"category": "salud"}).status_code == 200
+    assert client.get("/ideas/categories/counts").json() == [{"category": "Salud", "count": 2}]
+
+    assert client.delete(f"/ideas/{first}").status_code == 204
+    assert client.delete(f"/ideas/{second}").status_code == 204
+    assert client.get("/ideas/categories").json() == []
+
+
+def test_categories_fold_accents_and_only_trailing_spaces(db, client):
+    db.add(Voluntario(id=1, name="Ana", registration_date=date(2024, 1, 1)))
+    categories = ("Educación", "Educación", "educacion", "EDUCACIÓN  ", " Educación")
+    db.add_all(Idea(title="t", body="b", category=c, created_by_volunteer_id=1) for c in categories)
+    db.commit()
+
+    counts = client.get("/ideas/categories/counts").json()
+
+    # PAD SPACE ignora los espacios finales pero no los iniciales
+    assert counts == [{"category": " Educación", "count": 1}, {"category": "Educación", "count": 4}]
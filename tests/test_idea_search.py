@@ -0,0 +1,86 @@
+from datetime import date
+
+import pytest
+
+from app.models.voluntario import Voluntario
+from app.services import idea_search
+
+
+@pytest.fixture(autouse=True)
+def fresh_index(db):
+    idea_search.index.invalidate()
+    db.add(Voluntario(id=1, name="Ana", registration_date=date(2024, 1, 1)))
+    db.commit()
+    yield
+    idea_search.index.invalidate()
+
+
+def _idea(client, title, body="sin coincidencias"):
+    r = client.post("/ideas/", json={"title": title, "body": body, "created_by_volunteer_id": 1})
+    assert r.status_code == 201, r.text
+    return r.json()["id"]
+
+
+def _search(client, q):
+    r = client.get("/ideas/search", params={"q": q})
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def test_title_matches_rank_above_body_matches(client):
+    in_body = _idea(client, "Jornada de limpieza", "llevar semillas para la huerta")
+    in_title = _idea(client, "Huerta comunitaria")
+    in_both = _idea(client, "Huerta escolar", "una huerta en cada patio")
+    _idea(client, "Feria del libro")
+
+    results = _search(client, "huerta")
+
+    assert [r["id"] for r in results] == [in_both, in_title, in_body]
+    scores = [r["score"] for r in results]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_accents_and_case_are_folded(client):
+    idea_id = _idea(client, "Educación popular")
+
+    for q in ("EDUCACION", "educación", "Educacion"):
+        [result] = _search(client, q)
+        assert result["id"] == idea_id
+        assert result["title_highlight"] == "<mark>Educación</mark> popular"
+
+
+def test_highlight_escapes_html_around_marks(client):
+    _idea(client, "<b>Taller</b> & huerta", 'Traer <script>alert("x")</script> taller')
+
+    [result] = _search(client, "taller")
+
+    assert result["title_highlight"] == "&lt;b&gt;<mark>Taller</mark>&lt;/b&gt; &amp; huerta"
+    assert "<script>" not in result["body_snippet"]
+    assert result["body_snippet"].endswith("&lt;/script&gt; <mark>taller</mark>")
+
+
+def test_index_follows_idea_writes_and_deletes(client):
+    assert _search(client, "reciclaje") == []  # carga el índice
+    idea_id = _idea(client, "Punto de reciclaje")
+    assert [r["id"] for r in _search(client, "reciclaje")] == [idea_id]
+
+    assert client.put(f"/ideas/{idea_id}", json={"title": "Punto de compostaje"}).status_code == 200
+    assert _search(client, "reciclaje") == []
+    assert [r["id"] for r in _search(client, "compostaje")] == [idea_id]
+
+    assert client.delete(f"/ideas/{idea_id}").status_code == 204
+    assert _search(client, "compostaje") == []
+
+
+def test_index_follows_comment_writes_and_deletes(client):
+    idea_id = _idea(client, "Biblioteca popular")
+    assert _search(client, "ajedrez") == []  # carga el índice
+
+    r = client.post(f"/ideas/{idea_id}/comments", params={"volunteer_id": 1}, json={"body": "Sumemos ajedrez los sábados"})
+    assert r.status_code == 201, r.text
+    [result] = _search(client, "ajedrez")
+    assert result["id"] == idea_id
+    assert result["comment_snippet"] == "Sumemos <mark>ajedrez</mark> los sábados"
+
+    assert client.delete(f"/ideas/{idea_id}/comments/{r.json()['id']}").status_code == 204
+    assert _search(client, "ajedrez") == []
@@ -0,0 +1,65 @@
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app.models.auth import AuthLoginEvent
+from app.services import login_events
+from app.services.login_events import LoginEventBuffer, new_event
+
+
+@pytest.fixture
+def buffer(session_factory, monkeypatch):
+    monkeypatch.setattr(login_events, "SessionLocal", session_factory)
+    monkeypatch.setattr(login_events.settings, "LOGIN_EVENTS_FLUSH_INTERVAL_SECONDS", 0.01)
+    buf = LoginEventBuffer()
+    buf.start()
+    yield buf
+    buf.stop()
+
+
+def _event(email):
+    return new_event({"auth_user_id": None, "email": email, "success": False,
+                      "failure_reason": None, "ip_address": "10.0.0.1", "user_agent": "pytest"})
+
+
+def test_poison_event_is_dead_lettered_and_the_rest_written(buffer, db, caplog):
+    emails = ["a@x.io", "b@x.io", None, "c@x.io", "d@x.io"]  # email es NOT NULL
+    for email in emails:
+        assert buffer.submit(_event(email))
+    buffer.stop()
+
+    assert sorted(e for (e,) in db.query(AuthLoginEvent.email)) == ["a@x.io", "b@x.io", "c@x.io", "d@x.io"]
+    stats = buffer.stats()
+    assert stats["written"] == 4
+    assert stats["dead_lettered"] == 1
+    assert stats["queued"] == 0
+    assert any(r.name == "app.services.login_events.dead_letter" for r in caplog.records)
+
+
+def test_transient_failure_is_retried(buffer, db, monkeypatch):
+    real_write = login_events.write_events
+    calls = []
+
+    def flaky_write(session, events):
+        calls.append(len(events))
+        if len(calls) == 1:
+            raise OperationalError("INSERT", {}, Exception("server has gone away"))
+        real_write(session, events)
+
+    monkeypatch.setattr(login_events, "write_events", flaky_write)
+    assert buffer.submit(_event("a@x.io"))
+    for _ in range(200):
+        if buffer.stats()["written"]:
+            break
+        login_events._time.sleep(0.01)
+    buffer.stop()
+
+    assert db.query(AuthLoginEvent).count() == 1
+    assert buffer.stats()["retried"] == 1
+    assert buffer.stats()["dead_lettered"] == 0
+
+
+def test_new_event_truncates_to_column_lengths():
+    event = new_event({"email": "e@x.io", "ip_address": "1" * 60, "user_agent": "u" * 1000, "failure_reason": None})
+    assert len(event["ip_address"]) == 45
+    assert len(event["user_agent"]) == 255
+    assert event["failure_reason"] is None
@@ -0,0 +1,92 @@
+import calendar
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.database import get_db
+from app.deps import verify_api_key
+from app.main import app
+from app.services import login_retention
+from app.services.login_retention import PartitioningError, ensure_partitions
+
+
+class _Result:
+    def __init__(self, row=None):
+        self.row = row
+
+    def first(self):
+        return self.row
+
+
+class RecordingSession:
+    """Registra los ALTER TABLE; responde si existe la tabla de marcas."""
+
+    def __init__(self, marker_table=True):
+        self.marker_table = marker_table
+        self.statements = []
+
+    def execute(self, statement, params=None):
+        sql = str(statement)
+        if "information_schema.TABLES" in sql:
+            return _Result((1,) if self.marker_table else None)
+        self.statements.append(sql)
+        return _Result()
+
+
+def _bound(year, month):
+    return calendar.timegm(date(year, month, 1).timetuple())
+
+
+@pytest.fixture
+def existing(monkeypatch):
+    parts = []
+    monkeypatch.setattr(login_retention, "partitions", lambda db: parts)
+    return parts
+
+
+def test_existing_maxvalue_partition_is_reorganized(existing):
+    existing.extend([("p202610", _bound(2026, 11)), ("pmax", None)])
+    db = RecordingSession()
+    added = ensure_partitions(db, date(2026, 10, 17), ahead=2)
+
+    assert added == ["p202611", "p202612"]
+    assert db.statements == [
+        f"ALTER TABLE auth_login_events REORGANIZE PARTITION pmax INTO "
+        f"(PARTITION p202611 VALUES LESS THAN ({_bound(2026, 12)}), "
+        f"PARTITION p202612 VALUES LESS THAN ({_bound(2027, 1)}), "
+        f"PARTITION pmax VALUES LESS THAN MAXVALUE)"
+    ]
+
+
+def test_nothing_to_do_when_partitions_are_ahead(existing):
+    existing.extend([("p202611", _bound(2026, 12)), ("pmax", None)])
+    db = RecordingSession()
+    assert ensure_partitions(db, date(2026, 10, 17), ahead=1) == []
+    assert db.statements == []
+
+
+@pytest.mark.parametrize("parts, marker_table, message", [
+    ([], True, "no está particionada"),
+    ([("p202610", _bound(2026, 11))], True, "no tiene la partición pmax"),
+    ([("p202610", _bound(2026, 11)), ("pmax", None)], False, "auth_login_events_rolled_partitions"),
+])
+def test_missing_partitioning_fails_without_ddl(existing, parts, marker_table, message):
+    existing.extend(parts)
+    db = RecordingSession(marker_table)
+    with pytest.raises(PartitioningError, match=message):
+        ensure_partitions(db, date(2026, 10, 17), ahead=1)
+    assert db.statements == []
+
+
+def test_purge_endpoint_reports_missing_partitioning(existing, monkeypatch):
+    monkeypatch.setattr(login_retention.settings, "LOGIN_EVENTS_PARTITIONED", True)
+    app.dependency_overrides[get_db] = lambda: RecordingSession()
+    app.dependency_overrides[verify_api_key] = lambda: None
+    try:
+        response = TestClient(app).post("/auth/login-events/purge")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 409
+    assert "no está particionada" in response.json()["detail"]
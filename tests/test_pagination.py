@@ -0,0 +1,64 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.models.idea import Idea
+from app.models.idea_comment import IdeaComment
+from app.models.voluntario import Voluntario
+from app.pagination import NEXT_CURSOR_HEADER
+
+
+def _pages(client, url, limit):
+    """Recorre todas las páginas siguiendo X-Next-Cursor; devuelve los ids por página."""
+    pages, params = [], {"limit": limit}
+    while True:
+        r = client.get(url, params=params)
+        assert r.status_code == 200, r.text
+        pages.append([item["id"] for item in r.json()])
+        cursor = r.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            return pages
+        params = {"limit": limit, "cursor": cursor}
+        assert len(pages) < 50, "la paginación no avanza"
+
+
+@pytest.fixture
+def volunteer(db):
+    db.add(Voluntario(id=1, name="Ana", registration_date=date(2024, 1, 1)))
+    db.commit()
+
+
+@pytest.mark.parametrize("explicit_dates", [False, True])
+def test_ideas_feed_pages_to_the_end(db, client, volunteer, explicit_dates):
+    start = datetime(2025, 5, 1, 10, 0, 0)
+    for i in range(1, 11):
+        # Sin fecha explícita todas toman CURRENT_TIMESTAMP: empatan y desempata el id
+        created_at = start + timedelta(seconds=i // 3) if explicit_dates else None
+        db.add(Idea(id=i, title=f"Idea {i}", body="b", created_by_volunteer_id=1, created_at=created_at))
+    db.commit()
+
+    pages = _pages(client, "/ideas/", 3)
+
+    assert [len(p) for p in pages] == [3, 3, 3, 1]
+    ids = [i for page in pages for i in page]
+    expected = sorted(range(1, 11), key=lambda i: ((i // 3) if explicit_dates else 0, i), reverse=True)
+    assert ids == expected
+
+
+@pytest.mark.parametrize("explicit_dates", [False, True])
+def test_comment_thread_pages_to_the_end(db, client, volunteer, explicit_dates):
+    db.add(Idea(id=1, title="Idea", body="b", created_by_volunteer_id=1))
+    start = datetime(2025, 5, 1, 10, 0, 0)
+    for c in range(1, 8):
+        created_at = start + timedelta(seconds=c // 2) if explicit_dates else None
+        db.add(IdeaComment(id=c, idea_id=1, volunteer_id=1, body=f"c{c}", created_at=created_at))
+    db.commit()
+
+    pages = _pages(client, "/ideas/1/comments", 2)
+
+    assert [i for page in pages for i in page] == list(range(1, 8))
+    assert [len(p) for p in pages] == [2, 2, 2, 1]
+
+
+def test_invalid_cursor_is_rejected(client):
+    assert client.get("/ideas/", params={"cursor": "no-es-un-cursor"}).status_code == 400
@@ -0,0 +1,105 @@
+"""
+Las vistas de lista corren una cantidad fija de sentencias, sin importar cuántas filas
+devuelven (sin N+1).
+"""
+from datetime import date, time
+
+import pytest
+
+from app.models.calendar import CalendarAssignment, CalendarInstance
+from app.models.idea import Idea
+from app.models.idea_comment import IdeaComment
+from app.models.voluntario import Voluntario
+
+
+def _volunteers(db, n):
+    db.add_all(Voluntario(id=v, name=f"Vol{v}", registration_date=date(2024, 1, 1)) for v in range(1, n + 1))
+
+
+def _seed_ideas(db, n):
+    _volunteers(db, 3)
+    for i in range(1, n + 1):
+        db.add(Idea(id=i, title=f"Idea {i}", body="cuerpo", category="general", created_by_volunteer_id=1 + i % 3))
+        db.add_all(IdeaComment(idea_id=i, volunteer_id=1 + c % 3, body=f"comentario {c}") for c in range(i % 4))
+    db.commit()
+
+
+def _seed_month(db, n):
+    _volunteers(db, 4)
+    for i in range(1, n + 1):
+        db.add(CalendarInstance(
+            id=i, type="taller", source_id=1, date=date(2025, 3, 1 + i % 28),
+            start_time=time(9 + i % 8), end_time=time(10 + i % 8), status="programado",
+        ))
+    db.flush()
+    for i in range(1, n + 1):
+        db.add(CalendarAssignment(instance_id=i, volunteer_id=1 + i % 4, role="coordinator"))
+        if i % 2:
+            db.add(CalendarAssignment(instance_id=i, volunteer_id=1 + (i + 1) % 4, role="co_coordinator"))
+    db.commit()
+
+
+def _statements(client, count_statements, url, params=None):
+    with count_statements() as counter:
+        r = client.get(url, params=params)
+    assert r.status_code == 200, r.text
+    return counter.count, r.json()
+
+
+@pytest.mark.parametrize("n", [3, 40])
+def test_ideas_feed_runs_one_query(db, client, count_statements, n):
+    _seed_ideas(db, n)
+
+    count, ideas = _statements(client, count_statements, "/ideas/")
+
+    assert len(ideas) == n
+    assert count == 1
+    assert {i["id"]: i["comment_count"] for i in ideas} == {i: i % 4 for i in range(1, n + 1)}
+
+
+def test_ideas_feed_counts_comments_of_the_page_only(db, client, count_statements):
+    _seed_ideas(db, 30)
+
+    with count_statements() as counter:
+        assert client.get("/ideas/", params={"limit": 5}).status_code == 200
+    [(statement, parameters)] = zip(counter.statements, counter.parameters)
+    plan = [row[-1] for row in db.connection().exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)]
+
+    # El conteo va por índice a los comentarios de cada idea de la página, sin recorrer la tabla
+    assert any(step.startswith("SEARCH idea_comments") for step in plan), plan
+    assert not any(step.startswith("SCAN idea_comments") for step in plan), plan
+
+
+@pytest.mark.parametrize("params", [{}, {"include_comments": 2}])
+def test_ideas_feed_query_count_does_not_grow_with_rows(session_factory, client, count_statements, params):
+    counts = []
+    for n in (5, 60):
+        db = session_factory()
+        db.query(IdeaComment).delete()
+        db.query(Idea).delete()
+        db.query(Voluntario).delete()
+        db.commit()
+        _seed_ideas(db, n)
+        db.close()
+        counts.append(_statements(client, count_statements, "/ideas/", params)[0])
+    assert counts[0] == counts[1]
+
+
+def test_instances_rich_query_count_does_not_grow_with_rows(session_factory, client, count_statements):
+    counts = []
+    for n in (5, 120):
+        db = session_factory()
+        db.query(CalendarAssignment).delete()
+        db.query(CalendarInstance).delete()
+        db.query(Voluntario).delete()
+        db.commit()
+        _seed_month(db, n)
+        db.close()
+        count, rows = _statements(
+            client, count_statements, "/calendar/instances-rich",
+            {"year": 2025, "month": 3, "include_participant_counts": True},
+        )
+        assert len(rows) == n
+        assert all(r["coordinator"] for r in rows)
+        counts.append(count)
+    assert counts[0] == counts[1]
@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models.auth import AuthSession, AuthUser
+from app.services import session_cache
+from app.services.session_cache import MISS, SessionCache
+
+
+@pytest.fixture
+def cache():
+    return SessionCache()
+
+
+def _session(user_id=1, token_hash="h1"):
+    return {"id": 1, "auth_user_id": user_id, "session_token_hash": token_hash}
+
+
+def test_put_after_invalidating_the_hash_is_discarded(cache):
+    since = cache.snapshot()
+    cache.invalidate("h1")  # revocación mientras el lector consultaba la base
+    cache.put("h1", _session(), since)
+    assert cache.get("h1") is MISS
+    assert cache.stats()["stale_puts"] == 1
+
+
+def test_put_after_invalidating_the_user_is_discarded(cache):
+    since = cache.snapshot()
+    cache.invalidate_user(1)
+    cache.put("h1", _session(user_id=1), since)
+    assert cache.get("h1") is MISS
+
+
+def test_unrelated_invalidations_do_not_block_put(cache):
+    since = cache.snapshot()
+    cache.invalidate("other")
+    cache.invalidate_user(2)
+    cache.put("h1", _session(user_id=1), since)
+    assert cache.get("h1")["auth_user_id"] == 1
+
+
+def test_put_is_discarded_when_the_invalidation_record_was_forgotten(cache, monkeypatch):
+    monkeypatch.setattr(session_cache.settings, "SESSION_CACHE_MAX_ENTRIES", 2)
+    since = cache.snapshot()
+    for i in range(3):
+        cache.invalidate(f"x{i}")
+    cache.put("h1", _session(), since)
+    assert cache.get("h1") is MISS
+
+
+def test_revoke_during_lookup_is_not_cached(db, client, monkeypatch):
+    session_cache.cache.clear()
+    db.add(AuthUser(id=1, email="a@b.c", password_hash="x"))
+    db.add(AuthSession(auth_user_id=1, session_token_hash="h1", expires_at=datetime.utcnow() + timedelta(days=1)))
+    db.commit()
+
+    real_snapshot = session_cache.cache.snapshot
+
+    def snapshot_then_revoke():
+        since = real_snapshot()
+        monkeypatch.setattr(session_cache.cache, "snapshot", real_snapshot)
+        assert client.put("/auth/sessions/revoke-by-hash/h1").status_code == 200
+        return since
+
+    monkeypatch.setattr(session_cache.cache, "snapshot", snapshot_then_revoke)
+    client.get("/auth/sessions/by-hash/h1")
+
+    assert session_cache.cache.get("h1") is MISS
+    assert client.get("/auth/sessions/by-hash/h1").json()["revoked_at"] is not None